@@ -0,0 +1,213 @@
+"""
+Cubo de agregação (data da sessão × autor × status)
+
+Construído uma vez na carga, guarda uma célula por combinação de data,
+autor e status com a contagem de eventos e a marca de aprovação (derivada
+do status). Os PLs distintos de cada célula ficam em formato CSR: um único
+vetor int32 com os códigos de PL de todas as células, em ordem, e os
+deslocamentos de cada célula nele; a memória cresce com os pares (célula,
+PL) e não com o número de PLs da base. Os indicadores e gráficos do painel
+são respondidos somando células, e os PLs únicos de um recorte marcando
+numa máscara do tamanho das categorias de PL os códigos das células
+selecionadas, então o custo depende do número de células e não do número
+de eventos.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_CELULA = ['Data Sessão', 'Ano', 'Mês', 'Autor', 'Status', 'Aprovado', 'Eventos']
+
+
+def intervalo_wilson(aprovados, totais, confianca=0.95):
+    """Limites inferior e superior (0 a 1) do intervalo de Wilson"""
+    z = NormalDist().inv_cdf((1 + confianca) / 2)
+    n = np.asarray(totais, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = np.asarray(aprovados, dtype=float) / n
+        centro = (p + z * z / (2 * n)) / (1 + z * z / n)
+        margem = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return np.nan_to_num(centro - margem), np.nan_to_num(centro + margem)
+
+
+def status_aprovado(status):
+    """Marca de aprovação para cada status (mesma regra do painel)"""
+    return pd.Index(status).astype(str).str.contains('Aprovado', case=False, na=False)
+
+
+class CuboAgregado:
+    """Contagens por data, autor e status com os PLs de cada célula (CSR)"""
+
+    def __init__(self, celulas, pls, deslocamentos, codigos):
+        # O índice das células é a posição delas no cubo completo, preservada
+        # nos recortes: é por ele que se chega aos PLs de cada célula
+        self.celulas = celulas
+        self.pls = pls
+        self.deslocamentos = deslocamentos
+        self.codigos = codigos
+        self._datas = celulas['Data Sessão'].to_numpy()
+
+    @classmethod
+    def montar(cls, df):
+        """Monta o cubo a partir das linhas de eventos"""
+        pl = df['PL'].astype('category')
+        eventos = pd.DataFrame({
+            'Data Sessão': df['Data Sessão'].dt.normalize(),
+            'Autor': df['Autor'].astype('category'),
+            'Status': df['Status'].astype('category'),
+            'PL': pl.cat.codes,
+        })
+        chaves = ['Data Sessão', 'Autor', 'Status']
+        grupos = eventos.groupby(chaves, observed=True, sort=True)['PL']
+
+        celulas = grupos.size().rename('Eventos').reset_index()
+
+        # PLs distintos de cada célula, na ordem das células (mesma ordenação
+        # do groupby: data e códigos das categorias), sem os PLs ausentes
+        distintos = eventos[eventos['PL'] >= 0].drop_duplicates().sort_values([*chaves, 'PL'], kind='stable')
+        por_celula = distintos.groupby(chaves, observed=True, sort=True).size()
+        por_celula = por_celula.reindex(pd.MultiIndex.from_frame(celulas[chaves]), fill_value=0)
+        deslocamentos = np.zeros(len(celulas) + 1, dtype=np.int64)
+        np.cumsum(por_celula.to_numpy(), out=deslocamentos[1:])
+        codigos = distintos['PL'].to_numpy(dtype=np.int32)
+
+        celulas['Eventos'] = celulas['Eventos'].astype(np.int64)
+        celulas['Aprovado'] = status_aprovado(celulas['Status'])
+        celulas['Ano'] = celulas['Data Sessão'].dt.year
+        celulas['Mês'] = celulas['Data Sessão'].dt.month
+        return cls(celulas[COLUNAS_CELULA], pl.cat.categories, deslocamentos, codigos)
+
+    def fatiar(self, data_inicio=None, data_fim=None, autores=(), status=()):
+        """Sub-cubo do período (datas inclusivas) e das seleções"""
+        celulas = self.celulas
+        if data_inicio is not None or data_fim is not None:
+            ini = 0 if data_inicio is None else np.searchsorted(
+                self._datas, np.datetime64(pd.Timestamp(data_inicio), 'ns'), side='left')
+            fim = len(celulas) if data_fim is None else np.searchsorted(
+                self._datas, np.datetime64(pd.Timestamp(data_fim), 'ns'), side='right')
+            celulas = celulas.iloc[ini:fim]
+        if autores:
+            celulas = celulas[celulas['Autor'].isin(autores)]
+        if status:
+            celulas = celulas[celulas['Status'].isin(status)]
+        return CuboAgregado(celulas, self.pls, self.deslocamentos, self.codigos)
+
+    @property
+    def vazio(self):
+        return self.celulas.empty
+
+    def total_eventos(self):
+        return int(self.celulas['Eventos'].sum())
+
+    def aprovados(self):
+        return int(self.celulas['Eventos'][self.celulas['Aprovado']].sum())
+
+    def taxa_aprovacao(self):
+        """Percentual de eventos com status de aprovação"""
+        total = self.total_eventos()
+        return (self.aprovados() / total * 100) if total > 0 else 0
+
+    def codigos_pls(self):
+        """Códigos de PL das células do recorte (com repetição entre células)"""
+        posicoes = self.celulas.index.to_numpy()
+        if len(posicoes) == 0:
+            return self.codigos[:0]
+        inicios = self.deslocamentos[posicoes]
+        fins = self.deslocamentos[posicoes + 1]
+        if posicoes[-1] - posicoes[0] == len(posicoes) - 1:
+            # Células contíguas (recorte só por período): um trecho do vetor
+            return self.codigos[inicios[0]:fins[-1]]
+        tamanhos = fins - inicios
+        # Índice de cada código: início da sua célula + posição dentro dela
+        saltos = np.repeat(inicios - (np.cumsum(tamanhos) - tamanhos), tamanhos)
+        return self.codigos[saltos + np.arange(tamanhos.sum())]
+
+    def pls_unicos(self):
+        marcados = np.zeros(len(self.pls), dtype=bool)
+        marcados[self.codigos_pls()] = True
+        return int(np.count_nonzero(marcados))
+
+    def memoria(self):
+        """Bytes ocupados pelo cubo (células, categorias de PL e vetores CSR)"""
+        return int(self.celulas.memory_usage(deep=True).sum() + self.pls.memory_usage(deep=True)
+                   + self.deslocamentos.nbytes + self.codigos.nbytes)
+
+    def sessoes(self):
+        return int(self.celulas['Data Sessão'].nunique())
+
+    def primeira_sessao(self):
+        return self.celulas['Data Sessão'].min()
+
+    def ultima_sessao(self):
+        return self.celulas['Data Sessão'].max()
+
+    def indicadores(self):
+        """Indicadores principais do painel, em tipos nativos (para JSON)"""
+        mais_ativo = None
+        if not self.vazio:
+            por_autor = self.por_autor()
+            mais_ativo = {'autor': str(por_autor.index[0]), 'eventos': int(por_autor.iloc[0])}
+        return {
+            'total_eventos': self.total_eventos(),
+            'pls_unicos': self.pls_unicos(),
+            'mais_ativo': mais_ativo,
+            'taxa_aprovacao': float(self.taxa_aprovacao()),
+            'aprovados': self.aprovados(),
+            'sessoes': self.sessoes(),
+        }
+
+    def _somar(self, por):
+        return self.celulas.groupby(por, observed=True)['Eventos'].sum()
+
+    def por_autor(self):
+        """Eventos por autor, do mais ativo para o menos ativo"""
+        return self._somar('Autor').sort_values(ascending=False, kind='stable')
+
+    def por_status(self):
+        """Eventos por status (formato do value_counts)"""
+        return self._somar('Status').sort_values(ascending=False, kind='stable').rename('count')
+
+    def por_mes(self):
+        """Eventos por mês, indexados pelo primeiro dia do mês"""
+        serie = self._somar(['Ano', 'Mês'])
+        serie.index = pd.to_datetime(pd.DataFrame({
+            'year': serie.index.get_level_values('Ano'),
+            'month': serie.index.get_level_values('Mês'),
+            'day': 1
+        }))
+        return serie
+
+    def mapa_calor(self):
+        """Tabela mês × ano com a contagem de eventos"""
+        return self._somar(['Mês', 'Ano']).unstack('Ano', fill_value=0)
+
+    def aprovacao_por_autor(self, minimo=0, confianca=0.95, ordenar_por='Taxa de Aprovação (%)'):
+        """
+        Totais, aprovações, taxa, intervalo de Wilson e primeira/última
+        sessão de cada autor, numa única agregação sobre as células.
+
+        Autores com menos de `minimo` eventos são descartados. Ordenar pelo
+        limite inferior de Wilson evita que autores com poucos PLs dominem
+        o topo do ranking.
+        """
+        celulas = self.celulas
+        resumo = celulas.assign(
+            Aprovados=celulas['Eventos'].where(celulas['Aprovado'], 0)
+        ).groupby('Autor', observed=True).agg(
+            **{
+                'Total PLs': ('Eventos', 'sum'),
+                'Aprovados': ('Aprovados', 'sum'),
+                'Primeira Sessão': ('Data Sessão', 'min'),
+                'Última Sessão': ('Data Sessão', 'max'),
+            }
+        )
+        resumo.index = resumo.index.astype(str)
+        resumo = resumo[resumo['Total PLs'] >= minimo]
+
+        inferior, superior = intervalo_wilson(resumo['Aprovados'], resumo['Total PLs'], confianca)
+        resumo['Taxa de Aprovação (%)'] = resumo['Aprovados'] / resumo['Total PLs'] * 100
+        resumo['Wilson Inferior (%)'] = inferior * 100
+        resumo['Wilson Superior (%)'] = superior * 100
+        return resumo.sort_values(ordenar_por, ascending=False, kind='stable')
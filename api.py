@@ -0,0 +1,395 @@
+"""
+API JSON do observatório, sem interface
+
+Serviço HTTP local que responde com os mesmos cálculos do painel (motor de
+filtros, cubo de agregação, ciclo de vida, índice de busca, coocorrência e
+presenças), montados uma vez por versão da base e compartilhados por todos
+os pedidos.
+
+Rotas (GET). Filtros do recorte, como na barra lateral do painel: `inicio`
+e `fim` (AAAA-MM-DD, padrão: toda a base), `autor` e `status` (repetíveis)
+e `pl` (trecho do número).
+
+    /api/versao                versão da base e tamanho
+    /api/indicadores           indicadores principais do recorte
+    /api/vereadores            aprovação (com Wilson) e presença por vereador; `minimo`, `ordenar`
+    /api/vereador?nome=        resumo, status e eventos por mês de um vereador no recorte
+    /api/pl?numero=            ciclo de vida e histórico de um PL
+    /api/pls/parados?dias=     PLs sem desfecho e sem menção há pelo menos `dias` dias
+    /api/busca?q=              busca de PL, autor ou status; `pagina`, `por_pagina`
+    /api/parcerias             pares de vereadores nas mesmas sessões; `medida`, `k`, `minimo`
+
+Cada resposta fica num cache LRU pela assinatura da consulta (rota e
+parâmetros normalizados, mais a versão da base), já codificada em JSON. O
+ETag é o hash dessa assinatura: um If-None-Match igual recebe 304 sem
+recalcular nem reenviar o corpo, mesmo depois que a resposta saiu do cache.
+A versão (tamanho e mtime dos arquivos da base, ver origem.versao_base) é
+conferida a cada pedido; quando muda, as estruturas são remontadas e as
+assinaturas (e ETags) antigas deixam de valer.
+
+Uso:
+    python -m api [--host 127.0.0.1] [--porta 8502] [--log]
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import traceback
+from dataclasses import dataclass
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from agregacoes import CuboAgregado
+from busca import IndiceBusca
+from ciclo_vida import CicloVida
+from dados import carregar_disponivel
+from filtros import MotorFiltros
+from origem import BASES, versao_base
+from parcerias import MEDIDAS, Coocorrencia
+
+PORTA_PADRAO = 8502
+TAMANHO_CACHE = 512
+POR_PAGINA_MAXIMO = 100
+ORDENACOES = {'taxa': 'Taxa de Aprovação (%)', 'wilson': 'Wilson Inferior (%)'}
+
+# Parâmetros de cada rota (os demais são ignorados e não entram na assinatura)
+FILTROS = ('inicio', 'fim', 'autor', 'status', 'pl')
+REPETIVEIS = {'autor', 'status'}
+
+
+class ErroConsulta(Exception):
+    """Pedido inválido ou recurso inexistente (vira a resposta de erro com o status dado)"""
+
+    def __init__(self, mensagem, status=400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class Resposta:
+    status: int
+    corpo: bytes
+    etag: str = None
+
+
+def _valor(valor):
+    """Valor para JSON: datas como AAAA-MM-DD, ausentes como null, tipos do numpy como nativos"""
+    if isinstance(valor, (list, tuple, np.ndarray)):
+        return [_valor(v) for v in valor]
+    if valor is None or pd.isna(valor):
+        return None
+    if isinstance(valor, date):
+        return valor.strftime('%Y-%m-%d')
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def _registro(serie):
+    return {str(chave): _valor(valor) for chave, valor in serie.items()}
+
+
+def _registros(df):
+    colunas = [str(c) for c in df.columns]
+    return [dict(zip(colunas, map(_valor, linha))) for linha in df.itertuples(index=False, name=None)]
+
+
+def _um(parametros, nome, padrao=None):
+    valores = parametros.get(nome)
+    return valores[-1] if valores else padrao
+
+
+def _inteiro(parametros, nome, padrao, minimo=None, maximo=None):
+    bruto = _um(parametros, nome)
+    if bruto is None:
+        return padrao
+    try:
+        valor = int(bruto)
+    except ValueError:
+        raise ErroConsulta(f"'{nome}' deve ser um número inteiro") from None
+    if minimo is not None and valor < minimo or maximo is not None and valor > maximo:
+        raise ErroConsulta(f"'{nome}' fora do intervalo [{minimo}, {maximo}]")
+    return valor
+
+
+class Observatorio:
+    """Estruturas do painel montadas sobre uma versão da base"""
+
+    def __init__(self, df, presencas, versao):
+        self.versao = versao
+        self.motor = MotorFiltros(df)
+        self.df = self.motor.df
+        self.presencas = presencas
+        self.cubo = CuboAgregado.montar(self.df)
+        self.ciclo_vida = CicloVida(self.df)
+        self.indice = IndiceBusca(self.df)
+        self.data_min = self.df['Data Sessão'].iloc[0].date() if len(self.df) else None
+        self.data_max = self.df['Data Sessão'].iloc[-1].date() if len(self.df) else None
+
+    def filtro(self, parametros):
+        """(inicio, fim, autores, status, pl) a partir dos parâmetros, com o período padrão da base"""
+        try:
+            inicio = date.fromisoformat(_um(parametros, 'inicio')) if 'inicio' in parametros else self.data_min
+            fim = date.fromisoformat(_um(parametros, 'fim')) if 'fim' in parametros else self.data_max
+        except ValueError:
+            raise ErroConsulta("'inicio' e 'fim' devem estar no formato AAAA-MM-DD") from None
+        if inicio is None:
+            raise ErroConsulta('Base vazia', 404)
+        return (inicio, fim, tuple(sorted(parametros.get('autor', []))),
+                tuple(sorted(parametros.get('status', []))), _um(parametros, 'pl', ''))
+
+    def cubo_do_recorte(self, filtro):
+        """Cubo do recorte; com o filtro de PL, agrega só as linhas filtradas (como no painel)"""
+        inicio, fim, autores, status, pl = filtro
+        if pl:
+            return CuboAgregado.montar(self.motor.filtrar(*filtro))
+        return self.cubo.fatiar(inicio, fim, autores, status)
+
+
+class ServicoObservatorio:
+    """Rotas, cache de respostas por assinatura da consulta e troca de versão da base"""
+
+    def __init__(self, arquivos=BASES, tamanho_cache=TAMANHO_CACHE):
+        self.arquivos = arquivos
+        self._cache = LRUCache(maxsize=tamanho_cache)
+        self._trava = threading.Lock()
+        self._trava_carga = threading.Lock()
+        self._observatorio = None
+        self.acertos = 0
+        self.faltas = 0
+        self.rotas = {
+            '/api/versao': ((), self._versao),
+            '/api/indicadores': (FILTROS, self._indicadores),
+            '/api/vereadores': (FILTROS + ('minimo', 'ordenar'), self._vereadores),
+            '/api/vereador': (FILTROS + ('nome',), self._vereador),
+            '/api/pl': (('numero',), self._pl),
+            '/api/pls/parados': (('dias',), self._parados),
+            '/api/busca': (('q', 'pagina', 'por_pagina'), self._busca),
+            '/api/parcerias': (FILTROS + ('medida', 'k', 'minimo'), self._parcerias),
+        }
+
+    def observatorio(self):
+        """Estruturas da versão atual da base, remontadas (uma vez) quando a versão muda"""
+        versao = versao_base(self.arquivos)
+        atual = self._observatorio
+        if atual is not None and atual.versao == versao:
+            return atual
+        with self._trava_carga:
+            if self._observatorio is None or self._observatorio.versao != versao:
+                dados = carregar_disponivel(self.arquivos)
+                if dados is None:
+                    raise ErroConsulta('Base de dados não encontrada', 503)
+                self._observatorio = Observatorio(*dados, versao)
+                with self._trava:
+                    self._cache.clear()
+            return self._observatorio
+
+    def responder(self, rota, parametros, etag_cliente=None):
+        """Resposta para a rota e os parâmetros (dict de listas, como o parse_qs)"""
+        try:
+            if rota not in self.rotas:
+                raise ErroConsulta(f'Rota desconhecida: {rota}', 404)
+            aceitos, calcular = self.rotas[rota]
+            observatorio = self.observatorio()
+
+            # Assinatura: versão, rota e parâmetros aceitos, em forma canônica
+            consulta = {nome: sorted(parametros[nome]) if nome in REPETIVEIS else parametros[nome][-1:]
+                        for nome in aceitos if parametros.get(nome)}
+            assinatura = json.dumps([observatorio.versao, rota, sorted(consulta.items())], ensure_ascii=False)
+            etag = '"' + hashlib.sha256(assinatura.encode()).hexdigest()[:32] + '"'
+            if etag_cliente and etag in (e.strip() for e in etag_cliente.split(',')):
+                return Resposta(304, b'', etag)
+
+            with self._trava:
+                corpo = self._cache.get(assinatura)
+                if corpo is not None:
+                    self.acertos += 1
+            if corpo is None:
+                corpo = json.dumps(calcular(observatorio, consulta), ensure_ascii=False,
+                                   allow_nan=False).encode()
+                with self._trava:
+                    self._cache[assinatura] = corpo
+                    self.faltas += 1
+            return Resposta(200, corpo, etag)
+        except ErroConsulta as e:
+            return Resposta(e.status, json.dumps({'erro': str(e)}, ensure_ascii=False).encode())
+
+    # --- Rotas ---
+
+    def _versao(self, obs, p):
+        return {
+            'versao': obs.versao,
+            'registros': len(obs.df),
+            'pls': len(obs.ciclo_vida.tabela),
+            'primeira_sessao': _valor(obs.data_min),
+            'ultima_sessao': _valor(obs.data_max),
+        }
+
+    def _indicadores(self, obs, p):
+        filtro = obs.filtro(p)
+        return {
+            'periodo': {'inicio': _valor(filtro[0]), 'fim': _valor(filtro[1])},
+            'registros_base': len(obs.df),
+            **obs.cubo_do_recorte(filtro).indicadores(),
+        }
+
+    def _vereadores(self, obs, p):
+        filtro = obs.filtro(p)
+        ordenar = _um(p, 'ordenar', 'wilson')
+        if ordenar not in ORDENACOES:
+            raise ErroConsulta(f"'ordenar' deve ser um de {sorted(ORDENACOES)}")
+        aprovacao = obs.cubo_do_recorte(filtro).aprovacao_por_autor(
+            minimo=_inteiro(p, 'minimo', 0, minimo=0), ordenar_por=ORDENACOES[ordenar])
+        presenca = obs.presencas.periodo(filtro[0], filtro[1]).taxa_presenca()
+        tabela = aprovacao.join(presenca, how='left').rename_axis('Vereador').reset_index()
+        return {'vereadores': _registros(tabela)}
+
+    def _vereador(self, obs, p):
+        nome = _um(p, 'nome')
+        if not nome:
+            raise ErroConsulta("Informe o 'nome' do vereador")
+        cubo = obs.cubo_do_recorte(obs.filtro(p))
+        resumo = cubo.aprovacao_por_autor()
+        if nome not in resumo.index:
+            raise ErroConsulta(f'Vereador sem PLs no recorte: {nome}', 404)
+        cubo_vereador = cubo.fatiar(autores=[nome])
+        por_mes = cubo_vereador.por_mes()
+        return {
+            'vereador': nome,
+            'resumo': _registro(resumo.loc[nome]),
+            'por_status': _registros(cubo_vereador.por_status().rename('Eventos').rename_axis('Status').reset_index()),
+            'por_mes': [{'Mês': _valor(mes), 'Eventos': _valor(n)} for mes, n in por_mes.items()],
+        }
+
+    def _pl(self, obs, p):
+        numero = _um(p, 'numero', '').strip()
+        if not numero:
+            raise ErroConsulta("Informe o 'numero' do PL")
+        if numero not in obs.ciclo_vida:
+            raise ErroConsulta(f'PL não encontrado: {numero}', 404)
+        resumo = obs.ciclo_vida.resumo(numero).drop(['Início', 'Fim'])
+        eventos = obs.df.iloc[obs.ciclo_vida.eventos(numero)][['Data Sessão', 'Status', 'Fonte']]
+        return {'pl': numero, 'resumo': _registro(resumo), 'historico': _registros(eventos)}
+
+    def _parados(self, obs, p):
+        dias = _inteiro(p, 'dias', 90, minimo=0)
+        parados = obs.ciclo_vida.parados(dias=dias)[['Autor', 'Status Atual', 'Última Sessão', 'Dias sem Menção']]
+        return {'dias': dias, 'pls': _registros(parados.rename_axis('PL').reset_index())}
+
+    def _busca(self, obs, p):
+        termo = _um(p, 'q', '').strip()
+        if not termo:
+            raise ErroConsulta("Informe o termo de busca 'q'")
+        busca = obs.indice.buscar(termo, pagina=_inteiro(p, 'pagina', 1, minimo=1),
+                                  por_pagina=_inteiro(p, 'por_pagina', 20, minimo=1, maximo=POR_PAGINA_MAXIMO))
+        tabela = obs.ciclo_vida.tabela
+        resultados = []
+        for resultado in busca.resultados:
+            resumo = tabela.loc[resultado.pl]
+            resultados.append({
+                'PL': resultado.pl,
+                'Autor': resumo['Autor'],
+                'Status Atual': resumo['Status Atual'],
+                'Primeira Menção': _valor(resumo['Primeira Sessão']),
+                'Última Menção': _valor(resumo['Última Sessão']),
+                'Menções Encontradas': len(resultado.linhas),
+                'Pontuação': resultado.pontuacao,
+            })
+        return {
+            'termo': termo,
+            'pagina': busca.pagina,
+            'paginas': busca.paginas,
+            'total_pls': busca.total_pls,
+            'total_linhas': busca.total_linhas,
+            'resultados': resultados,
+        }
+
+    def _parcerias(self, obs, p):
+        medida = _um(p, 'medida', 'Frequência')
+        if medida not in MEDIDAS:
+            raise ErroConsulta(f"'medida' deve ser uma de {MEDIDAS}")
+        coocorrencia = Coocorrencia.do_cubo(obs.cubo_do_recorte(obs.filtro(p)))
+        pares = coocorrencia.principais(k=_inteiro(p, 'k', 10, minimo=1, maximo=1000), medida=medida,
+                                        minimo=_inteiro(p, 'minimo', 1, minimo=1))
+        return {'medida': medida, 'pares': _registros(pares)}
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    """Pedidos HTTP para o serviço (conexões persistentes, HTTP/1.1)"""
+
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em escritas separadas: sem o Nagle, o corpo
+    # não espera o ACK atrasado do cliente (~40 ms por resposta)
+    disable_nagle_algorithm = True
+    servico = None
+    registrar = False
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        rota = partes.path.rstrip('/') or '/'
+        try:
+            resposta = self.servico.responder(rota, parse_qs(partes.query), self.headers.get('If-None-Match'))
+        except Exception:
+            # Falha inesperada no cálculo: o cliente recebe um erro em JSON
+            # (e a conexão continua utilizável) em vez de vê-la cair sem resposta
+            traceback.print_exc()
+            resposta = Resposta(500, json.dumps({'erro': 'Erro interno do servidor'}, ensure_ascii=False).encode())
+        self.send_response(resposta.status)
+        if resposta.etag:
+            self.send_header('ETag', resposta.etag)
+            # O cliente pode guardar, mas deve revalidar (a base pode ter mudado)
+            self.send_header('Cache-Control', 'no-cache')
+        if resposta.status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(resposta.corpo)))
+        self.end_headers()
+        self.wfile.write(resposta.corpo)
+
+    def log_message(self, formato, *args):
+        if self.registrar:
+            super().log_message(formato, *args)
+
+
+class ServidorAPI(ThreadingHTTPServer):
+    daemon_threads = True
+    # Fila de conexões maior que a padrão (5): rajadas de clientes não
+    # perdem o SYN (que só seria reenviado 1 s depois)
+    request_queue_size = 128
+
+
+def criar_servidor(host='127.0.0.1', porta=PORTA_PADRAO, servico=None, registrar=False):
+    """Servidor HTTP (uma thread por conexão) com o serviço dado ou um novo"""
+    manipulador = type('Manipulador', (ManipuladorAPI,), {
+        'servico': servico or ServicoObservatorio(),
+        'registrar': registrar,
+    })
+    return ServidorAPI((host, porta), manipulador)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API JSON do observatório (indicadores, vereadores, PLs, busca)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--log', action='store_true', help='registra cada pedido no stderr')
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args.host, args.porta, registrar=args.log)
+    # Carga antecipada: o primeiro pedido não paga a montagem das estruturas
+    servidor.RequestHandlerClass.servico.observatorio()
+    print(f"API do observatório em http://{args.host}:{servidor.server_port}/api/indicadores", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,19 @@
+import calendar
+import functools
+import os
+from datetime import date, datetime
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import numpy as np
+
+import instantaneo
+from instrumentacao import perfil_pedido, tempos_da_sessao
+from origem import localizar_base
+
+# Partida rápida: até a primeira tela (barra lateral e indicadores) só o
+# Streamlit e a biblioteca padrão. Com o instantâneo de partida gravado ao
+# lado da base (instantaneo.py), limites do período, autores, status e
+# indicadores das seleções rápidas vêm dele; pandas, a base e os módulos
+# das abas vêm depois, e o plotly só na primeira figura montada
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -63,75 +72,163 @@ st.markdown("""
 st.markdown('<h1 class="main-header">🏛️ Observatório Legislativo de Teresópolis</h1>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Sistema de Monitoramento de Projetos de Lei - Câmara Municipal</p>', unsafe_allow_html=True)
 
+
 # --- Função para carregar dados ---
-@st.cache_data
-def carregar_dados():
-    try:
-        # Tenta carregar o arquivo completo primeiro
-        df = pd.read_csv('base_observatorio_teresopolis_COMPLETA.csv')
-    except:
-        try:
-            # Se não encontrar, tenta o arquivo básico
-            df = pd.read_csv('base_observatorio_teresopolis.csv')
-        except FileNotFoundError:
-            return None
-
-    # Garante que a coluna de data seja tratada como data
-    df['Data Sessão'] = pd.to_datetime(df['Data Sessão'], errors='coerce')
-
-    # Limpa dados
-    df['PL'] = df['PL'].astype(str).str.strip()
-    df['Autor'] = df['Autor'].astype(str).str.strip()
-    df['Status'] = df['Status'].astype(str).str.strip()
-
-    # Remove registros com datas inválidas ou muito antigas
-    df = df[df['Data Sessão'].notna()]
-    df = df[df['Data Sessão'] >= '2024-01-01']
-
-    # Adiciona colunas auxiliares
-    df['Ano'] = df['Data Sessão'].dt.year
-    df['Mês'] = df['Data Sessão'].dt.month
-    df['Mês_Nome'] = df['Data Sessão'].dt.strftime('%B')
-    df['Trimestre'] = df['Data Sessão'].dt.quarter
-
-    return df
+# cache_resource devolve o mesmo objeto para todas as sessões e reruns (sem a
+# cópia profunda do cache_data); a base deve ser tratada como somente leitura.
+# Com a base particionada, base, motor, presenças e cubo ficam no cache por
+# período de carga (meses inteiros); só os mais recentes são mantidos
+PERIODOS_EM_CACHE = 4
+
+
+def periodo_de_carga(data_inicio, data_fim, data_min, data_max):
+    """
+    Meses inteiros (primeiro e último dia) a ler da base particionada para o
+    período da barra lateral; None (a base inteira) para uma base CSV ou um
+    período que cobre a base toda
+    """
+    inicio, fim = min(data_inicio, data_fim), max(data_inicio, data_fim)
+    origem = localizar_base()
+    if origem is None or origem[0] != 'particionada' or (inicio <= data_min and fim >= data_max):
+        return None
+    return date(inicio.year, inicio.month, 1), date(fim.year, fim.month, calendar.monthrange(fim.year, fim.month)[1])
+
+
+@st.cache_resource(max_entries=PERIODOS_EM_CACHE)
+def carregar_dados(periodo=None):
+    # Tenta carregar o arquivo completo primeiro; se não encontrar, o básico.
+    # A base particionada (extrator --particionado), se existir, tem
+    # preferência: só as partições do período de carga são lidas (sem ele,
+    # as partições a partir de DATA_MINIMA).
+    # Devolve (base de eventos, tabela de presenças, versão da base lida)
+    import pandas as pd
+    from dados import carregar_disponivel
+    from origem import versao_base
+
+    # Copy-on-write: a base carregada é compartilhada entre todas as sessões e
+    # os recortes derivados dela não podem alterá-la nem copiá-la à toa
+    pd.set_option('mode.copy_on_write', True)
+
+    versao = versao_base()
+    dados = carregar_disponivel(periodo=periodo)
+    return (*dados, versao) if dados is not None else None
+
+@st.cache_resource(max_entries=PERIODOS_EM_CACHE)
+def carregar_motor(periodo=None):
+    from filtros import MotorFiltros
+
+    dados = carregar_dados(periodo)
+    return MotorFiltros(dados[0]) if dados is not None else None
+
+@st.cache_resource(max_entries=PERIODOS_EM_CACHE)
+def carregar_presencas(periodo=None):
+    return carregar_dados(periodo)[1]
+
+@st.cache_resource(max_entries=PERIODOS_EM_CACHE)
+def carregar_cubo(periodo=None):
+    from agregacoes import CuboAgregado
+
+    return CuboAgregado.montar(carregar_motor(periodo).df)
+
+# Índice de busca e ciclo de vida são sempre da base inteira (a busca e o
+# histórico de um PL não seguem o período da barra lateral)
+@st.cache_resource
+def carregar_indice_busca():
+    from busca import IndiceBusca
+
+    return IndiceBusca(carregar_motor().df)
+
+@st.cache_resource
+def carregar_ciclo_vida():
+    from ciclo_vida import CicloVida
+
+    return CicloVida(carregar_motor().df)
+
+@st.cache_resource
+def carregar_cache_figuras():
+    from figuras import CacheFiguras
+
+    return CacheFiguras()
+
+@st.cache_resource
+def carregar_cache_exportacao():
+    from exportacao import CacheExportacao
+
+    return CacheExportacao()
+
+@st.cache_resource
+def carregar_instantaneo():
+    # Instantâneo de partida da versão atual da base (None se não houver)
+    return instantaneo.ler()
+
+@st.cache_resource
+def salvar_instantaneo():
+    # Partida sem instantâneo válido: grava um a partir da base já carregada,
+    # uma vez por processo, para os próximos processos
+    return instantaneo.salvar(carregar_motor(), carregar_cubo(), carregar_dados()[2])
+
+# Tempo de cálculo de cada seção, acumulado por sessão do navegador. No modo
+# de perfil (OBSERVATORIO_PERFIL=1 ou ?perfil=1), também subseções, memória,
+# registro em JSON lines e captura de pilhas de uma interação
+PERFIL = perfil_pedido(st.query_params)
+tempos = tempos_da_sessao(st.session_state, PERFIL)
+tempos.nova_rodada()
+if PERFIL:
+    tempos.iniciar_captura()
 
 # --- Carregamento dos Dados ---
-df = carregar_dados()
+# Motores de filtros da rodada por período de carga (None: base inteira): a
+# base é carregada (e medida) na primeira vez que a rodada precisa dela,
+# antes ou depois da primeira tela
+motores = {}
+
+
+def carregar_base(periodo=None):
+    if periodo not in motores:
+        with tempos.medir('Carga dos dados'):
+            carregado = carregar_motor(periodo)
+
+            if carregado is None:
+                st.error("⚠️ Arquivo de dados não encontrado!")
+                st.info("Por favor, certifique-se de que o arquivo CSV está na mesma pasta que este script.")
+                st.stop()
+
+            # Presenças do mesmo período, montadas junto com a base
+            carregar_presencas(periodo)
+        motores[periodo] = carregado
+    return motores[periodo]
 
-if df is None:
-    st.error("⚠️ Arquivo de dados não encontrado!")
-    st.info("Por favor, certifique-se de que o arquivo CSV está na mesma pasta que este script.")
-    st.stop()
+
+# Sem instantâneo, os limites do período (e o instantâneo gravado ao fim da
+# rodada) vêm da base inteira
+inicial = carregar_instantaneo()
+if inicial is None:
+    carregar_base()
+
+RESULTADOS_POR_PAGINA = 20
+# Modo clássico (st.tabs): todas as abas são calculadas a cada rerun
+TODAS_AS_ABAS = os.environ.get('OBSERVATORIO_TODAS_ABAS') == '1'
 
 # --- Sidebar com Filtros ---
-with st.sidebar:
+with st.sidebar, tempos.medir('Filtros'):
     st.header('🔍 Filtros de Pesquisa')
 
     # Filtro de período com slider
     st.subheader('📅 Período')
-    data_min = df['Data Sessão'].min().date()
-    data_max = df['Data Sessão'].max().date()
+    if inicial is not None:
+        data_min, data_max = instantaneo.limites(inicial)
+    else:
+        # Base ordenada pela data da sessão
+        datas = carregar_base().df['Data Sessão']
+        data_min, data_max = datas.iloc[0].date(), datas.iloc[-1].date()
 
     # Opção de seleção rápida
     periodo_rapido = st.selectbox(
         'Seleção rápida:',
-        ['Personalizado', 'Últimos 30 dias', 'Últimos 3 meses', 'Últimos 6 meses', 'Todo o período']
+        ['Personalizado', *instantaneo.PERIODOS_RAPIDOS]
     )
 
-    if periodo_rapido == 'Últimos 30 dias':
-        data_inicio = data_max - timedelta(days=30)
-        data_fim = data_max
-    elif periodo_rapido == 'Últimos 3 meses':
-        data_inicio = data_max - timedelta(days=90)
-        data_fim = data_max
-    elif periodo_rapido == 'Últimos 6 meses':
-        data_inicio = data_max - timedelta(days=180)
-        data_fim = data_max
-    elif periodo_rapido == 'Todo o período':
-        data_inicio = data_min
-        data_fim = data_max
-    else:  # Personalizado
+    if periodo_rapido == 'Personalizado':
         data_inicio, data_fim = st.date_input(
             'Selecione o período:',
             value=(data_min, data_max),
@@ -139,15 +236,24 @@ with st.sidebar:
             max_value=data_max,
             format="DD/MM/YYYY"
         )
+    else:
+        data_inicio, data_fim = instantaneo.intervalo_rapido(periodo_rapido, data_min, data_max)
 
-    # Aplicar filtro de data
-    df_filtrado = df[(df['Data Sessão'].dt.date >= data_inicio) &
-                     (df['Data Sessão'].dt.date <= data_fim)]
+    # Com a base particionada, só os meses do período são lidos
+    periodo = periodo_de_carga(data_inicio, data_fim, data_min, data_max)
+
+    # Autores, status e indicadores do período: pré-calculados no instantâneo
+    # para as seleções rápidas, senão calculados sobre a base
+    pre_calculado = instantaneo.periodo(inicial, data_inicio, data_fim)
+    if pre_calculado is not None:
+        autores_periodo, status_periodo = pre_calculado['autores'], pre_calculado['status']
+    else:
+        autores_periodo, status_periodo = carregar_base(periodo).opcoes(data_inicio, data_fim)
 
     # Filtro de autores com busca
     st.subheader('👤 Autores')
     busca_autor = st.text_input('Buscar autor:', '')
-    autores = sorted(df_filtrado['Autor'].unique())
+    autores = autores_periodo
 
     if busca_autor:
         autores = [a for a in autores if busca_autor.lower() in a.lower()]
@@ -160,7 +266,7 @@ with st.sidebar:
 
     # Filtro de status
     st.subheader('📊 Status')
-    status_disponiveis = sorted(df_filtrado['Status'].unique())
+    status_disponiveis = status_periodo
     status_selecionado = st.multiselect(
         'Selecione o(s) Status:',
         options=status_disponiveis,
@@ -171,136 +277,210 @@ with st.sidebar:
     st.subheader('📋 Projeto de Lei')
     pl_especifico = st.text_input('Digite o número do PL (ex: 123/2025):', '')
 
-    # Aplicação dos filtros
-    if autor_selecionado:
-        df_filtrado = df_filtrado[df_filtrado['Autor'].isin(autor_selecionado)]
-    if status_selecionado:
-        df_filtrado = df_filtrado[df_filtrado['Status'].isin(status_selecionado)]
-    if pl_especifico:
-        df_filtrado = df_filtrado[df_filtrado['PL'].str.contains(pl_especifico, case=False, na=False)]
-
     # Botão de reset
     if st.button('🔄 Limpar Filtros'):
         st.rerun()
 
+
 # --- Métricas Principais (KPIs) ---
-st.header('📊 Indicadores Principais')
+def mostrar_indicadores(indicadores, registros):
+    """Linha de indicadores a partir de CuboAgregado.indicadores() (ou do instantâneo)"""
+    st.header('📊 Indicadores Principais')
 
-col1, col2, col3, col4, col5 = st.columns(5)
+    col1, col2, col3, col4, col5 = st.columns(5)
 
-with col1:
-    total_eventos = len(df_filtrado)
-    st.metric(
-        label="📝 Total de Eventos",
-        value=f"{total_eventos:,}",
-        delta=f"{total_eventos - len(df)} registros filtrados" if total_eventos < len(df) else None
-    )
+    with col1:
+        total_eventos = indicadores['total_eventos']
+        st.metric(
+            label="📝 Total de Eventos",
+            value=f"{total_eventos:,}",
+            delta=f"{total_eventos - registros} registros filtrados" if total_eventos < registros else None
+        )
 
-with col2:
-    pls_unicos = df_filtrado['PL'].nunique()
-    st.metric(
-        label="📋 PLs Únicos",
-        value=f"{pls_unicos:,}"
-    )
+    with col2:
+        st.metric(
+            label="📋 PLs Únicos",
+            value=f"{indicadores['pls_unicos']:,}"
+        )
 
-with col3:
-    if not df_filtrado.empty:
-        vereador_mais_ativo = df_filtrado['Autor'].value_counts().index[0]
-        qtd_projetos = df_filtrado['Autor'].value_counts().values[0]
+    with col3:
+        mais_ativo = indicadores['mais_ativo']
+        if mais_ativo is not None:
+            vereador_mais_ativo = mais_ativo['autor']
+            st.metric(
+                label="🏆 Mais Ativo",
+                value=vereador_mais_ativo.split()[0] if len(vereador_mais_ativo.split()) > 0 else vereador_mais_ativo,
+                delta=f"{mais_ativo['eventos']} PLs"
+            )
+        else:
+            st.metric(label="🏆 Mais Ativo", value="N/A")
+
+    with col4:
         st.metric(
-            label="🏆 Mais Ativo",
-            value=vereador_mais_ativo.split()[0] if len(vereador_mais_ativo.split()) > 0 else vereador_mais_ativo,
-            delta=f"{qtd_projetos} PLs"
+            label="✅ Taxa de Aprovação",
+            value=f"{indicadores['taxa_aprovacao']:.1f}%",
+            delta=f"{indicadores['aprovados']} aprovados"
         )
-    else:
-        st.metric(label="🏆 Mais Ativo", value="N/A")
-
-with col4:
-    aprovados = df_filtrado[df_filtrado['Status'].str.contains('Aprovado', case=False, na=False)]
-    taxa_aprovacao = (len(aprovados) / len(df_filtrado) * 100) if len(df_filtrado) > 0 else 0
-    st.metric(
-        label="✅ Taxa de Aprovação",
-        value=f"{taxa_aprovacao:.1f}%",
-        delta=f"{len(aprovados)} aprovados"
-    )
 
-with col5:
-    sessoes_unicas = df_filtrado['Data Sessão'].dt.date.nunique()
-    st.metric(
-        label="📅 Sessões",
-        value=f"{sessoes_unicas}",
-        delta="no período"
-    )
+    with col5:
+        st.metric(
+            label="📅 Sessões",
+            value=f"{indicadores['sessoes']}",
+            delta="no período"
+        )
+
+
+# Sem autor, status ou PL selecionados, a seleção rápida tem os indicadores
+# prontos no instantâneo: a primeira tela sai antes da carga da base
+indicadores_prontos = (pre_calculado is not None and not autor_selecionado
+                       and not status_selecionado and not pl_especifico)
+if indicadores_prontos:
+    with tempos.medir('Indicadores'):
+        mostrar_indicadores(pre_calculado['indicadores'], inicial['registros'])
+
+# --- Base e módulos das abas (depois da primeira tela) ---
+motor = carregar_base(periodo)
+
+import pandas as pd
+
+from agregacoes import CuboAgregado
+from exportacao import FORMATOS, LIMITE_LINHAS_XLSX
+from figuras import ModuloAdiado, agrupar_serie
+from historico import CORES_STATUS, FORMATO_DATA, quadro_resultados, renderizar_historico
+from parcerias import MEDIDAS, Coocorrencia
+
+# Importado na primeira figura montada (as do cache não precisam dele)
+px = ModuloAdiado('plotly.express')
+
+# Total de registros da base inteira (a do motor pode ser só do período)
+registros = inicial['registros'] if inicial is not None else len(carregar_base().df)
+presencas = carregar_presencas(periodo)
+figuras = carregar_cache_figuras()
+exportacoes = carregar_cache_exportacao()
+
+# Aplicação dos filtros (memorizada por combinação de filtros)
+with tempos.detalhe('Aplicação dos filtros'):
+    df_filtrado = motor.filtrar(data_inicio, data_fim, autor_selecionado, status_selecionado, pl_especifico)
+
+# Assinatura do filtro: chave dos resultados memorizados de cada aba
+filtro = (data_inicio, data_fim, frozenset(autor_selecionado), frozenset(status_selecionado), pl_especifico)
+
+# Cubo do recorte para KPIs e gráficos. O número do PL não é dimensão do
+# cubo: com esse filtro ativo, agrega apenas as linhas já filtradas
+with tempos.detalhe('Cubo do recorte'):
+    cubo = motor.memorizar(('cubo', filtro), lambda: (
+        CuboAgregado.montar(df_filtrado) if pl_especifico
+        else carregar_cubo(periodo).fatiar(data_inicio, data_fim, autor_selecionado, status_selecionado)
+    ))
+
+if not indicadores_prontos:
+    with tempos.medir('Indicadores'):
+        mostrar_indicadores(cubo.indicadores(), registros)
+
+if inicial is None:
+    with tempos.detalhe('Instantâneo de partida'):
+        salvar_instantaneo()
 
 # --- Separador ---
 st.divider()
 
 # --- Abas principais ---
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-    "📊 Dashboard", "📋 Dados Detalhados", "👥 Análise por Vereador",
-    "📈 Linha do Tempo", "🔍 Busca de PL", "📊 Estatísticas Avançadas"
-])
+# Cada aba é um fragmento: mudar um widget dentro dela reexecuta só a aba.
+# Com o navegador, só a aba escolhida é calculada a cada rerun
+def secao(nome):
+    """Executa a aba como fragmento, medindo o tempo de cada execução"""
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def executar(*args):
+            tempos = st.session_state['tempos_secoes']
+            # Reexecução só da aba: a captura pedida no modo de perfil fica aqui
+            with tempos.captura(nome), tempos.medir(nome):
+                funcao(*args)
+        return st.fragment(executar)
+    return decorar
+
+
+def memorizado(filtro, nome, calcular, *parametros):
+    """Resultado de uma aba para o filtro (e parâmetros), no cache LRU do motor"""
+    return motor.memorizar(('aba', nome, filtro, *parametros), calcular)
+
+
+def grafico(nome, dados, construir, *parametros):
+    """Figura do cache (ou montada agora) e enviada; no modo de perfil, cada etapa é medida"""
+    tempos = st.session_state['tempos_secoes']
+    with tempos.detalhe(f'Figura: {nome}'):
+        fig = figuras.figura(nome, dados, construir, *parametros)
+    with tempos.detalhe(f'Envio: {nome}'):
+        st.plotly_chart(fig, use_container_width=True)
+
 
 # --- Tab 1: Dashboard ---
-with tab1:
+@secao("📊 Dashboard")
+def aba_dashboard(filtro, cubo, df_filtrado):
+    if not cubo.vazio:
+        df_status, df_mes, top_vereadores = memorizado(filtro, 'dashboard', lambda: (
+            cubo.por_status().reset_index(), agrupar_serie(cubo.por_mes()), cubo.por_autor().head(10)
+        ))
+        df_mes, nivel_mes = df_mes
+
     col1, col2 = st.columns(2)
 
     with col1:
         # Gráfico de PLs por Status
         st.subheader('📊 Distribuição por Status')
-        if not df_filtrado.empty:
-            fig_status = px.pie(
-                df_filtrado['Status'].value_counts().reset_index(),
-                values='count',
-                names='Status',
-                title='Distribuição de PLs por Status',
-                color_discrete_map={
-                    'Aprovado (Votação Simbólica)': '#2ecc71',
-                    'Em Discussão': '#f39c12',
-                    'Não identificado': '#95a5a6',
-                    'Encaminhado para Comissão': '#3498db',
-                    'Rejeitado': '#e74c3c'
-                }
-            )
-            fig_status.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig_status, use_container_width=True)
+        if not cubo.vazio:
+            def montar_status():
+                fig = px.pie(
+                    df_status,
+                    values='count',
+                    names='Status',
+                    title='Distribuição de PLs por Status',
+                    color_discrete_map=CORES_STATUS
+                )
+                fig.update_traces(textposition='inside', textinfo='percent+label')
+                return fig
+
+            grafico('status', df_status, montar_status)
 
     with col2:
         # Gráfico de PLs por Mês
         st.subheader('📅 Evolução Temporal')
-        if not df_filtrado.empty:
-            df_mes = df_filtrado.groupby(df_filtrado['Data Sessão'].dt.to_period('M')).size()
-            df_mes.index = df_mes.index.to_timestamp()
-
-            fig_temporal = px.line(
-                x=df_mes.index,
-                y=df_mes.values,
-                title='PLs por Mês',
-                labels={'x': 'Mês', 'y': 'Quantidade de PLs'}
-            )
-            fig_temporal.update_traces(mode='lines+markers')
-            fig_temporal.update_layout(showlegend=False)
-            st.plotly_chart(fig_temporal, use_container_width=True)
+        if not cubo.vazio:
+            # Períodos longos em trimestres, semestres ou anos
+            def montar_temporal():
+                fig = px.line(
+                    x=df_mes.index,
+                    y=df_mes.values,
+                    title=f'PLs por {nivel_mes}',
+                    labels={'x': nivel_mes, 'y': 'Quantidade de PLs'}
+                )
+                fig.update_traces(mode='lines+markers')
+                fig.update_layout(showlegend=False)
+                return fig
+
+            grafico('temporal', df_mes, montar_temporal, nivel_mes)
 
     # Top 10 Vereadores
     st.subheader('🏆 Top 10 Vereadores Mais Ativos')
-    if not df_filtrado.empty:
-        top_vereadores = df_filtrado['Autor'].value_counts().head(10)
-
-        fig_bar = px.bar(
-            x=top_vereadores.values,
-            y=top_vereadores.index,
-            orientation='h',
-            title='Projetos de Lei por Vereador',
-            labels={'x': 'Quantidade de PLs', 'y': 'Vereador'},
-            color=top_vereadores.values,
-            color_continuous_scale='viridis'
-        )
-        fig_bar.update_layout(showlegend=False, height=400)
-        st.plotly_chart(fig_bar, use_container_width=True)
+    if not cubo.vazio:
+        def montar_top():
+            fig = px.bar(
+                x=top_vereadores.values,
+                y=top_vereadores.index,
+                orientation='h',
+                title='Projetos de Lei por Vereador',
+                labels={'x': 'Quantidade de PLs', 'y': 'Vereador'},
+                color=top_vereadores.values,
+                color_continuous_scale='viridis'
+            )
+            fig.update_layout(showlegend=False, height=400)
+            return fig
+
+        grafico('top_vereadores', top_vereadores, montar_top)
 
 # --- Tab 2: Dados Detalhados ---
-with tab2:
+@secao("📋 Dados Detalhados")
+def aba_dados(filtro, cubo, df_filtrado):
     st.subheader('📋 Tabela Completa de Projetos de Lei')
 
     # Opções de visualização
@@ -316,11 +496,11 @@ with tab2:
             ['Decrescente', 'Crescente']
         )
 
-    # Aplicar ordenação
-    df_ordenado = df_filtrado.sort_values(
+    # Aplicar ordenação; a lista de presentes vem da tabela de presenças
+    df_ordenado = memorizado(filtro, 'dados', lambda: presencas.juntar(df_filtrado.sort_values(
         ordenar_por,
         ascending=(ordem == 'Crescente')
-    )
+    )), ordenar_por, ordem)
 
     # Exibir dados
     st.dataframe(
@@ -329,46 +509,76 @@ with tab2:
         height=500
     )
 
-    # Opção de download
-    csv = df_ordenado.to_csv(index=False)
-    st.download_button(
-        label="📥 Baixar dados em CSV",
-        data=csv,
-        file_name=f'observatorio_teresopolis_{datetime.now().strftime("%Y%m%d")}.csv',
-        mime='text/csv'
-    )
+    # Download sob demanda: o arquivo só é gerado (em disco, por blocos)
+    # quando pedido, e fica no cache por filtro, ordenação e formato. O
+    # botão recebe o arquivo inteiro (o Streamlit lê o conteúdo na hora)
+    col1, col2 = st.columns([1, 3], vertical_alignment='bottom')
+    with col1:
+        formato = st.selectbox('Formato:', list(FORMATOS), key='formato_exportacao')
+    extensao, mime = FORMATOS[formato]
+    pedido = (filtro, ordenar_por, ordem, formato)
+
+    with col2:
+        if extensao == 'xlsx' and len(df_ordenado) > LIMITE_LINHAS_XLSX:
+            st.warning(f"Mais de {LIMITE_LINHAS_XLSX:,} linhas não cabem numa planilha; use CSV ou Parquet.")
+        elif st.session_state.get('exportacao') != pedido:
+            st.button(
+                f"⚙️ Preparar arquivo {formato}",
+                on_click=lambda: st.session_state.update(exportacao=pedido)
+            )
+        else:
+            with st.spinner('Gerando arquivo...'):
+                arquivo = exportacoes.abrir((filtro, ordenar_por, ordem), formato, df_ordenado)
+            with arquivo:
+                st.download_button(
+                    label=f"📥 Baixar dados em {formato}",
+                    data=arquivo,
+                    file_name=f'observatorio_teresopolis_{datetime.now().strftime("%Y%m%d")}.{extensao}',
+                    mime=mime,
+                    on_click='ignore'
+                )
 
 # --- Tab 3: Análise por Vereador ---
-with tab3:
+@secao("👥 Análise por Vereador")
+def aba_vereador(filtro, cubo, df_filtrado):
     st.subheader('👥 Análise Detalhada por Vereador')
 
     if not df_filtrado.empty:
         # Seletor de vereador
         vereador_analise = st.selectbox(
             'Selecione um vereador para análise detalhada:',
-            sorted(df_filtrado['Autor'].unique())
+            memorizado(filtro, 'autores', lambda: sorted(cubo.por_autor().index))
         )
 
-        # Filtrar dados do vereador
-        df_vereador = df_filtrado[df_filtrado['Autor'] == vereador_analise]
+        # Fatia do cubo, resumo e linhas do vereador
+        def calcular_vereador():
+            cubo_vereador = cubo.fatiar(autores=[vereador_analise])
+            return (
+                cubo.aprovacao_por_autor().loc[vereador_analise],
+                cubo_vereador.por_status().reset_index(),
+                agrupar_serie(cubo_vereador.por_mes()),
+                df_filtrado[df_filtrado['Autor'] == vereador_analise],
+            )
+
+        resumo_vereador, df_vereador_status, (df_vereador_mes, nivel_vereador), df_vereador = memorizado(
+            filtro, 'vereador', calcular_vereador, vereador_analise
+        )
 
         # Métricas do vereador
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("Total de PLs", len(df_vereador))
+            st.metric("Total de PLs", resumo_vereador['Total PLs'])
 
         with col2:
-            aprovados_vereador = len(df_vereador[df_vereador['Status'].str.contains('Aprovado', case=False, na=False)])
-            taxa_aprov_vereador = (aprovados_vereador / len(df_vereador) * 100) if len(df_vereador) > 0 else 0
-            st.metric("Taxa de Aprovação", f"{taxa_aprov_vereador:.1f}%")
+            st.metric("Taxa de Aprovação", f"{resumo_vereador['Taxa de Aprovação (%)']:.1f}%")
 
         with col3:
-            primeiro_pl = df_vereador['Data Sessão'].min()
+            primeiro_pl = resumo_vereador['Primeira Sessão']
             st.metric("Primeiro PL", primeiro_pl.strftime('%d/%m/%Y') if pd.notna(primeiro_pl) else "N/A")
 
         with col4:
-            ultimo_pl = df_vereador['Data Sessão'].max()
+            ultimo_pl = resumo_vereador['Última Sessão']
             st.metric("Último PL", ultimo_pl.strftime('%d/%m/%Y') if pd.notna(ultimo_pl) else "N/A")
 
         # Gráfico de evolução do vereador
@@ -376,27 +586,23 @@ with tab3:
 
         with col1:
             # Status dos PLs do vereador
-            fig_status_vereador = px.pie(
-                df_vereador['Status'].value_counts().reset_index(),
+            grafico('status_vereador', df_vereador_status, lambda: px.pie(
+                df_vereador_status,
                 values='count',
                 names='Status',
                 title=f'Status dos PLs - {vereador_analise}'
-            )
-            st.plotly_chart(fig_status_vereador, use_container_width=True)
+            ), vereador_analise)
 
         with col2:
             # Evolução temporal do vereador
-            df_vereador_mes = df_vereador.groupby(df_vereador['Data Sessão'].dt.to_period('M')).size()
             if not df_vereador_mes.empty:
-                df_vereador_mes.index = df_vereador_mes.index.to_timestamp()
 
-                fig_temporal_vereador = px.bar(
+                grafico('temporal_vereador', df_vereador_mes, lambda: px.bar(
                     x=df_vereador_mes.index,
                     y=df_vereador_mes.values,
-                    title=f'PLs por Mês - {vereador_analise}',
-                    labels={'x': 'Mês', 'y': 'Quantidade'}
-                )
-                st.plotly_chart(fig_temporal_vereador, use_container_width=True)
+                    title=f'PLs por {nivel_vereador} - {vereador_analise}',
+                    labels={'x': nivel_vereador, 'y': 'Quantidade'}
+                ), vereador_analise, nivel_vereador)
 
         # Lista de PLs do vereador
         st.subheader(f'📋 Projetos de Lei - {vereador_analise}')
@@ -406,8 +612,10 @@ with tab3:
         )
 
 # --- Tab 4: Linha do Tempo ---
-with tab4:
+@secao("📈 Linha do Tempo")
+def aba_linha_do_tempo(filtro, cubo, df_filtrado):
     st.subheader('📈 Linha do Tempo de Projetos de Lei')
+    ciclo_vida = carregar_ciclo_vida()
 
     # Seletor de PL para timeline
     if not df_filtrado.empty:
@@ -416,95 +624,107 @@ with tab4:
             sorted(df_filtrado['PL'].unique())
         )
 
-        # Filtrar histórico do PL
-        df_pl = df[df['PL'] == pl_timeline].sort_values('Data Sessão')
+        # Histórico do PL (fatia pré-calculada do ciclo de vida, na base inteira)
+        if pl_timeline in ciclo_vida:
+            resumo_pl = ciclo_vida.resumo(pl_timeline)
+            df_pl = carregar_base().df.iloc[ciclo_vida.eventos(pl_timeline)]
 
-        if not df_pl.empty:
             # Informações do PL
             col1, col2, col3 = st.columns(3)
 
             with col1:
-                st.metric("Autor", df_pl.iloc[0]['Autor'])
+                st.metric("Autor", resumo_pl['Autor'])
 
             with col2:
-                st.metric("Status Atual", df_pl.iloc[-1]['Status'])
+                st.metric("Status Atual", resumo_pl['Status Atual'])
 
             with col3:
-                dias_tramitacao = (df_pl.iloc[-1]['Data Sessão'] - df_pl.iloc[0]['Data Sessão']).days
-                st.metric("Dias em Tramitação", dias_tramitacao)
+                st.metric("Dias em Tramitação", resumo_pl['Dias em Tramitação'])
+
+            st.caption("Transições: " + " → ".join(resumo_pl['Transições']))
 
             # Timeline
             st.markdown("### 📅 Histórico do PL")
 
-            for idx, row in df_pl.iterrows():
-                with st.container():
-                    col1, col2 = st.columns([1, 4])
+            # Histórico inteiro numa figura e num quadro (sem widgets por evento)
+            renderizar_historico(df_pl)
 
-                    with col1:
-                        st.markdown(f"**{row['Data Sessão'].strftime('%d/%m/%Y')}**")
+    # Tramitação geral (toda a base, sem os filtros)
+    st.markdown("### ⏱️ Tramitação")
+    col1, col2 = st.columns([1, 3])
 
-                    with col2:
-                        status_emoji = {
-                            'Aprovado (Votação Simbólica)': '✅',
-                            'Em Discussão': '💬',
-                            'Não identificado': '❓',
-                            'Encaminhado para Comissão': '📤',
-                            'Rejeitado': '❌'
-                        }.get(row['Status'], '📋')
-
-                        st.markdown(f"{status_emoji} **{row['Status']}**")
-                        st.caption(f"Fonte: {row['Fonte']}")
+    with col1:
+        mediana_aprovacao = ciclo_vida.tempo_mediano_aprovacao()
+        st.metric(
+            "Tempo Mediano até Aprovação",
+            f"{mediana_aprovacao:.0f} dias" if pd.notna(mediana_aprovacao) else "N/A"
+        )
+        dias_parado = st.slider('Dias sem menção:', min_value=30, max_value=360, value=90, step=30)
 
-                    st.divider()
+    with col2:
+        pls_parados = ciclo_vida.parados(dias=dias_parado)
+        st.markdown(f"**PLs parados:** {len(pls_parados)} sem aprovação há pelo menos {dias_parado} dias")
+        st.dataframe(
+            pls_parados[['Autor', 'Status Atual', 'Última Sessão', 'Dias sem Menção']],
+            use_container_width=True
+        )
 
 # --- Tab 5: Busca de PL ---
-with tab5:
+@secao("🔍 Busca de PL")
+def aba_busca(filtro, cubo, df_filtrado):
     st.subheader('🔍 Busca Avançada de Projetos de Lei')
+    indice_busca, ciclo_vida = carregar_indice_busca(), carregar_ciclo_vida()
 
     # Campo de busca
-    busca_termo = st.text_input('Digite o número do PL ou termo de busca:', '')
+    busca_termo = st.text_input(
+        'Digite o número do PL ou termo de busca:', '',
+        on_change=lambda: st.session_state.update(pagina_busca=1)
+    )
 
     if busca_termo:
-        # Buscar em todos os campos
-        df_busca = df[
-            (df['PL'].str.contains(busca_termo, case=False, na=False)) |
-            (df['Autor'].str.contains(busca_termo, case=False, na=False)) |
-            (df['Status'].str.contains(busca_termo, case=False, na=False))
-        ]
-
-        if not df_busca.empty:
-            st.success(f"Encontrados {len(df_busca)} resultados")
-
-            # Agrupar por PL
-            pls_encontrados = df_busca['PL'].unique()
-
-            for pl in sorted(pls_encontrados):
-                df_pl_busca = df_busca[df_busca['PL'] == pl]
-
-                with st.expander(f"📋 PL {pl} - {df_pl_busca.iloc[0]['Autor']}"):
-                    # Informações do PL
-                    col1, col2 = st.columns(2)
-
-                    with col1:
-                        st.markdown(f"**Autor:** {df_pl_busca.iloc[0]['Autor']}")
-                        st.markdown(f"**Primeira Menção:** {df_pl_busca['Data Sessão'].min().strftime('%d/%m/%Y')}")
-
-                    with col2:
-                        st.markdown(f"**Status Atual:** {df_pl_busca.iloc[-1]['Status']}")
-                        st.markdown(f"**Última Menção:** {df_pl_busca['Data Sessão'].max().strftime('%d/%m/%Y')}")
-
-                    # Histórico
-                    st.markdown("**Histórico:**")
-                    st.dataframe(
-                        df_pl_busca[['Data Sessão', 'Status', 'Fonte']].sort_values('Data Sessão'),
-                        use_container_width=True,
-                        hide_index=True
-                    )
+        # Consulta ao índice (PL, autor com variações de nome e status)
+        pagina_busca = st.session_state.get('pagina_busca', 1)
+        busca = indice_busca.buscar(busca_termo, pagina=pagina_busca, por_pagina=RESULTADOS_POR_PAGINA)
+
+        if busca.total_linhas:
+            st.success(f"Encontrados {busca.total_linhas} resultados em {busca.total_pls} PLs")
+
+            if busca.paginas > 1:
+                # Nova busca com menos páginas: volta para a página válida
+                st.session_state['pagina_busca'] = busca.pagina
+                st.number_input(
+                    f'Página (de {busca.paginas}):',
+                    min_value=1,
+                    max_value=busca.paginas,
+                    key='pagina_busca'
+                )
+
+            # Página inteira numa tabela; o histórico só do PL escolhido
+            st.dataframe(
+                quadro_resultados(busca.resultados, ciclo_vida),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'Primeira Menção': st.column_config.DateColumn(format=FORMATO_DATA),
+                    'Última Menção': st.column_config.DateColumn(format=FORMATO_DATA),
+                }
+            )
+
+            resultados_pagina = {resultado.pl: resultado for resultado in busca.resultados}
+            pl_busca = st.selectbox('Histórico do PL:', list(resultados_pagina), key='pl_busca')
+            resultado = resultados_pagina[pl_busca]
+            resumo_pl = ciclo_vida.resumo(resultado.pl)
+
+            st.markdown(f"**📋 PL {resultado.pl}** - {resumo_pl['Autor']} · "
+                        f"Status Atual: {resumo_pl['Status Atual']} · "
+                        f"{len(resultado.linhas)} de {resumo_pl['Eventos']} menções encontradas")
+            renderizar_historico(carregar_base().df.iloc[resultado.linhas], chave='historico_busca')
         else:
             st.warning("Nenhum resultado encontrado")
 
 # --- Tab 6: Estatísticas Avançadas ---
-with tab6:
+@secao("📊 Estatísticas Avançadas")
+def aba_estatisticas(filtro, cubo, df_filtrado):
     st.subheader('📊 Estatísticas Avançadas')
 
     if not df_filtrado.empty:
@@ -515,98 +735,215 @@ with tab6:
             # Heatmap de atividade
             st.markdown("### 🗓️ Mapa de Calor - Atividade Mensal")
 
-            # Preparar dados para heatmap
-            df_heatmap = df_filtrado.copy()
-            df_heatmap['Mês'] = df_heatmap['Data Sessão'].dt.month
-            df_heatmap['Ano'] = df_heatmap['Data Sessão'].dt.year
-
-            pivot_table = df_heatmap.pivot_table(
-                values='PL',
-                index='Mês',
-                columns='Ano',
-                aggfunc='count',
-                fill_value=0
-            )
+            # Preparar dados para heatmap (tabela mês × ano do cubo)
+            pivot_table = memorizado(filtro, 'mapa_calor', cubo.mapa_calor)
+            nomes_meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+                           'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
 
-            fig_heatmap = px.imshow(
+            grafico('mapa_calor', pivot_table, lambda: px.imshow(
                 pivot_table,
                 labels=dict(x="Ano", y="Mês", color="PLs"),
-                y=['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
-                   'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'][:len(pivot_table)],
+                y=[nomes_meses[mes - 1] for mes in pivot_table.index],
                 color_continuous_scale='YlOrRd'
-            )
-            st.plotly_chart(fig_heatmap, use_container_width=True)
+            ))
 
         with col2:
             # Taxa de aprovação por vereador
             st.markdown("### 📊 Taxa de Aprovação por Vereador")
 
-            taxa_aprovacao_vereadores = []
-            for vereador in df_filtrado['Autor'].unique():
-                df_v = df_filtrado[df_filtrado['Autor'] == vereador]
-                aprovados = len(df_v[df_v['Status'].str.contains('Aprovado', case=False, na=False)])
-                total = len(df_v)
-                taxa = (aprovados / total * 100) if total > 0 else 0
-
-                if total >= 3:  # Apenas vereadores com pelo menos 3 PLs
-                    taxa_aprovacao_vereadores.append({
-                        'Vereador': vereador,
-                        'Taxa de Aprovação (%)': taxa,
-                        'Total PLs': total
-                    })
-
-            if taxa_aprovacao_vereadores:
-                df_taxa = pd.DataFrame(taxa_aprovacao_vereadores)
-                df_taxa = df_taxa.sort_values('Taxa de Aprovação (%)', ascending=False).head(10)
-
-                fig_taxa = px.bar(
-                    df_taxa,
-                    x='Taxa de Aprovação (%)',
-                    y='Vereador',
-                    orientation='h',
-                    text='Total PLs',
-                    color='Taxa de Aprovação (%)',
-                    color_continuous_scale='RdYlGn'
-                )
-                fig_taxa.update_traces(texttemplate='%{text} PLs', textposition='inside')
-                st.plotly_chart(fig_taxa, use_container_width=True)
+            # Ranking pelo limite inferior de Wilson: poucos PLs não dominam o topo
+            ordenar_wilson = st.toggle('Ordenar pelo limite inferior (Wilson 95%)', value=True)
+
+            # Apenas vereadores com pelo menos 3 PLs
+            df_taxa = memorizado(filtro, 'aprovacao', lambda: cubo.aprovacao_por_autor(
+                minimo=3,
+                ordenar_por='Wilson Inferior (%)' if ordenar_wilson else 'Taxa de Aprovação (%)'
+            ).head(10).rename_axis('Vereador').reset_index(), ordenar_wilson)
+
+            if not df_taxa.empty:
+                def montar_taxa():
+                    fig = px.bar(
+                        df_taxa,
+                        x='Taxa de Aprovação (%)',
+                        y='Vereador',
+                        orientation='h',
+                        text='Total PLs',
+                        color='Taxa de Aprovação (%)',
+                        color_continuous_scale='RdYlGn',
+                        error_x=df_taxa['Wilson Superior (%)'] - df_taxa['Taxa de Aprovação (%)'],
+                        error_x_minus=df_taxa['Taxa de Aprovação (%)'] - df_taxa['Wilson Inferior (%)']
+                    )
+                    fig.update_traces(texttemplate='%{text} PLs', textposition='inside')
+                    return fig
+
+                grafico('aprovacao', df_taxa, montar_taxa)
 
         # Análise de correlação
         st.markdown("### 🔗 Análise de Parcerias")
 
-        # Identificar vereadores que aparecem juntos em sessões
-        vereadores_sessoes = []
-        for sessao in df_filtrado['Data Sessão'].unique():
-            df_sessao = df_filtrado[df_filtrado['Data Sessão'] == sessao]
-            vereadores_na_sessao = df_sessao['Autor'].unique()
-
-            if len(vereadores_na_sessao) > 1:
-                for i, v1 in enumerate(vereadores_na_sessao):
-                    for v2 in vereadores_na_sessao[i+1:]:
-                        vereadores_sessoes.append({
-                            'Vereador 1': v1,
-                            'Vereador 2': v2,
-                            'Sessão': sessao
-                        })
-
-        if vereadores_sessoes:
-            df_parcerias = pd.DataFrame(vereadores_sessoes)
-
-            # Contar parcerias mais frequentes
-            parcerias_freq = df_parcerias.groupby(['Vereador 1', 'Vereador 2']).size().reset_index(name='Frequência')
-            parcerias_freq = parcerias_freq.sort_values('Frequência', ascending=False).head(10)
-
-            if not parcerias_freq.empty:
-                parcerias_freq['Parceria'] = parcerias_freq['Vereador 1'] + ' & ' + parcerias_freq['Vereador 2']
-
-                fig_parcerias = px.bar(
-                    parcerias_freq,
-                    x='Frequência',
-                    y='Parceria',
+        # Vereadores que apresentam PLs nas mesmas sessões (Mᵀ·M da incidência)
+        medida_parceria = st.selectbox(
+            'Medida:',
+            MEDIDAS,
+            help='Frequência: sessões em comum. Jaccard: sessões em comum sobre sessões de '
+                 'qualquer um dos dois. Lift: coocorrência observada sobre a esperada ao acaso.'
+        )
+        coocorrencia = memorizado(filtro, 'coocorrencia', lambda: Coocorrencia.do_cubo(cubo))
+        parcerias_freq = coocorrencia.principais(k=10, medida=medida_parceria)
+
+        if not parcerias_freq.empty:
+            parcerias_freq['Parceria'] = parcerias_freq['Vereador 1'] + ' & ' + parcerias_freq['Vereador 2']
+
+            grafico('parcerias', parcerias_freq, lambda: px.bar(
+                parcerias_freq,
+                x=medida_parceria,
+                y='Parceria',
+                orientation='h',
+                hover_data=MEDIDAS,
+                title='Vereadores que Mais Apresentam PLs nas Mesmas Sessões'
+            ), medida_parceria)
+
+# --- Tab 7: Presença ---
+@secao("🙋 Presença")
+def aba_presenca(filtro, cubo, df_filtrado):
+    st.subheader('🙋 Presença nas Sessões')
+
+    # Sessões do período; a autoria segue também os filtros de autor e status
+    def calcular_presenca():
+        presencas_periodo = presencas.periodo(filtro[0], filtro[1])
+        quorum = presencas_periodo.quorum()
+        return (
+            quorum,
+            quorum[quorum['Presentes'].notna()],
+            presencas_periodo.taxa_presenca().reset_index(),
+            presencas_periodo.presenca_autoria(df_filtrado),
+        )
+
+    quorum, com_chamada, df_presenca, df_presenca_autoria = memorizado(filtro, 'presenca', calcular_presenca)
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Sessões com Chamada", f"{len(com_chamada)}", delta=f"de {len(quorum)} no período")
+
+    with col2:
+        st.metric(
+            "Sessões com Quórum",
+            f"{com_chamada['Quórum'].mean() * 100:.0f}%" if len(com_chamada) else "N/A"
+        )
+
+    with col3:
+        st.metric(
+            "Média de Presentes",
+            f"{com_chamada['Presentes'].mean():.1f}" if len(com_chamada) else "N/A"
+        )
+
+    if len(com_chamada):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            def montar_presenca():
+                fig = px.bar(
+                    df_presenca,
+                    x='Taxa de Presença (%)',
+                    y='Vereador',
                     orientation='h',
-                    title='Vereadores que Mais Apresentam PLs nas Mesmas Sessões'
+                    text='Presenças',
+                    title='Taxa de Presença por Vereador',
+                    color='Taxa de Presença (%)',
+                    color_continuous_scale='RdYlGn',
+                    range_color=(0, 100)
+                )
+                fig.update_layout(height=600, yaxis={'categoryorder': 'total ascending'})
+                return fig
+
+            grafico('presenca', df_presenca, montar_presenca)
+
+        with col2:
+            grafico('quorum', com_chamada, lambda: px.scatter(
+                com_chamada,
+                x='Data Sessão',
+                y='Presentes',
+                color='Quórum',
+                title='Presentes por Sessão',
+                hover_data=['Fonte']
+            ))
+
+        st.markdown("### 🔗 Presença x Autoria")
+        st.caption("Correlação (phi) entre estar presente na chamada e ter PL apresentado na sessão. "
+                   "Autoria ausente: PLs do vereador em sessões em que ele não respondeu à chamada.")
+        st.dataframe(
+            df_presenca_autoria,
+            use_container_width=True,
+            column_config={
+                'Taxa de Presença (%)': st.column_config.NumberColumn(format='%.1f'),
+                'Correlação (phi)': st.column_config.NumberColumn(format='%.2f'),
+            }
+        )
+    else:
+        st.info("Nenhuma sessão com chamada identificada no período.")
+
+# --- Navegação ---
+ABAS = {
+    "📊 Dashboard": aba_dashboard,
+    "📋 Dados Detalhados": aba_dados,
+    "👥 Análise por Vereador": aba_vereador,
+    "📈 Linha do Tempo": aba_linha_do_tempo,
+    "🔍 Busca de PL": aba_busca,
+    "📊 Estatísticas Avançadas": aba_estatisticas,
+    "🙋 Presença": aba_presenca,
+}
+
+if TODAS_AS_ABAS:
+    # Modo clássico: st.tabs executa todas as abas a cada rerun
+    abas = zip(ABAS, st.tabs(list(ABAS)))
+else:
+    # Navegador: só a aba escolhida é calculada
+    escolhida = st.radio('Seção:', list(ABAS), key='aba', horizontal=True, label_visibility='collapsed')
+    abas = [(escolhida, st.container())]
+
+for nome_aba, conteiner in abas:
+    with conteiner:
+        ABAS[nome_aba](filtro, cubo, df_filtrado)
+
+# Fim da captura de pilhas pedida para esta execução (modo de perfil)
+if PERFIL:
+    tempos.encerrar_captura('execução completa')
+
+# Tempo por seção, ao fim da execução completa (interações dentro de uma aba
+# reexecutam só a aba e aparecem aqui no próximo rerun completo)
+with st.sidebar.expander('⏱️ Tempo por seção'):
+    st.dataframe(
+        tempos.tabela(),
+        use_container_width=True,
+        column_config={
+            'Última (ms)': st.column_config.NumberColumn(format='%.1f'),
+            'Total (ms)': st.column_config.NumberColumn(format='%.1f'),
+            'Δ Memória (MiB)': st.column_config.NumberColumn(format='%+.1f'),
+        }
+    )
+    st.caption(f"Figuras (todas as sessões): {figuras.acertos} reaproveitadas, {figuras.faltas} montadas")
+
+    if PERFIL:
+        st.caption(f"Modo de perfil: medidas registradas em `{tempos.log}` (sessão {tempos.sessao})")
+        if tempos.falha_log:
+            st.warning(f"Falha ao gravar o perfil: {tempos.falha_log}")
+
+        # A captura vale para a próxima interação, não para este clique
+        if st.button('🔥 Capturar a próxima interação', disabled=tempos.captura_pedida):
+            tempos.pedir_captura()
+        if tempos.captura_pedida:
+            st.caption("Captura armada: a próxima interação terá as pilhas amostradas.")
+        if tempos.ultima_captura and os.path.exists(tempos.ultima_captura):
+            with open(tempos.ultima_captura, 'rb') as arquivo:
+                st.download_button(
+                    '📥 Última captura (flame graph)',
+                    data=arquivo.read(),
+                    file_name=os.path.basename(tempos.ultima_captura),
+                    mime='text/plain',
+                    on_click='ignore',
+                    help='Pilhas no formato "folded": abrir no speedscope.app ou no flamegraph.pl'
                 )
-                st.plotly_chart(fig_parcerias, use_container_width=True)
 
 # --- Rodapé ---
 st.divider()
@@ -615,4 +952,4 @@ st.markdown("""
     <p>📊 Observatório Legislativo de Teresópolis | Dados atualizados até {}</p>
     <p>Desenvolvido para transparência e acompanhamento da atividade legislativa municipal</p>
 </div>
-""".format(df['Data Sessão'].max().strftime('%d/%m/%Y')), unsafe_allow_html=True)
\ No newline at end of file
+""".format(data_max.strftime('%d/%m/%Y')), unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+Base particionada em Parquet (partições Hive por ano e mês)
+
+Alternativa ao CSV único: as sessões de cada mês ficam num arquivo próprio,
+em `<base>_particionada/ano=2025/mes=3/parte.parquet`, com os valores como
+o extrator os escreve (a data como data). A leitura usa os filtros de
+dataset do pyarrow: só os meses do período pedido são abertos (poda de
+partições), as linhas fora dele são descartadas na leitura e só as colunas
+pedidas são lidas; os textos vêm como dicionário, direto para categorias do
+pandas. Acrescentar ou reprocessar sessões reescreve só as partições dos
+meses afetados.
+
+Converter uma base CSV existente:
+    python -m armazem base_observatorio_teresopolis_COMPLETA.csv
+"""
+
+import argparse
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from origem import ARQUIVO_PARTICAO, caminho_dataset, pasta_particao, particoes
+
+ESQUEMA = pa.schema([
+    ('Data Sessão', pa.date32()),
+    ('PL', pa.string()),
+    ('Autor', pa.string()),
+    ('Status', pa.string()),
+    ('Votos', pa.string()),
+    ('Presentes', pa.string()),
+    ('Fonte', pa.string()),
+])
+PARTICOES = pa.schema([('ano', pa.int16()), ('mes', pa.int8())])
+
+_TEXTOS = [campo.name for campo in ESQUEMA if campo.type == pa.string()]
+_FORMATO = ds.ParquetFileFormat(read_options={'dictionary_columns': _TEXTOS})
+# Esquema de leitura: textos como dicionário, mais as colunas de partição
+_ESQUEMA_LEITURA = pa.schema(
+    [pa.field(campo.name, pa.dictionary(pa.int32(), pa.string())) if campo.name in _TEXTOS else campo
+     for campo in ESQUEMA] + list(PARTICOES))
+
+
+def _tabela(df):
+    """Linhas da base (valores como no CSV) no esquema do dataset; datas inválidas ficam de fora"""
+    datas = pd.to_datetime(df['Data Sessão'], errors='coerce')
+    validas = datas.notna().to_numpy()
+    colunas = [pa.array(datas[validas].to_numpy().astype('datetime64[D]'), type=pa.date32())]
+    for nome in ESQUEMA.names[1:]:
+        valores = df[nome][validas].astype(object)
+        colunas.append(pa.array(valores.where(valores.notna(), None), type=pa.string()))
+    return pa.Table.from_arrays(colunas, schema=ESQUEMA)
+
+
+def _gravar_particao(pasta, ano, mes, tabela):
+    """Substitui o arquivo da partição (escrita atômica); partição vazia é removida"""
+    destino = pasta_particao(pasta, ano, mes)
+    if tabela.num_rows == 0:
+        shutil.rmtree(destino, ignore_errors=True)
+        return
+    os.makedirs(destino, exist_ok=True)
+    # Prefixo '.': o pyarrow ignora o temporário se alguém ler ao mesmo tempo
+    temporario = os.path.join(destino, f'.{uuid.uuid4().hex}.tmp')
+    try:
+        pq.write_table(tabela, temporario, compression='zstd')
+        os.replace(temporario, os.path.join(destino, ARQUIVO_PARTICAO))
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def _por_mes(tabela):
+    """Fatias da tabela por (ano, mês) da data da sessão"""
+    datas = tabela.column('Data Sessão').to_numpy().astype('datetime64[M]')
+    meses = pd.Series(datas.astype(int))
+    for chave, posicoes in meses.groupby(meses).indices.items():
+        ano, mes = divmod(int(chave), 12)
+        yield (1970 + ano, mes + 1), tabela.take(posicoes)
+
+
+def gravar(df, pasta):
+    """Grava a base inteira, substituindo o que houver na pasta"""
+    tabela = _tabela(df)
+    gravadas = set()
+    for (ano, mes), parte in _por_mes(tabela):
+        _gravar_particao(pasta, ano, mes, parte)
+        gravadas.add((ano, mes))
+    for ano, mes in set(particoes(pasta)) - gravadas:
+        shutil.rmtree(pasta_particao(pasta, ano, mes))
+    return sorted(gravadas)
+
+
+def _dataset(pasta):
+    return ds.dataset(pasta, schema=_ESQUEMA_LEITURA, format=_FORMATO,
+                      partitioning=ds.partitioning(PARTICOES, flavor='hive'))
+
+
+def _filtro_periodo(data_inicio, data_fim):
+    """Expressão do período (datas inclusivas): partições por ano/mês e linhas pela data"""
+    ano, mes, data = ds.field('ano'), ds.field('mes'), ds.field('Data Sessão')
+    filtro = None
+    if data_inicio is not None:
+        inicio = pd.Timestamp(data_inicio)
+        filtro = (((ano > inicio.year) | ((ano == inicio.year) & (mes >= inicio.month))) &
+                  (data >= pa.scalar(inicio.date(), pa.date32())))
+    if data_fim is not None:
+        fim = pd.Timestamp(data_fim)
+        ate = (((ano < fim.year) | ((ano == fim.year) & (mes <= fim.month))) &
+               (data <= pa.scalar(fim.date(), pa.date32())))
+        filtro = ate if filtro is None else filtro & ate
+    return filtro
+
+
+def ler(pasta, data_inicio=None, data_fim=None, colunas=None):
+    """
+    Tabela (pyarrow) com as linhas do período (datas inclusivas; None deixa
+    o lado aberto) e as colunas pedidas (padrão: todas as da base). Só as
+    partições dos meses do período são abertas.
+    """
+    colunas = list(colunas) if colunas is not None else ESQUEMA.names
+    if not particoes(pasta):
+        return _ESQUEMA_LEITURA.empty_table().select(colunas)
+    return _dataset(pasta).to_table(columns=colunas, filter=_filtro_periodo(data_inicio, data_fim))
+
+
+def anexar(pasta, novos, fontes_substituidas=()):
+    """
+    Acrescenta as linhas `novos` (colunas da base) e remove as das fontes
+    substituídas (transcrições reprocessadas), reescrevendo só as partições
+    afetadas, com a mesma deduplicação da base em CSV (PL + Fonte, fica a
+    primeira). Devolve as partições reescritas.
+    """
+    fontes = sorted(set(fontes_substituidas))
+    tabela_novos = _tabela(novos)
+    novos_por_mes = dict(_por_mes(tabela_novos))
+    afetadas = set(novos_por_mes)
+
+    if fontes and particoes(pasta):
+        # Só as colunas de partição das linhas dessas fontes
+        onde = _dataset(pasta).to_table(columns=['ano', 'mes'], filter=ds.field('Fonte').isin(fontes))
+        afetadas.update(zip(onde.column('ano').to_pylist(), onde.column('mes').to_pylist()))
+
+    for ano, mes in sorted(afetadas):
+        arquivo = os.path.join(pasta_particao(pasta, ano, mes), ARQUIVO_PARTICAO)
+        partes = []
+        if os.path.exists(arquivo):
+            existente = pq.ParquetFile(arquivo).read()
+            if fontes:
+                existente = existente.filter(pc.invert(pc.is_in(existente.column('Fonte'),
+                                                                value_set=pa.array(fontes, pa.string()))))
+            partes.append(existente)
+        if (ano, mes) in novos_por_mes:
+            partes.append(novos_por_mes[(ano, mes)])
+        juntas = pa.concat_tables(partes).to_pandas()
+        juntas = juntas.drop_duplicates(subset=['PL', 'Fonte']).sort_values('Data Sessão', kind='stable')
+        _gravar_particao(pasta, ano, mes, pa.Table.from_pandas(juntas, schema=ESQUEMA, preserve_index=False))
+    return sorted(afetadas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Converte uma base CSV em base particionada por ano e mês')
+    parser.add_argument('csv')
+    parser.add_argument('--destino', default=None, help='pasta da base particionada (padrão: ao lado do CSV)')
+    args = parser.parse_args()
+
+    destino = args.destino or caminho_dataset(args.csv)
+    gravadas = gravar(pd.read_csv(args.csv, dtype=str, keep_default_na=False), destino)
+    print(f"{len(gravadas)} partições gravadas em {destino}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Scripts de medição de desempenho do observatório.
+
+Execute a partir da raiz do repositório, por exemplo:
+    python -m benchmarks.carregamento
+"""
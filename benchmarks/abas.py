@@ -0,0 +1,113 @@
+"""
+Custo de um rerun do painel: todas as abas (st.tabs) x só a aba visível
+
+Roda o app.py com o AppTest do Streamlit num subprocesso por modo, com a aba
+Dashboard aberta, e troca a seleção rápida de período várias vezes (duas
+voltas pelas mesmas opções: a segunda encontra os resultados memorizados).
+Informa a mediana do rerun em cada volta e o tempo de cada seção, tirado do
+painel de tempos do próprio app.
+
+Uso:
+    python -m benchmarks.abas [--linhas 200000] [--voltas 2]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODOS = ['todas', 'navegador']
+PERIODOS = ['Todo o período', 'Últimos 6 meses', 'Últimos 3 meses', 'Últimos 30 dias']
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def executar_modo(pasta, voltas):
+    """Reruns com o app em `pasta`; devolve tempos por volta e por seção"""
+    import logging
+
+    from streamlit.testing.v1 import AppTest
+
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    os.chdir(pasta)
+    app = AppTest.from_file(os.path.join(RAIZ, 'app.py'), default_timeout=600)
+
+    inicio = time.perf_counter()
+    app.run()
+    primeira = time.perf_counter() - inicio
+    assert not app.exception, [e.value for e in app.exception]
+
+    tempos_voltas = []
+    for _ in range(voltas):
+        tempos = []
+        for periodo in PERIODOS:
+            inicio = time.perf_counter()
+            app.sidebar.selectbox[0].set_value(periodo).run()
+            tempos.append(time.perf_counter() - inicio)
+        tempos_voltas.append(statistics.median(tempos))
+
+    secoes = app.session_state['tempos_secoes']
+    return {
+        'primeira': primeira,
+        'voltas': tempos_voltas,
+        'secoes': {nome: secoes.total[nome] / secoes.execucoes[nome] for nome in secoes.total},
+        'execucoes': dict(secoes.execucoes),
+        'reruns': 1 + voltas * len(PERIODOS),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rerun com todas as abas x só a aba visível')
+    parser.add_argument('--linhas', type=int, default=0, help='amplia a base até N linhas (0 = base real)')
+    parser.add_argument('--voltas', type=int, default=2)
+    parser.add_argument('--csv', default=os.path.join(RAIZ, 'base_observatorio_teresopolis_COMPLETA.csv'))
+    parser.add_argument('--pasta', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.pasta:
+        print(json.dumps(executar_modo(args.pasta, args.voltas)))
+        return
+
+    from benchmarks.carregamento import gerar_csv_ampliado
+
+    with tempfile.TemporaryDirectory() as tmp:
+        destino = os.path.join(tmp, 'base_observatorio_teresopolis_COMPLETA.csv')
+        if args.linhas:
+            gerar_csv_ampliado(args.csv, destino, args.linhas)
+        else:
+            shutil.copy(args.csv, destino)
+
+        resultados = {}
+        for modo in MODOS:
+            ambiente = {**os.environ, 'PYTHONPATH': RAIZ,
+                        'OBSERVATORIO_TODAS_ABAS': '1' if modo == 'todas' else '0'}
+            saida = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.abas', '--pasta', tmp, '--voltas', str(args.voltas)],
+                check=True, capture_output=True, text=True, env=ambiente, cwd=RAIZ
+            )
+            resultados[modo] = json.loads(saida.stdout.strip().splitlines()[-1])
+
+    print(f"Base: {f'{args.linhas} linhas' if args.linhas else 'real'}, {len(PERIODOS)} trocas de período por volta, aba Dashboard\n")
+    print(f"{'Modo':<12}{'1ª execução':>13}" + ''.join(f"{f'volta {i + 1}':>12}" for i in range(args.voltas)))
+    for modo, r in resultados.items():
+        print(f"{modo:<12}{r['primeira'] * 1000:>11.0f}ms" +
+              ''.join(f"{t * 1000:>10.0f}ms" for t in r['voltas']))
+
+    print(f"\n{'Seção (média por execução)':<34}" + ''.join(f"{m:>20}" for m in MODOS))
+    for secao in resultados['todas']['secoes']:
+        celulas = []
+        for modo in MODOS:
+            r = resultados[modo]
+            if secao in r['secoes']:
+                celulas.append(f"{r['secoes'][secao] * 1000:.1f}ms × {r['execucoes'][secao]}/{r['reruns']}")
+            else:
+                celulas.append('não executada')
+        print(f"{secao:<34}" + ''.join(f"{c:>20}" for c in celulas))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Teste de carga da API JSON (api.py): pedidos por segundo e latência (p50, p99)
+
+Uso:
+    python -m benchmarks.carga_api [--clientes 8] [--duracao 10]
+    python -m benchmarks.carga_api --url http://127.0.0.1:8502
+
+Sem --url, sobe uma instância local num processo separado (para não
+disputar o GIL com os clientes). Três fases sobre a mesma mistura de
+consultas (indicadores em vários períodos, vereadores, PLs, busca,
+parcerias): a primeira passada, sequencial e com o cache vazio; carga com
+o cache cheio; e carga revalidando com If-None-Match (respostas 304).
+Os clientes usam conexões persistentes (HTTP/1.1), uma por thread.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import quote, urlencode, urlsplit
+
+import numpy as np
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def subir_instancia(porta, espera=120):
+    """Processo da API na porta dada, devolvido quando já responde"""
+    processo = subprocess.Popen([sys.executable, '-m', 'api', '--porta', str(porta)],
+                                stdout=subprocess.DEVNULL)
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError('A API terminou antes de responder')
+        try:
+            conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=1)
+            conexao.request('GET', '/api/versao')
+            if conexao.getresponse().status == 200:
+                return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError('A API não respondeu a tempo')
+
+
+def obter(conexao, caminho, etag=None):
+    """(status, ETag, corpo) de um GET na conexão persistente"""
+    conexao.request('GET', caminho, headers={'If-None-Match': etag} if etag else {})
+    resposta = conexao.getresponse()
+    return resposta.status, resposta.getheader('ETag'), resposta.read()
+
+
+def caminho(rota, **parametros):
+    return rota + ('?' + urlencode(parametros, doseq=True, quote_via=quote) if parametros else '')
+
+
+def consultas(conexao):
+    """Mistura de consultas, montada a partir da própria base (período, autores, PLs)"""
+    _, _, corpo = obter(conexao, '/api/versao')
+    versao = json.loads(corpo)
+    _, _, corpo = obter(conexao, '/api/vereadores')
+    vereadores = [v['Vereador'] for v in json.loads(corpo)['vereadores']][:3]
+    _, _, corpo = obter(conexao, caminho('/api/pls/parados', dias=0))
+    pls = [p['PL'] for p in json.loads(corpo)['pls']][:3]
+
+    fim = np.datetime64(versao['ultima_sessao'])
+    periodos = [{}] + [{'inicio': str(fim - np.timedelta64(dias, 'D')), 'fim': str(fim)} for dias in (30, 90, 180)]
+    lista = [caminho('/api/indicadores', **p) for p in periodos]
+    lista += [caminho('/api/vereadores', **p) for p in periodos[:2]]
+    lista += [caminho('/api/indicadores', autor=v) for v in vereadores]
+    lista += [caminho('/api/vereador', nome=v) for v in vereadores]
+    lista += [caminho('/api/pl', numero=p) for p in pls]
+    lista += [caminho('/api/pls/parados', dias=dias) for dias in (30, 90)]
+    lista += [caminho('/api/busca', q=termo) for termo in ('2025', 'aprovado', vereadores[0] if vereadores else 'pl')]
+    lista += [caminho('/api/parcerias', medida=medida) for medida in ('Frequência', 'Jaccard', 'Lift')]
+    return lista
+
+
+def carga(host, porta, lista, clientes, duracao, etags=None):
+    """Pedidos em laço por `duracao` segundos; devolve latências (s) e contagem de status"""
+    latencias = [[] for _ in range(clientes)]
+    status = [{} for _ in range(clientes)]
+    inicio = threading.Barrier(clientes + 1)
+    fim = []
+
+    def cliente(i):
+        conexao = http.client.HTTPConnection(host, porta, timeout=30)
+        inicio.wait()
+        n = i
+        while time.perf_counter() < fim[0]:
+            pedido = lista[n % len(lista)]
+            t0 = time.perf_counter()
+            codigo, _, _ = obter(conexao, pedido, etags.get(pedido) if etags else None)
+            latencias[i].append(time.perf_counter() - t0)
+            status[i][codigo] = status[i].get(codigo, 0) + 1
+            n += 1
+        conexao.close()
+
+    threads = [threading.Thread(target=cliente, args=(i,)) for i in range(clientes)]
+    for thread in threads:
+        thread.start()
+    fim.append(time.perf_counter() + duracao)
+    t0 = time.perf_counter()
+    inicio.wait()
+    for thread in threads:
+        thread.join()
+    decorrido = time.perf_counter() - t0
+
+    contagem = {}
+    for parcial in status:
+        for codigo, n in parcial.items():
+            contagem[codigo] = contagem.get(codigo, 0) + n
+    return np.concatenate([np.array(l) for l in latencias]), contagem, decorrido
+
+
+def linha(nome, latencias, decorrido, contagem):
+    p50, p99 = np.percentile(latencias, [50, 99]) * 1000
+    return (f"{nome:<26}{len(latencias):>9,}{len(latencias) / decorrido:>10.0f}"
+            f"{p50:>9.2f}{p99:>9.2f}{latencias.max() * 1000:>9.1f}   {dict(sorted(contagem.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default=None, help='instância já em execução (padrão: sobe uma local)')
+    parser.add_argument('--clientes', type=int, default=8)
+    parser.add_argument('--duracao', type=float, default=10.0, help='segundos de carga em cada fase')
+    args = parser.parse_args()
+
+    processo = None
+    if args.url:
+        partes = urlsplit(args.url)
+        host, porta = partes.hostname, partes.port or 80
+    else:
+        host, porta = '127.0.0.1', porta_livre()
+        processo = subir_instancia(porta)
+
+    try:
+        conexao = http.client.HTTPConnection(host, porta, timeout=60)
+        lista = consultas(conexao)
+
+        # Primeira passada: cada consulta calculada uma vez (cache vazio para ela)
+        frias, etags = [], {}
+        for pedido in lista:
+            t0 = time.perf_counter()
+            codigo, etag, _ = obter(conexao, pedido)
+            frias.append(time.perf_counter() - t0)
+            etags[pedido] = etag
+        frias = np.array(frias)
+        conexao.close()
+
+        print(f"{len(lista)} consultas distintas, {args.clientes} clientes, {args.duracao:.0f}s por fase"
+              f" ({os.cpu_count()} núcleos)")
+        print(f"{'Fase':<26}{'pedidos':>9}{'pedidos/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'máx ms':>9}   status")
+        print(linha('Primeira passada', frias, frias.sum(), {200: len(frias)}))
+        latencias, contagem, decorrido = carga(host, porta, lista, args.clientes, args.duracao)
+        print(linha('Cache cheio', latencias, decorrido, contagem))
+        latencias, contagem, decorrido = carga(host, porta, lista, args.clientes, args.duracao, etags)
+        print(linha('If-None-Match (304)', latencias, decorrido, contagem))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+
+if __name__ == '__main__':
+    main()
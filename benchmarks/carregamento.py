@@ -0,0 +1,79 @@
+"""
+Relatório de memória e latência: leitura do CSV x cache Parquet
+
+Uso:
+    python -m benchmarks.carregamento [--linhas 1000000] [--repeticoes 5]
+
+Com --linhas, a base real é replicada (com fontes distintas) até o
+tamanho pedido, num diretório temporário.
+"""
+
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.medicao import cronometrar, formatar_bytes
+from dados import COLUNAS_CATEGORICAS, caminho_presencas, caminho_sidecar, carregar_base, ler_csv
+
+BASE_PADRAO = 'base_observatorio_teresopolis_COMPLETA.csv'
+
+
+def gerar_csv_ampliado(origem, destino, linhas):
+    """Replica a base até atingir o número de linhas pedido"""
+    base = pd.read_csv(origem)
+    copias = -(-linhas // len(base))
+    partes = []
+    for i in range(copias):
+        parte = base.copy()
+        parte['Fonte'] = parte['Fonte'] + f'-{i}'
+        partes.append(parte)
+    pd.concat(partes, ignore_index=True).head(linhas).to_csv(destino, index=False)
+
+
+def memoria_objeto(df):
+    """Memória do DataFrame com as colunas de texto como object (layout antigo)"""
+    colunas = [c for c in COLUNAS_CATEGORICAS if c in df.columns]
+    return df.astype({c: object for c in colunas}).memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--csv', default=BASE_PADRAO)
+    parser.add_argument('--linhas', type=int, default=0,
+                        help='amplia a base até N linhas (0 = usa a base real)')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, 'base.csv')
+        if args.linhas:
+            gerar_csv_ampliado(args.csv, caminho, args.linhas)
+        else:
+            with open(args.csv, 'rb') as origem, open(caminho, 'wb') as destino:
+                destino.write(origem.read())
+
+        mediana_csv, minimo_csv, (df_csv, _) = cronometrar(lambda: ler_csv(caminho), args.repeticoes)
+        _, construcao, _ = cronometrar(lambda: carregar_base(caminho), 1)
+        mediana_cache, minimo_cache, df_cache = cronometrar(lambda: carregar_base(caminho), args.repeticoes)
+
+        pd.testing.assert_frame_equal(df_csv, df_cache)
+
+        print(f"Linhas: {len(df_csv):,}")
+        print(f"Arquivo CSV:      {formatar_bytes(os.path.getsize(caminho))}")
+        print(f"Arquivo Parquet:  {formatar_bytes(os.path.getsize(caminho_sidecar(caminho)))}"
+              f" + presenças {formatar_bytes(os.path.getsize(caminho_presencas(caminho)))}")
+        print()
+        print(f"{'Caminho':<28}{'mediana':>12}{'mínimo':>12}")
+        print(f"{'CSV (ler_csv)':<28}{mediana_csv * 1000:>10.1f}ms{minimo_csv * 1000:>10.1f}ms")
+        print(f"{'Construção do cache':<28}{construcao * 1000:>10.1f}ms")
+        print(f"{'Parquet (carregar_base)':<28}{mediana_cache * 1000:>10.1f}ms{minimo_cache * 1000:>10.1f}ms")
+        print(f"Aceleração: {mediana_csv / mediana_cache:.1f}x")
+        print()
+        print(f"Memória (colunas object):     {formatar_bytes(memoria_objeto(df_cache))}")
+        print(f"Memória (colunas categóricas): {formatar_bytes(df_cache.memory_usage(deep=True).sum())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Exportação da aba Dados Detalhados: CSV montado a cada rerun x sob demanda
+
+Roda com o AppTest do Streamlit um script com o miolo da aba (tabela
+ordenada com a lista de presentes e o botão de download) numa base ampliada,
+de dois jeitos: "ansioso" (como era: `to_csv` inteiro em memória a cada
+rerun, para o st.download_button) e "sob_demanda" (exportacao.py: só o
+seletor de formato e o botão de preparar). No servidor, o modo ansioso
+ainda mantém os bytes do CSV registrados por sessão.
+
+Depois mede a geração sob demanda de cada formato frente ao `to_csv`
+inteiro em memória. Cada medida roda num subprocesso próprio e informa o
+tempo e quanto o pico de memória residente subiu durante a medida.
+
+Uso:
+    python -m benchmarks.exportacao [--linhas 200000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MEDIDAS = ['rerun:ansioso', 'rerun:sob_demanda', 'gerar:to_csv', 'gerar:CSV', 'gerar:Parquet',
+           'gerar:Excel (XLSX)']
+
+
+def _script(modo, csv):
+    import streamlit as st
+
+    from dados import carregar
+
+    @st.cache_resource
+    def tabela(csv):
+        df, presencas = carregar(csv)
+        return presencas.juntar(df.sort_values('Data Sessão', ascending=False))
+
+    df_ordenado = tabela(csv)
+    st.dataframe(df_ordenado[['Data Sessão', 'PL', 'Autor', 'Status', 'Presentes', 'Fonte']], height=500)
+    if modo == 'ansioso':
+        st.download_button(label="📥 Baixar dados em CSV", data=df_ordenado.to_csv(index=False),
+                           file_name='observatorio.csv', mime='text/csv')
+    else:
+        from exportacao import FORMATOS
+        st.selectbox('Formato:', list(FORMATOS))
+        st.button('⚙️ Preparar arquivo CSV')
+
+
+def executar_medida(medida, csv, pasta, repeticoes=3):
+    """Tempo (mediana, no caso dos reruns) e aumento do pico de RSS da medida"""
+    import logging
+
+    from benchmarks.medicao import pico_rss
+
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    tipo, nome = medida.split(':', 1)
+
+    if tipo == 'rerun':
+        from streamlit.testing.v1 import AppTest
+
+        app = AppTest.from_function(_script, args=(nome, csv), default_timeout=600)
+        app.run()
+        assert not app.exception, [e.value for e in app.exception]
+        rss = pico_rss()
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            app.run()
+            tempos.append(time.perf_counter() - inicio)
+        return {'segundos': statistics.median(tempos), 'rss': pico_rss() - rss}
+
+    from dados import carregar
+    from exportacao import CacheExportacao
+
+    df, presencas = carregar(csv)
+    df_ordenado = presencas.juntar(df.sort_values('Data Sessão', ascending=False))
+    rss = pico_rss()
+    inicio = time.perf_counter()
+    if nome == 'to_csv':
+        tamanho = len(df_ordenado.to_csv(index=False).encode())
+    else:
+        with CacheExportacao(pasta).abrir('bench', nome, df_ordenado) as arquivo:
+            tamanho = os.fstat(arquivo.fileno()).st_size
+    return {'segundos': time.perf_counter() - inicio, 'rss': pico_rss() - rss, 'tamanho': tamanho}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download CSV a cada rerun x exportação sob demanda')
+    parser.add_argument('--linhas', type=int, default=200_000)
+    parser.add_argument('--csv', default='base_observatorio_teresopolis_COMPLETA.csv')
+    parser.add_argument('--medida', choices=MEDIDAS, help=argparse.SUPPRESS)
+    parser.add_argument('--pasta', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medida:
+        print(json.dumps(executar_medida(args.medida, args.csv, args.pasta)))
+        return
+
+    from benchmarks.carregamento import gerar_csv_ampliado
+    from benchmarks.medicao import formatar_bytes
+    from dados import carregar
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = os.path.join(tmp, 'base.csv')
+        gerar_csv_ampliado(args.csv, csv, args.linhas)
+        # Cache Parquet da base gerado antes, fora das medidas
+        carregar(csv)
+
+        resultados = {}
+        for medida in MEDIDAS:
+            pasta = tempfile.mkdtemp(dir=tmp)
+            saida = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.exportacao', '--medida', medida, '--csv', csv,
+                 '--pasta', pasta],
+                check=True, capture_output=True, text=True
+            )
+            resultados[medida] = json.loads(saida.stdout.strip().splitlines()[-1])
+
+    print(f"Base de {args.linhas} linhas, aba Dados Detalhados\n")
+    print(f"{'Rerun':<14}{'mediana':>10}{'RSS acrescido':>16}")
+    for modo in ['ansioso', 'sob_demanda']:
+        r = resultados[f'rerun:{modo}']
+        print(f"{modo:<14}{r['segundos'] * 1000:>8.0f}ms{formatar_bytes(r['rss']):>16}")
+
+    print(f"\n{'Geração':<26}{'tempo':>9}{'RSS acrescido':>16}{'tamanho':>12}")
+    for medida in MEDIDAS[2:]:
+        r = resultados[medida]
+        nome = 'to_csv inteiro (ansioso)' if medida == 'gerar:to_csv' else medida.split(':', 1)[1] + ' sob demanda'
+        print(f"{nome:<26}{r['segundos'] * 1000:>7.0f}ms{formatar_bytes(r['rss']):>16}"
+              f"{formatar_bytes(r['tamanho']):>12}")
+
+
+if __name__ == '__main__':
+    main()
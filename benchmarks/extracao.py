@@ -0,0 +1,142 @@
+"""
+Extração das transcrições: motor por regex x motor spaCy (NER)
+
+Gera um corpus sintético de transcrições (ou usa uma pasta existente) e
+roda `extrator.executar` com cada motor num subprocesso próprio,
+informando transcrições e trechos por segundo e o pico de memória
+residente (do processo e do maior processo filho).
+
+Uso:
+    python -m benchmarks.extracao [--transcricoes 200] [--pasta PASTA]
+                                  [--modelo pt_core_news_lg|regras] [--lote 64] [--processos N]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MOTORES = ['regex', 'spacy']
+
+_MESES = ['janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho', 'julho',
+          'agosto', 'setembro', 'outubro', 'novembro', 'dezembro']
+_FALA = ("Senhor presidente, boa tarde a todos. Dando continuidade aos trabalhos desta "
+         "casa legislativa, seguimos com a pauta do dia. ")
+_FORMAS_PL = ['Projeto de Lei nº', 'PL', 'Projeto de Lei número', 'projeto de lei']
+_AUTORIAS = ['de autoria do vereador {}', 'do vereador {}', 'autor o nobre vereador {}', '',
+             'vereadora {}']
+_DESFECHOS = ['Em votação. Os vereadores que aprovam permaneçam como estão. Aprovado.',
+              'Encaminhado para comissão de justiça.', 'Em discussão.', 'Foi rejeitado.', '',
+              'em votação\naprovado']
+
+
+def transcricao_sintetica(rng, pls=8, com_data=True, video_id='abcdefghijk'):
+    """Texto no formato das legendas do YouTube, com chamada, data e PLs"""
+    from vereadores import VEREADORES_MASTER
+
+    nomes = [variacao for variacoes in VEREADORES_MASTER.values() for variacao in variacoes]
+    partes = [f"https://www.youtube.com/watch?v={video_id}\nKind: captions\nLanguage: pt\n",
+              _FALA * rng.randint(1, 5)]
+    if com_data:
+        partes.append(f"Sessão ordinária de {rng.randint(1, 28)} de {rng.choice(_MESES)} "
+                      f"de {rng.choice([2024, 2025])}. ")
+    partes.append("Vamos fazer a chamada dos vereadores: " + ", ".join(rng.sample(nomes, 14)) +
+                  ". Peço a todos que fiquem de pé para a execução do hino. ")
+    for _ in range(pls):
+        pl = f"{rng.randint(1, 250):03d}/{rng.choice([2024, 2025])}"
+        autoria = rng.choice(_AUTORIAS).format(rng.choice(nomes))
+        partes.append(_FALA * rng.randint(0, 6) + f"{rng.choice(_FORMAS_PL)} {pl} {autoria}. " +
+                      _FALA * rng.randint(0, 3) + rng.choice(_DESFECHOS) + " ")
+        if rng.random() < 0.2:
+            partes.append("\n")
+    return ''.join(partes)
+
+
+def gerar_transcricoes(pasta, quantidade, semente=0):
+    """Grava `quantidade` transcrições sintéticas (10% sem data no corpo)"""
+    rng = random.Random(semente)
+    caracteres = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-'
+    os.makedirs(pasta, exist_ok=True)
+    for _ in range(quantidade):
+        video_id = ''.join(rng.choice(caracteres) for _ in range(11))
+        texto = transcricao_sintetica(rng, rng.randint(2, 15), rng.random() < 0.9, video_id)
+        with open(os.path.join(pasta, f'video-{video_id}-ytranscript.txt'), 'w', encoding='utf-8') as f:
+            f.write(texto)
+
+
+def executar_motor(motor, pasta, modelo, tamanho_lote, processos):
+    """Extrai a pasta inteira com o motor e devolve as métricas"""
+    import contextlib
+    import io
+
+    from benchmarks.medicao import pico_rss
+    from extrator import executar
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = executar(pasta, os.path.join(tmp, 'base.csv'), processos, reprocessar_tudo=True,
+                             usar_youtube=False, motor=motor, modelo=modelo, tamanho_lote=tamanho_lote)
+        decorrido = time.perf_counter() - inicio
+
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+    return {
+        'motor': motor,
+        'segundos': decorrido,
+        'transcricoes': stats['pendentes'],
+        'trechos': stats['pls_total'] + stats['pls_sem_autor'],
+        'pls': stats['pls_total'],
+        'rss_pico': pico_rss(),
+        'rss_pico_filhos': filhos,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara os motores de extração')
+    parser.add_argument('--pasta', default=None, help='transcrições reais (padrão: corpus sintético)')
+    parser.add_argument('--transcricoes', type=int, default=200)
+    parser.add_argument('--modelo', default='pt_core_news_lg')
+    parser.add_argument('--lote', type=int, default=64)
+    parser.add_argument('--processos', type=int, default=1)
+    parser.add_argument('--motor', choices=MOTORES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.motor:
+        resultado = executar_motor(args.motor, args.pasta, args.modelo, args.lote, args.processos)
+        print(json.dumps(resultado))
+        return
+
+    from benchmarks.medicao import formatar_bytes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = args.pasta
+        if pasta is None:
+            pasta = os.path.join(tmp, 'transcricoes')
+            gerar_transcricoes(pasta, args.transcricoes)
+
+        resultados = []
+        for motor in MOTORES:
+            saida = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.extracao', '--motor', motor, '--pasta', pasta,
+                 '--modelo', args.modelo, '--lote', str(args.lote), '--processos', str(args.processos)],
+                check=True, capture_output=True, text=True
+            )
+            resultados.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+
+    print(f"{resultados[0]['transcricoes']} transcrições, {args.processos} processo(s), "
+          f"modelo spaCy: {args.modelo}\n")
+    print(f"{'Motor':<8}{'tempo':>9}{'transcr./s':>12}{'trechos/s':>12}{'PLs':>7}"
+          f"{'RSS pico':>13}{'RSS filhos':>13}")
+    for r in resultados:
+        print(f"{r['motor']:<8}{r['segundos']:>8.2f}s{r['transcricoes'] / r['segundos']:>12.1f}"
+              f"{r['trechos'] / r['segundos']:>12.1f}{r['pls']:>7}"
+              f"{formatar_bytes(r['rss_pico']):>13}{formatar_bytes(r['rss_pico_filhos']):>13}")
+
+
+if __name__ == '__main__':
+    main()
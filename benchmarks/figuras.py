@@ -0,0 +1,151 @@
+"""
+Cache de figuras e agrupamento adaptativo: CPU por rerun e bytes de gráficos
+
+Gera uma base que cobre vários anos (a base real replicada e deslocada no
+tempo) e roda o app.py com o AppTest do Streamlit, num subprocesso por modo,
+simulando vários espectadores em sequência (mesmo processo, então caches
+compartilhados como num servidor): cada um abre o painel, passa por todas as
+abas e troca o período duas vezes. No modo "sem_cache" as figuras são
+montadas a cada rerun e as séries ficam mensais, como antes.
+
+Informa a mediana do tempo de rerun por espectador e os bytes das
+especificações plotly enviadas; "após cache de mensagens" desconta as
+especificações de 10 kB ou mais que o Streamlit manda como referência por
+já terem ido àquele navegador (mensagem idêntica byte a byte).
+
+Uso:
+    python -m benchmarks.figuras [--anos 12] [--espectadores 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+MODOS = ['sem_cache', 'cache']
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIN_MENSAGEM_CACHE = 10_000
+
+
+def gerar_csv_anos(origem, destino, anos):
+    """Base real replicada para a frente no tempo (a carga descarta datas antigas) até cobrir `anos` anos"""
+    base = pd.read_csv(origem)
+    datas = pd.to_datetime(base['Data Sessão'])
+    passo = pd.DateOffset(months=(datas.max().year - datas.min().year) * 12 +
+                          datas.max().month - datas.min().month + 1)
+    partes = []
+    for i in range(-(-anos * 12 // passo.months)):
+        parte = base.copy()
+        parte['Data Sessão'] = (datas + passo * i).dt.strftime('%Y-%m-%d')
+        parte['Fonte'] = parte['Fonte'] + f'-{i}'
+        partes.append(parte)
+    pd.concat(partes, ignore_index=True).to_csv(destino, index=False)
+
+
+def especificacoes(no):
+    """Especificações plotly (JSON) na árvore de elementos do AppTest"""
+    proto = getattr(no, 'proto', None)
+    if proto is not None and type(proto).__name__ == 'PlotlyChart':
+        yield proto.spec
+    filhos = getattr(no, 'children', None)
+    if isinstance(filhos, dict):
+        for filho in filhos.values():
+            yield from especificacoes(filho)
+
+
+def executar_modo(modo, pasta, espectadores):
+    import logging
+
+    from streamlit.testing.v1 import AppTest
+
+    import figuras
+
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    if modo == 'sem_cache':
+        figuras.CacheFiguras.figura = lambda self, nome, dados, construir, *parametros: construir()
+        figuras.agrupar_serie = lambda serie, max_pontos=None: (serie, 'Mês')
+    os.chdir(pasta)
+
+    tempos, enviados, apos_cache = [], 0, 0
+    for _ in range(espectadores):
+        app = AppTest.from_file(os.path.join(RAIZ, 'app.py'), default_timeout=600)
+        ja_enviadas = set()
+        passos = [lambda: None]
+        passos += [lambda aba=aba: app.session_state.__setitem__('aba', aba)
+                   for aba in ['📊 Dashboard', '👥 Análise por Vereador', '📊 Estatísticas Avançadas',
+                               '🙋 Presença', '📈 Linha do Tempo', '📊 Dashboard']]
+        passos += [lambda periodo=periodo: app.sidebar.selectbox[0].set_value(periodo)
+                   for periodo in ['Últimos 6 meses', 'Todo o período']]
+        decorrido = []
+        for passo in passos:
+            passo()
+            inicio = time.perf_counter()
+            app.run()
+            decorrido.append(time.perf_counter() - inicio)
+            assert not app.exception, [e.value for e in app.exception]
+            for spec in especificacoes(app._tree):
+                enviados += len(spec)
+                if len(spec) < MIN_MENSAGEM_CACHE or spec not in ja_enviadas:
+                    apos_cache += len(spec)
+                ja_enviadas.add(spec)
+        tempos.append(statistics.median(decorrido))
+    return {'tempos': tempos, 'enviados': enviados, 'apos_cache': apos_cache, 'reruns': espectadores * len(passos)}
+
+
+def pontos_evolucao(csv):
+    """Pontos do gráfico de evolução temporal (mensal x agrupado) na base gerada"""
+    from agregacoes import CuboAgregado
+    from dados import carregar
+    from figuras import agrupar_serie
+
+    df, _ = carregar(csv, usar_cache=False)
+    mensal = CuboAgregado.montar(df).por_mes()
+    agrupada, nivel = agrupar_serie(mensal)
+    return len(mensal), len(agrupada), nivel
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cache de figuras: CPU por rerun e bytes de gráficos')
+    parser.add_argument('--anos', type=int, default=12)
+    parser.add_argument('--espectadores', type=int, default=5)
+    parser.add_argument('--csv', default=os.path.join(RAIZ, 'base_observatorio_teresopolis_COMPLETA.csv'))
+    parser.add_argument('--modo', choices=MODOS, help=argparse.SUPPRESS)
+    parser.add_argument('--pasta', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        print(json.dumps(executar_modo(args.modo, args.pasta, args.espectadores)))
+        return
+
+    from benchmarks.medicao import formatar_bytes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        destino = os.path.join(tmp, 'base_observatorio_teresopolis_COMPLETA.csv')
+        gerar_csv_anos(args.csv, destino, args.anos)
+        mensal, agrupada, nivel = pontos_evolucao(destino)
+
+        resultados = {}
+        for modo in MODOS:
+            saida = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.figuras', '--modo', modo, '--pasta', tmp,
+                 '--espectadores', str(args.espectadores)],
+                check=True, capture_output=True, text=True, cwd=RAIZ, env={**os.environ, 'PYTHONPATH': RAIZ}
+            )
+            resultados[modo] = json.loads(saida.stdout.strip().splitlines()[-1])
+
+    print(f"Base de {args.anos} anos: evolução temporal com {mensal} meses -> {agrupada} pontos ({nivel})\n")
+    print(f"{'Modo':<12}{'1º espectador':>15}{'demais':>10}{'gráficos/rerun':>17}{'após cache de mensagens':>26}")
+    for modo, r in resultados.items():
+        demais = statistics.median(r['tempos'][1:]) if len(r['tempos']) > 1 else float('nan')
+        print(f"{modo:<12}{r['tempos'][0] * 1000:>13.0f}ms{demais * 1000:>8.0f}ms"
+              f"{formatar_bytes(r['enviados'] / r['reruns']):>17}{formatar_bytes(r['apos_cache'] / r['reruns']):>26}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Histórico de PL e busca: widgets por evento x renderização em lote
+
+Renderiza com o AppTest do Streamlit (i) o histórico de um PL sintético com
+centenas a milhares de eventos e (ii) os resultados de uma busca que casa
+com muitos PLs, das duas formas: a antiga (um bloco de widgets por evento,
+um expander com quadro por PL, sem limite) e a atual (historico.py: uma
+figura e um quadro; busca paginada com uma tabela por página e o histórico
+só do PL escolhido). Informa a mediana do rerun, o número de elementos e o
+tamanho das mensagens dos elementos (protobuf), que é o que vai ao navegador.
+
+Uso:
+    python -m benchmarks.linha_do_tempo [--eventos 100 500 2000] [--pls 20 200]
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+MODOS = ['por_evento', 'lote']
+STATUS = ['Em Discussão', 'Encaminhado para Comissão', 'Não identificado',
+          'Aprovado (Votação Simbólica)', 'Rejeitado']
+POR_PAGINA = 20
+
+
+def base_sintetica(pls, eventos_por_pl, semente=0):
+    """Base com `pls` PLs de um mesmo autor e `eventos_por_pl` eventos cada, em ordem de data"""
+    rng = np.random.default_rng(semente)
+    total = pls * eventos_por_pl
+    datas = pd.Timestamp('2021-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 1500, total)), unit='D')
+    return pd.DataFrame({
+        'Data Sessão': datas,
+        'PL': [f'{i:03d}/2025' for i in rng.integers(0, pls, total)],
+        'Autor': 'Maurício Lopes',
+        'Status': rng.choice(STATUS, total),
+        'Fonte': [f'video-{i:011d}-ytranscript.txt' for i in rng.integers(0, max(1, total // 3), total)],
+    })
+
+
+def historico_por_evento(df_pl):
+    """O histórico como era: colunas, markdowns e divisor para cada evento"""
+    import streamlit as st
+
+    from historico import EMOJI_STATUS
+
+    for idx, row in df_pl.iterrows():
+        with st.container():
+            col1, col2 = st.columns([1, 4])
+            with col1:
+                st.markdown(f"**{row['Data Sessão'].strftime('%d/%m/%Y')}**")
+            with col2:
+                st.markdown(f"{EMOJI_STATUS.get(row['Status'], '📋')} **{row['Status']}**")
+                st.caption(f"Fonte: {row['Fonte']}")
+            st.divider()
+
+
+def busca_por_evento(df, indice, ciclo_vida, termo):
+    """A busca como era: um expander com resumo e quadro para cada PL encontrado"""
+    import streamlit as st
+
+    for resultado in indice.buscar(termo, pagina=1, por_pagina=10 ** 9).resultados:
+        resumo_pl = ciclo_vida.resumo(resultado.pl)
+        with st.expander(f"📋 PL {resultado.pl} - {resumo_pl['Autor']}"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown(f"**Autor:** {resumo_pl['Autor']}")
+                st.markdown(f"**Primeira Menção:** {resumo_pl['Primeira Sessão'].strftime('%d/%m/%Y')}")
+            with col2:
+                st.markdown(f"**Status Atual:** {resumo_pl['Status Atual']}")
+                st.markdown(f"**Última Menção:** {resumo_pl['Última Sessão'].strftime('%d/%m/%Y')}")
+            st.markdown("**Histórico:**")
+            st.dataframe(df.iloc[resultado.linhas][['Data Sessão', 'Status', 'Fonte']],
+                         use_container_width=True, hide_index=True)
+
+
+def busca_em_lote(df, indice, ciclo_vida, termo):
+    """A busca atual: uma tabela por página e o histórico do PL escolhido"""
+    import streamlit as st
+
+    from historico import quadro_resultados, renderizar_historico
+
+    busca = indice.buscar(termo, pagina=1, por_pagina=POR_PAGINA)
+    st.number_input(f'Página (de {busca.paginas}):', min_value=1, max_value=busca.paginas)
+    st.dataframe(quadro_resultados(busca.resultados, ciclo_vida), use_container_width=True, hide_index=True)
+    resultado = busca.resultados[0]
+    st.selectbox('Histórico do PL:', [r.pl for r in busca.resultados])
+    renderizar_historico(df.iloc[resultado.linhas])
+
+
+def cenario(tipo, modo, pls, eventos_por_pl):
+    """Script renderizado pelo AppTest; a base e os índices ficam em cache entre reruns"""
+    import streamlit as st
+
+    from busca import IndiceBusca
+    from ciclo_vida import CicloVida
+
+    @st.cache_resource
+    def preparar(pls, eventos_por_pl):
+        df = base_sintetica(pls, eventos_por_pl)
+        return df, IndiceBusca(df), CicloVida(df)
+
+    df, indice, ciclo_vida = preparar(pls, eventos_por_pl)
+    if tipo == 'historico':
+        df_pl = df.iloc[ciclo_vida.eventos(ciclo_vida.tabela.index[0])]
+        if modo == 'por_evento':
+            historico_por_evento(df_pl)
+        else:
+            from historico import renderizar_historico
+            renderizar_historico(df_pl)
+    elif modo == 'por_evento':
+        busca_por_evento(df, indice, ciclo_vida, 'mauricio')
+    else:
+        busca_em_lote(df, indice, ciclo_vida, 'mauricio')
+
+
+def _script(tipo, modo, pls, eventos_por_pl):
+    from benchmarks.linha_do_tempo import cenario
+    cenario(tipo, modo, pls, eventos_por_pl)
+
+
+def elementos(no):
+    """Número de elementos e bytes das mensagens de elemento na árvore do AppTest"""
+    total, tamanho = 0, 0
+    proto = getattr(no, 'proto', None)
+    if proto is not None and hasattr(proto, 'ByteSize'):
+        total, tamanho = 1, proto.ByteSize()
+    filhos = getattr(no, 'children', None)
+    if isinstance(filhos, dict):
+        for filho in filhos.values():
+            n, b = elementos(filho)
+            total += n
+            tamanho += b
+    return total, tamanho
+
+
+def medir(tipo, modo, pls, eventos_por_pl, repeticoes=3):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(_script, args=(tipo, modo, pls, eventos_por_pl), default_timeout=600)
+    app.run()
+    assert not app.exception, [e.value for e in app.exception]
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        app.run()
+        tempos.append(time.perf_counter() - inicio)
+    n, tamanho = elementos(app._tree)
+    return statistics.median(tempos), n, tamanho
+
+
+def main():
+    import logging
+
+    from benchmarks.medicao import formatar_bytes
+
+    parser = argparse.ArgumentParser(description='Widgets por evento x renderização em lote')
+    parser.add_argument('--eventos', type=int, nargs='+', default=[100, 500, 2000],
+                        help='eventos do PL no histórico')
+    parser.add_argument('--pls', type=int, nargs='+', default=[20, 200],
+                        help='PLs encontrados pela busca (50 eventos cada)')
+    args = parser.parse_args()
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    casos = [('historico', 1, n) for n in args.eventos] + [('busca', n, 50) for n in args.pls]
+    print(f"{'Cenário':<28}{'Modo':>12}{'rerun':>10}{'elementos':>11}{'mensagens':>12}")
+    for tipo, pls, eventos_por_pl in casos:
+        rotulo = f'histórico, {eventos_por_pl} eventos' if tipo == 'historico' else f'busca, {pls} PLs'
+        for modo in MODOS:
+            segundos, n, tamanho = medir(tipo, modo, pls, eventos_por_pl)
+            print(f"{rotulo:<28}{modo:>12}{segundos * 1000:>8.0f}ms{n:>11}{formatar_bytes(tamanho):>12}")
+
+
+if __name__ == '__main__':
+    main()
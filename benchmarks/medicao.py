@@ -0,0 +1,53 @@
+"""
+Utilitários de medição (tempo e memória) usados pelos benchmarks
+"""
+
+import gc
+import os
+import resource
+import statistics
+import time
+
+
+def rss_atual():
+    """Memória residente atual do processo, em bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Sem /proc (macOS): usa o pico como aproximação
+        return pico_rss()
+
+
+def pico_rss():
+    """Pico de memória residente do processo, em bytes"""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return pico if os.uname().sysname == 'Darwin' else pico * 1024
+
+
+def cronometrar(funcao, repeticoes=5, preparar=None):
+    """
+    Executa a função várias vezes e devolve (mediana, mínimo) em segundos.
+    `preparar` roda antes de cada repetição, fora da medida (ex.: limpar caches).
+    """
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), min(tempos), resultado
+
+
+def formatar_bytes(valor):
+    """Formata bytes em unidade legível"""
+    for unidade in ['B', 'KiB', 'MiB', 'GiB']:
+        if abs(valor) < 1024:
+            return f"{valor:.1f} {unidade}"
+        valor /= 1024
+    return f"{valor:.1f} TiB"
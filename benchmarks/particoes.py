@@ -0,0 +1,100 @@
+"""
+Relatório da base particionada por ano/mês (armazem.py) x CSV com cache Parquet
+
+Uso:
+    python -m benchmarks.particoes [--linhas 1e6] [--anos 6] [--repeticoes 3]
+
+O cache Parquet guarda a base já preparada (só reaproveitável enquanto o
+CSV não muda); a base particionada é preparada a cada carga, como o CSV.
+A base sintética começa `--anos // 2` anos antes de DATA_MINIMA, como uma
+base que acumula o histórico: a carga completa do painel poda as partições
+antigas, e as cargas por período (últimos 30 dias, 3 e 6 meses) abrem só os
+meses do período. O acréscimo de uma sessão compara a reescrita do CSV
+inteiro (extrator sem --particionado) com a de uma partição.
+"""
+
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from armazem import anexar, gravar, particoes
+from benchmarks.medicao import cronometrar, formatar_bytes
+from benchmarks.sintetico import gerar_eventos
+from dados import DATA_MINIMA, carregar, carregar_dataset, ler_csv
+from extrator import COLUNAS_BASE, ler_base, mesclar_base
+
+PERIODOS = {'Últimos 30 dias': pd.DateOffset(days=30),
+            'Últimos 3 meses': pd.DateOffset(months=3),
+            'Últimos 6 meses': pd.DateOffset(months=6)}
+
+
+def gerar_base(linhas, anos, semente=0):
+    """Eventos sintéticos com as datas recuadas `anos // 2` anos (parte antes de DATA_MINIMA)"""
+    df = gerar_eventos(linhas, semente, anos)
+    datas = pd.to_datetime(df['Data Sessão']) - pd.DateOffset(years=anos // 2)
+    df['Data Sessão'] = datas.dt.strftime('%Y-%m-%d')
+    return df
+
+
+def nova_sessao(df, eventos=9):
+    """Uma sessão nova (fonte inédita) no último dia da base"""
+    sessao = df.tail(eventos).astype(str).reset_index(drop=True)
+    sessao['Fonte'] = 'video-nova-sessao-ytranscript.txt'
+    return sessao[COLUNAS_BASE]
+
+
+def tamanho_pasta(pasta):
+    return sum(os.path.getsize(os.path.join(raiz, nome))
+               for raiz, _, nomes in os.walk(pasta) for nome in nomes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=lambda valor: int(float(valor)), default=1_000_000)
+    parser.add_argument('--anos', type=int, default=6)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = os.path.join(tmp, 'base.csv')
+        pasta = os.path.join(tmp, 'base_particionada')
+        base = gerar_base(args.linhas, args.anos)
+        base.to_csv(csv, index=False)
+        gravar(ler_base(csv), pasta)
+        carregar(csv)
+
+        print(f"Linhas: {len(base):,} ({args.anos} anos, {len(particoes(pasta))} partições)")
+        print(f"CSV: {formatar_bytes(os.path.getsize(csv))}   "
+              f"Particionada: {formatar_bytes(tamanho_pasta(pasta))}")
+        print()
+
+        print(f"{'Carga':<34}{'mínimo':>12}{'linhas':>12}")
+        _, minimo, _ = cronometrar(lambda: ler_csv(csv), args.repeticoes)
+        print(f"{'CSV sem cache (ler_csv)':<34}{minimo * 1000:>10.1f}ms")
+        _, minimo, (df, _) = cronometrar(lambda: carregar(csv), args.repeticoes)
+        print(f"{f'Cache Parquet (desde {DATA_MINIMA})':<34}{minimo * 1000:>10.1f}ms{len(df):>12,}")
+        _, minimo, (df_ds, _) = cronometrar(lambda: carregar_dataset(pasta), args.repeticoes)
+        print(f"{f'Particionada (desde {DATA_MINIMA})':<34}{minimo * 1000:>10.1f}ms{len(df_ds):>12,}")
+        assert len(df) == len(df_ds)
+
+        fim = df['Data Sessão'].max()
+        for nome, deslocamento in PERIODOS.items():
+            inicio = fim - deslocamento
+            _, minimo, (periodo, _) = cronometrar(lambda: carregar_dataset(pasta, inicio, fim), args.repeticoes)
+            print(f"{f'Particionada ({nome.lower()})':<34}{minimo * 1000:>10.1f}ms{len(periodo):>12,}")
+
+        print()
+        sessao = nova_sessao(base)
+        _, minimo_csv, _ = cronometrar(
+            lambda: mesclar_base(ler_base(csv), sessao, [sessao['Fonte'][0]]).to_csv(csv, index=False),
+            args.repeticoes)
+        _, minimo_ds, reescritas = cronometrar(lambda: anexar(pasta, sessao, [sessao['Fonte'][0]]),
+                                               args.repeticoes)
+        print(f"Acréscimo de uma sessão: CSV inteiro {minimo_csv * 1000:.1f}ms, "
+              f"{len(reescritas)} partição {minimo_ds * 1000:.1f}ms ({minimo_csv / minimo_ds:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Partida a frio do painel: tempo de importação e tempo até a primeira tela
+
+Uso:
+    python -m benchmarks.partida [--linhas 2e5] [--anos 3] [--repeticoes 3]
+
+Cada medida é um processo novo do Python com `-X importtime`, sobre uma base
+sintética (CSV com o cache Parquet já gravado, como num servidor que já
+rodou uma vez) numa pasta temporária:
+
+- importações do cabeçalho: o que o app.py importava antes da primeira tela
+  (pandas, numpy, plotly.express, plotly.graph_objects e os módulos do
+  painel) x o que importa agora (instantaneo e instrumentacao);
+- execução do app.py (AppTest, no modo de perfil) sem e com o instantâneo
+  de partida: primeira tela (do início da execução até o fim da linha de
+  indicadores, pelo registro do perfil), execução completa e as
+  importações feitas durante a execução.
+
+O Streamlit em si (importado por qualquer processo do painel) fica fora
+das contas e é mostrado à parte. O AppTest já importa o pandas antes da
+execução, então o custo dele aparece só na comparação do cabeçalho.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARCA = '### partida: início da medida'
+
+CABECALHO_ANTERIOR = ['pandas', 'plotly.express', 'plotly.graph_objects', 'numpy', 'dados', 'exportacao',
+                      'agregacoes', 'busca', 'ciclo_vida', 'figuras', 'filtros', 'historico',
+                      'instrumentacao', 'parcerias']
+CABECALHO_ATUAL = ['instantaneo', 'instrumentacao']
+PACOTES = ['pandas', 'numpy', 'pyarrow', 'plotly']
+
+_LINHA_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def importacoes(stderr):
+    """
+    Importações de primeiro nível registradas depois da marca, como
+    {módulo: ms acumulados}: cada uma já inclui as que ela puxou
+    """
+    resultado = {}
+    depois = stderr.split(MARCA, 1)[1] if MARCA in stderr else ''
+    for linha in depois.splitlines():
+        encontrada = _LINHA_IMPORTTIME.match(linha)
+        if encontrada and not encontrada.group(3):
+            resultado[encontrada.group(4)] = int(encontrada.group(2)) / 1000
+    return resultado
+
+
+def por_pacote(importados):
+    """ms de importação de cada pacote pesado (0 se não foi importado)"""
+    return {p: sum(ms for m, ms in importados.items() if m == p or m.startswith(p + '.')) for p in PACOTES}
+
+
+def filho_importar(modulos, antes):
+    """Processo filho: importa `antes` (fora da medida) e os módulos depois da marca"""
+    for modulo in antes:
+        __import__(modulo)
+    print(MARCA, file=sys.stderr, flush=True)
+    for modulo in modulos:
+        __import__(modulo)
+
+
+def filho_app(pasta):
+    """Processo filho: executa o app.py na pasta da base e imprime as medidas em JSON"""
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(pasta)
+    print(MARCA, file=sys.stderr, flush=True)
+    inicio = datetime.now()
+    t0 = time.perf_counter()
+    at = AppTest.from_file(os.path.join(RAIZ, 'app.py'), default_timeout=600).run()
+    execucao = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError([e.value for e in at.exception])
+
+    with open(os.environ['OBSERVATORIO_PERFIL_LOG'], encoding='utf-8') as f:
+        registros = [json.loads(linha) for linha in f]
+    secoes = {r['secao']: r['ms'] for r in registros if r['tipo'] == 'secao'}
+    indicadores = next(r for r in registros if r.get('secao') == 'Indicadores')
+    primeira_tela = (datetime.fromisoformat(indicadores['ts']) - inicio).total_seconds()
+    print(json.dumps({'primeira_tela_ms': primeira_tela * 1000, 'execucao_ms': execucao * 1000,
+                      'secoes': secoes}, ensure_ascii=False))
+
+
+def rodar(argumentos, pasta, log=None):
+    """Processo novo com -X importtime; devolve (stdout, stderr)"""
+    ambiente = dict(os.environ, PYTHONPATH=RAIZ, OBSERVATORIO_PERFIL='1',
+                    OBSERVATORIO_PERFIL_LOG=log or os.path.join(pasta, 'perfil.jsonl'),
+                    OBSERVATORIO_PERFIL_PASTA=os.path.join(pasta, 'perfis'))
+    resultado = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'benchmarks.partida', *argumentos],
+                               cwd=pasta, env=ambiente, capture_output=True, text=True)
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr[-3000:])
+    return resultado.stdout, resultado.stderr
+
+
+def medir_cabecalho(modulos, pasta, repeticoes):
+    """Mediana do total importado e por pacote pesado"""
+    totais, pacotes = [], []
+    for _ in range(repeticoes):
+        # O streamlit vem antes da marca: qualquer processo do painel já o importou
+        _, stderr = rodar(['--importar', ','.join(modulos), '--antes', 'streamlit'], pasta)
+        importados = importacoes(stderr)
+        totais.append(sum(importados.values()))
+        pacotes.append(por_pacote(importados))
+    return statistics.median(totais), {p: statistics.median(x[p] for x in pacotes) for p in PACOTES}
+
+
+def medir_app(pasta, repeticoes, instantaneo):
+    """Medianas de uma execução a frio do app.py, com ou sem o instantâneo de partida"""
+    from origem import BASES
+    from instantaneo import caminho_instantaneo
+
+    arquivo = caminho_instantaneo(os.path.join(pasta, BASES[0]))
+    medidas = []
+    for _ in range(repeticoes):
+        if not instantaneo and os.path.exists(arquivo):
+            os.remove(arquivo)
+        log = os.path.join(pasta, 'perfil.jsonl')
+        if os.path.exists(log):
+            os.remove(log)
+        stdout, stderr = rodar(['--app', pasta], pasta, log)
+        medida = json.loads(stdout.strip().splitlines()[-1])
+        importados = importacoes(stderr)
+        medida['importacoes_ms'] = sum(importados.values())
+        medida['pacotes'] = por_pacote(importados)
+        medidas.append(medida)
+        # Sem instantâneo, a própria execução grava um: confere para a rodada "com"
+        if instantaneo and not os.path.exists(arquivo):
+            raise RuntimeError('Instantâneo de partida ausente')
+    return {
+        'primeira_tela_ms': statistics.median(m['primeira_tela_ms'] for m in medidas),
+        'execucao_ms': statistics.median(m['execucao_ms'] for m in medidas),
+        'importacoes_ms': statistics.median(m['importacoes_ms'] for m in medidas),
+        'pacotes': {p: statistics.median(m['pacotes'][p] for m in medidas) for p in PACOTES},
+        'secoes': {s: statistics.median(m['secoes'].get(s, 0) for m in medidas)
+                   for s in ('Carga dos dados', 'Filtros', 'Indicadores')},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=lambda valor: int(float(valor)), default=200_000)
+    parser.add_argument('--anos', type=int, default=3)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--importar', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--antes', default='', help=argparse.SUPPRESS)
+    parser.add_argument('--app', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.importar is not None:
+        return filho_importar(args.importar.split(','), [m for m in args.antes.split(',') if m])
+    if args.app is not None:
+        return filho_app(args.app)
+
+    from benchmarks.sintetico import gerar_eventos
+    from dados import carregar
+    from instantaneo import gerar
+    from origem import BASES
+
+    pasta = tempfile.mkdtemp()
+    try:
+        csv = os.path.join(pasta, BASES[0])
+        gerar_eventos(args.linhas, 0, args.anos).to_csv(csv, index=False)
+        carregar(csv)
+
+        _, stderr = rodar(['--importar', 'streamlit'], pasta)
+        streamlit_ms = importacoes(stderr)['streamlit']
+        print(f"Base sintética: {args.linhas:,} linhas, {args.anos} anos; {args.repeticoes} processos por medida"
+              f" (medianas, {os.cpu_count()} núcleos)")
+        print(f"Importação do streamlit (comum a todos, fora das contas): {streamlit_ms:.0f} ms\n")
+
+        print(f"{'Importações do cabeçalho':<30}{'total ms':>10}" + ''.join(f'{p:>10}' for p in PACOTES))
+        for nome, modulos in (('Antes (pandas, plotly, ...)', CABECALHO_ANTERIOR), ('Agora', CABECALHO_ATUAL)):
+            total, pacotes = medir_cabecalho(modulos, pasta, args.repeticoes)
+            print(f"{nome:<30}{total:>10.0f}" + ''.join(f'{pacotes[p]:>10.0f}' for p in PACOTES))
+
+        rodar(['--app', pasta], pasta)  # aquecimento (bytecode e cache de disco do SO)
+        sem = medir_app(pasta, args.repeticoes, instantaneo=False)
+        gerar([os.path.join(pasta, BASES[0])])
+        com = medir_app(pasta, args.repeticoes, instantaneo=True)
+
+        print(f"\n{'Execução do app.py (ms)':<30}{'sem inst.':>12}{'com inst.':>12}")
+        linhas = [('Primeira tela', 'primeira_tela_ms'), ('Execução completa', 'execucao_ms'),
+                  ('Importações na execução', 'importacoes_ms')]
+        for rotulo, chave in linhas:
+            print(f"{rotulo:<30}{sem[chave]:>12.0f}{com[chave]:>12.0f}")
+        for secao in sem['secoes']:
+            print(f"{'  seção ' + secao:<30}{sem['secoes'][secao]:>12.0f}{com['secoes'][secao]:>12.0f}")
+        for pacote in PACOTES:
+            print(f"{'  importação ' + pacote:<30}{sem['pacotes'][pacote]:>12.0f}{com['pacotes'][pacote]:>12.0f}")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Teste de carga: N sessões simultâneas do Streamlit lendo a base
+
+Compara o modo antigo (@st.cache_data, que entrega uma cópia profunda da
+base a cada rerun) com o modo compartilhado (@st.cache_resource +
+copy-on-write). Cada modo roda num subprocesso próprio para que os picos de
+memória não se misturem.
+
+Uso:
+    python -m benchmarks.sessoes [--sessoes 16] [--reruns 20] [--linhas 500000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+MODOS = ['antes', 'depois']
+
+
+def _rerun(df):
+    """Trabalho típico de um rerun: filtro de período e os KPIs"""
+    import pandas as pd
+
+    inicio = df['Data Sessão'].max() - pd.Timedelta(days=180)
+    df_filtrado = df[df['Data Sessão'] >= inicio]
+    return (
+        len(df_filtrado),
+        df_filtrado['PL'].nunique(),
+        df_filtrado['Status'].str.contains('Aprovado', case=False, na=False).sum(),
+    )
+
+
+def executar_modo(modo, caminho_csv, sessoes, reruns):
+    """Simula as sessões em threads e devolve as métricas do modo"""
+    import pandas as pd
+    import streamlit as st
+
+    from benchmarks.medicao import rss_atual
+    from dados import carregar_base
+
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    if modo == 'depois':
+        pd.set_option('mode.copy_on_write', True)
+        carregar = st.cache_resource(lambda: carregar_base(caminho_csv))
+    else:
+        carregar = st.cache_data(lambda: carregar_base(caminho_csv))
+
+    carregar()
+    rss_inicial = rss_atual()
+    pico = [rss_inicial]
+    tempos = []
+    trava = threading.Lock()
+    barreira = threading.Barrier(sessoes)
+
+    def sessao():
+        for _ in range(reruns):
+            # Todas as sessões fazem o rerun ao mesmo tempo
+            barreira.wait()
+            inicio = time.perf_counter()
+            df = carregar()
+            _rerun(df)
+            decorrido = time.perf_counter() - inicio
+            barreira.wait()
+            with trava:
+                tempos.append(decorrido)
+                pico[0] = max(pico[0], rss_atual())
+            del df
+
+    threads = [threading.Thread(target=sessao) for _ in range(sessoes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    tempos.sort()
+    return {
+        'modo': modo,
+        'rss_base': rss_inicial,
+        'rss_pico': pico[0],
+        'latencia_mediana': statistics.median(tempos),
+        'latencia_p95': tempos[int(len(tempos) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga de sessões simultâneas')
+    parser.add_argument('--csv', default='base_observatorio_teresopolis_COMPLETA.csv')
+    parser.add_argument('--linhas', type=int, default=200_000)
+    parser.add_argument('--sessoes', type=int, default=16)
+    parser.add_argument('--reruns', type=int, default=10)
+    parser.add_argument('--modo', choices=MODOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        resultado = executar_modo(args.modo, args.csv, args.sessoes, args.reruns)
+        print(json.dumps(resultado))
+        return
+
+    from benchmarks.carregamento import gerar_csv_ampliado
+    from benchmarks.medicao import formatar_bytes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, 'base.csv')
+        gerar_csv_ampliado(args.csv, caminho, args.linhas)
+
+        resultados = []
+        for modo in MODOS:
+            saida = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.sessoes', '--modo', modo,
+                 '--csv', caminho, '--sessoes', str(args.sessoes), '--reruns', str(args.reruns)],
+                check=True, capture_output=True, text=True
+            )
+            resultados.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+
+    print(f"{args.sessoes} sessões x {args.reruns} reruns sobre {args.linhas:,} linhas\n")
+    print(f"{'Modo':<10}{'RSS base':>14}{'RSS pico':>14}{'acréscimo':>14}{'mediana':>12}{'p95':>12}")
+    for r in resultados:
+        print(f"{r['modo']:<10}{formatar_bytes(r['rss_base']):>14}{formatar_bytes(r['rss_pico']):>14}"
+              f"{formatar_bytes(r['rss_pico'] - r['rss_base']):>14}"
+              f"{r['latencia_mediana'] * 1000:>10.1f}ms{r['latencia_p95'] * 1000:>10.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Gerador sintético de bases de eventos e de transcrições
+
+`gerar_eventos` monta, de forma vetorizada, uma base no esquema do
+extrator (`Data Sessão, PL, Autor, Status, Votos, Presentes, Fonte`) com a
+forma da base real: cerca de 9 eventos por sessão, uma fonte e uma lista de
+presentes por sessão (parte sem chamada identificada), autoria concentrada
+em poucos vereadores e a distribuição de status observada. Serve de 10³ a
+10⁷ linhas; acima de algumas centenas de milhares de linhas as sessões
+param de crescer e cada uma passa a ter mais eventos.
+
+As transcrições (legendas do YouTube com chamada, menções a PLs e frases de
+votação) vêm de `benchmarks.extracao.gerar_transcricoes`.
+
+Uso:
+    python -m benchmarks.sintetico --linhas 100000 --destino base.csv
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+EVENTOS_POR_SESSAO = 9
+MAX_SESSOES = 50_000
+MAX_PLS = 100_000
+PROPORCAO_SEM_CHAMADA = 0.1
+PROBABILIDADE_PRESENCA = 0.85
+
+# Proporções da base real (mais uma pequena parcela de rejeições)
+STATUS = {
+    'Não identificado': 0.55,
+    'Aprovado (Votação Simbólica)': 0.33,
+    'Em Discussão': 0.07,
+    'Encaminhado para Comissão': 0.04,
+    'Rejeitado': 0.01,
+}
+
+_CARACTERES = np.array(list('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-'))
+
+
+def _dias_uteis(inicio, anos):
+    """Dias úteis a partir de `inicio`, por `anos` anos"""
+    return pd.bdate_range(inicio, pd.Timestamp(inicio) + pd.DateOffset(years=anos) - pd.Timedelta(days=1))
+
+
+def gerar_eventos(linhas, semente=0, anos=3):
+    """Base de eventos com `linhas` linhas, ordenada pela sessão (determinística pela semente)"""
+    from dados import DATA_MINIMA
+    from presencas import SEM_CHAMADA
+    from vereadores import VEREADORES_MASTER
+
+    rng = np.random.default_rng(semente)
+    vereadores = np.array(list(VEREADORES_MASTER))
+
+    # Sessões: datas (dias úteis, com repetição nas bases grandes), fonte e presentes
+    sessoes = min(max(linhas // EVENTOS_POR_SESSAO, 1), MAX_SESSOES)
+    dias = _dias_uteis(DATA_MINIMA, anos)
+    datas_sessao = np.sort(rng.choice(dias.to_numpy(), sessoes))
+    ids = [''.join(linha) for linha in rng.choice(_CARACTERES, (sessoes, 11))]
+    fontes = [f'video-{i}-ytranscript.txt' for i in ids]
+
+    presentes = rng.random((sessoes, len(vereadores))) < PROBABILIDADE_PRESENCA
+    sem_chamada = rng.random(sessoes) < PROPORCAO_SEM_CHAMADA
+    listas = [SEM_CHAMADA if sem else ', '.join(vereadores[marcados])
+              for sem, marcados in zip(sem_chamada, presentes)]
+    codigos_presentes, valores_presentes = pd.factorize(np.array(listas, dtype=object))
+
+    # Eventos distribuídos entre as sessões (toda sessão tem ao menos um)
+    sessao = np.sort(np.concatenate([
+        np.arange(min(sessoes, linhas)), rng.integers(0, sessoes, max(linhas - sessoes, 0))
+    ]))
+
+    # PLs: número por ano de apresentação, autor fixo com autoria concentrada (Zipf)
+    pls = min(max(linhas // 2, 1), MAX_PLS)
+    anos_pl = pd.Timestamp(DATA_MINIMA).year + rng.integers(0, anos, pls)
+    numeros = np.empty(pls, dtype=np.int64)
+    for ano in np.unique(anos_pl):
+        do_ano = anos_pl == ano
+        numeros[do_ano] = np.arange(1, do_ano.sum() + 1)
+    nomes_pl = [f'{n:03d}/{a}' for n, a in zip(numeros, anos_pl)]
+    pesos = 1 / np.arange(1, len(vereadores) + 1)
+    autor_pl = rng.choice(len(vereadores), pls, p=pesos / pesos.sum())
+    pl = rng.integers(0, pls, linhas)
+
+    status = list(STATUS)
+    codigos_status = rng.choice(len(status), linhas, p=np.array(list(STATUS.values())))
+
+    return pd.DataFrame({
+        'Data Sessão': pd.DatetimeIndex(datas_sessao[sessao]).strftime('%Y-%m-%d'),
+        'PL': pd.Categorical.from_codes(pl, nomes_pl),
+        'Autor': pd.Categorical.from_codes(autor_pl[pl], vereadores),
+        'Status': pd.Categorical.from_codes(codigos_status, status),
+        'Votos': 'N/A',
+        'Presentes': pd.Categorical.from_codes(codigos_presentes[sessao], valores_presentes),
+        'Fonte': pd.Categorical.from_codes(sessao, fontes),
+    })
+
+
+def gerar_csv(destino, linhas, semente=0, anos=3):
+    """Grava a base sintética em CSV, bloco a bloco"""
+    from exportacao import escrever_csv
+
+    escrever_csv(gerar_eventos(linhas, semente, anos), destino)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera uma base de eventos sintética em CSV')
+    parser.add_argument('--linhas', type=lambda valor: int(float(valor)), default=100_000)
+    parser.add_argument('--destino', required=True)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--anos', type=int, default=3)
+    args = parser.parse_args()
+    gerar_csv(args.destino, args.linhas, args.semente, args.anos)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+"""
+Suíte de desempenho sobre bases sintéticas, com histórico e limites de regressão
+
+Para cada tamanho de base (padrão 10³, 10⁴ e 10⁵ linhas; 10⁶ e 10⁷ sob
+pedido) gera uma base com `benchmarks.sintetico` e, num subprocesso próprio,
+mede a carga (`carregar` pelo CSV e pelo cache Parquet, como no
+`carregar_dados` do app), a montagem das estruturas compartilhadas, a cadeia
+de filtros da barra lateral (opções, recorte e cubo) e o cálculo de cada
+aba, incluindo o ranking de aprovação e as parcerias. Os caches memorizados
+são limpos antes de cada repetição: mede-se o primeiro acesso a um filtro.
+À parte, mede a extração de transcrições sintéticas, por arquivo, e o cubo
+de agregação numa base maior (padrão 10⁶ linhas): montagem, recorte com
+contagem de PLs únicos e a memória ocupada pelo cubo.
+
+Cada execução acrescenta uma linha JSON ao histórico (data, commit,
+máquina, parâmetros, o melhor tempo de cada medida em segundos, mais
+estável que a mediana entre execuções, o limite aplicado a cada medida e a
+memória do cubo). A medida que passar da mediana das últimas execuções na
+mesma máquina por mais que o seu limite (e por mais que `PISO_SEGUNDOS`) é
+apontada como regressão, assim como a memória do cubo que crescer mais que
+`LIMITE_MEMORIA`, e o processo termina com código 1. Antes disso, as
+bases com medidas suspeitas são medidas de novo e vale o melhor tempo: um
+pico passageiro da máquina não basta para acusar regressão.
+
+Uso:
+    python -m benchmarks.suite [--tamanhos 1e3 1e4 1e5] [--transcricoes 50] [--linhas-cubo 1e6]
+                               [--repeticoes 5]
+                               [--historico benchmarks/historico.jsonl] [--janela 5] [--limite 0.25]
+                               [--nao-gravar]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORICO = os.path.join(RAIZ, 'benchmarks', 'historico.jsonl')
+
+# Aumento relativo tolerado sobre a referência, por medida (prefixo) ou geral
+LIMITE_REGRESSAO = 0.25
+LIMITES = {
+    'carregar:csv': 0.40,
+    'extracao:': 0.40,
+}
+# Diferenças menores que isso (em segundos) são ruído de medida
+PISO_SEGUNDOS = 0.005
+# Aumento relativo tolerado na memória do cubo (determinística para a base)
+LIMITE_MEMORIA = 0.10
+JANELA = 5
+
+
+def limite(medida, geral=LIMITE_REGRESSAO):
+    """Limite de regressão da medida (pelo nome do caso, sem o tamanho)"""
+    caso = medida.split('@', 1)[0]
+    for prefixo, valor in LIMITES.items():
+        if caso.startswith(prefixo):
+            return max(valor, geral)
+    return geral
+
+
+def casos(csv):
+    """(nome, função, preparação) de cada medida sobre a base do CSV"""
+    from datetime import timedelta
+
+    from agregacoes import CuboAgregado
+    from busca import IndiceBusca
+    from ciclo_vida import CicloVida
+    from dados import carregar
+    from figuras import agrupar_serie
+    from filtros import MotorFiltros
+    from historico import quadro_historico, quadro_resultados
+    from parcerias import MEDIDAS, Coocorrencia
+
+    df, presencas = carregar(csv)
+    motor = MotorFiltros(df)
+    cubo_base = CuboAgregado.montar(motor.df)
+    ciclo_vida = CicloVida(motor.df)
+    indice = IndiceBusca(motor.df)
+
+    data_min = motor.df['Data Sessão'].iloc[0].date()
+    data_max = motor.df['Data Sessão'].iloc[-1].date()
+    seis_meses = data_max - timedelta(days=180)
+    autores = list(cubo_base.por_autor().index[:3])
+
+    def limpar():
+        motor._cache.clear()
+        indice._cache.clear()
+
+    def cadeia(inicio, fim, autores=(), status=(), pl=''):
+        """Barra lateral do app: opções do período, recorte e cubo do recorte"""
+        motor.opcoes(inicio, fim)
+        df_filtrado = motor.filtrar(inicio, fim, autores, status, pl)
+        cubo = (CuboAgregado.montar(df_filtrado) if pl
+                else cubo_base.fatiar(inicio, fim, autores, status))
+        return df_filtrado, cubo
+
+    # Abas calculadas sobre o período inteiro, sem outros filtros
+    df_filtrado, cubo = cadeia(data_min, data_max)
+    vereador = autores[0]
+    pl = ciclo_vida.tabela.index[0]
+
+    def indicadores():
+        return (cubo.total_eventos(), cubo.pls_unicos(), cubo.por_autor(), cubo.taxa_aprovacao(),
+                cubo.aprovados(), cubo.sessoes())
+
+    def dashboard():
+        return cubo.por_status().reset_index(), agrupar_serie(cubo.por_mes()), cubo.por_autor().head(10)
+
+    def dados():
+        return presencas.juntar(df_filtrado.sort_values('Data Sessão', ascending=False))
+
+    def por_vereador():
+        cubo_vereador = cubo.fatiar(autores=[vereador])
+        return (sorted(cubo.por_autor().index), cubo.aprovacao_por_autor().loc[vereador],
+                cubo_vereador.por_status().reset_index(), agrupar_serie(cubo_vereador.por_mes()),
+                df_filtrado[df_filtrado['Autor'] == vereador])
+
+    def linha_do_tempo():
+        return (sorted(df_filtrado['PL'].unique()), ciclo_vida.resumo(pl),
+                quadro_historico(motor.df.iloc[ciclo_vida.eventos(pl)]),
+                ciclo_vida.tempo_mediano_aprovacao(), ciclo_vida.parados(dias=90))
+
+    def busca():
+        return [quadro_resultados(indice.buscar(termo).resultados, ciclo_vida)
+                for termo in [vereador, pl, 'aprovado']]
+
+    def fatia_pls():
+        return cubo_base.fatiar(seis_meses, data_max, autores).pls_unicos()
+
+    def aprovacao():
+        return [cubo.aprovacao_por_autor(minimo=3, ordenar_por=ordem).head(10)
+                for ordem in ['Wilson Inferior (%)', 'Taxa de Aprovação (%)']]
+
+    def parcerias():
+        coocorrencia = Coocorrencia.do_cubo(cubo)
+        return [coocorrencia.principais(k=10, medida=medida) for medida in MEDIDAS]
+
+    def presenca():
+        presencas_periodo = presencas.periodo(data_min, data_max)
+        return (presencas_periodo.quorum(), presencas_periodo.taxa_presenca(),
+                presencas_periodo.presenca_autoria(df_filtrado))
+
+    return [
+        ('carregar:csv', lambda: carregar(csv, usar_cache=False), None),
+        ('carregar:parquet', lambda: carregar(csv), None),
+        ('montar:motor', lambda: MotorFiltros(df), None),
+        ('montar:cubo', lambda: CuboAgregado.montar(motor.df), None),
+        ('montar:ciclo_vida', lambda: CicloVida(motor.df), None),
+        ('montar:busca', lambda: IndiceBusca(motor.df), None),
+        ('filtros:periodo', lambda: cadeia(data_min, data_max), limpar),
+        ('filtros:6_meses_autores_status', lambda: cadeia(seis_meses, data_max, autores,
+                                                          ['Aprovado (Votação Simbólica)']), limpar),
+        ('filtros:pl', lambda: cadeia(data_min, data_max, pl='01'), limpar),
+        ('cubo:fatia_pls', fatia_pls, None),
+        ('aba:indicadores', indicadores, None),
+        ('aba:dashboard', dashboard, None),
+        ('aba:dados', dados, None),
+        ('aba:vereador', por_vereador, None),
+        ('aba:linha_do_tempo', linha_do_tempo, None),
+        ('aba:busca', busca, limpar),
+        ('aba:estatisticas:mapa_calor', cubo.mapa_calor, None),
+        ('aba:estatisticas:aprovacao', aprovacao, None),
+        ('aba:estatisticas:parcerias', parcerias, None),
+        ('aba:presenca', presenca, None),
+    ]
+
+
+def medir_base(linhas, repeticoes):
+    """Melhor tempo (segundos) de cada caso numa base sintética de `linhas` linhas"""
+    from agregacoes import CuboAgregado
+    from benchmarks.medicao import cronometrar, pico_rss
+    from benchmarks.sintetico import gerar_csv
+    from dados import carregar
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = os.path.join(tmp, 'base.csv')
+        gerar_csv(csv, linhas)
+        # Cache Parquet gerado antes, fora das medidas
+        carregar(csv)
+        medidas = {}
+        for nome, funcao, preparar in casos(csv):
+            _, medidas[f'{nome}@{linhas}'], _ = cronometrar(funcao, repeticoes, preparar)
+        memoria = CuboAgregado.montar(carregar(csv)[0].sort_values('Data Sessão', kind='stable')).memoria()
+    return {'medidas': medidas, 'rss_pico': {str(linhas): pico_rss()}, 'memoria_cubo': {str(linhas): memoria}}
+
+
+def medir_extracao(transcricoes, repeticoes):
+    """Melhor tempo de extração por arquivo, num corpus sintético"""
+    from benchmarks.extracao import gerar_transcricoes
+    from benchmarks.medicao import cronometrar
+    from extrator import processar_transcricao
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gerar_transcricoes(tmp, transcricoes)
+        arquivos = sorted(os.path.join(tmp, nome) for nome in os.listdir(tmp))
+        _, minimo, _ = cronometrar(lambda: [processar_transcricao(a) for a in arquivos], repeticoes)
+    return {'medidas': {'extracao:por_arquivo': minimo / len(arquivos)}}
+
+
+def medir_cubo(linhas, repeticoes):
+    """Montagem, recorte (6 meses e 3 autores, com PLs únicos) e memória do cubo numa base grande"""
+    from datetime import timedelta
+
+    from agregacoes import CuboAgregado
+    from benchmarks.medicao import cronometrar
+    from benchmarks.sintetico import gerar_csv
+    from dados import carregar
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = os.path.join(tmp, 'base.csv')
+        gerar_csv(csv, linhas)
+        df, _ = carregar(csv, usar_cache=False)
+    df = df.sort_values('Data Sessão', kind='stable')
+    _, montar, cubo = cronometrar(lambda: CuboAgregado.montar(df), repeticoes)
+    data_max = df['Data Sessão'].iloc[-1].date()
+    autores = list(cubo.por_autor().index[:3])
+    _, fatia, _ = cronometrar(
+        lambda: cubo.fatiar(data_max - timedelta(days=180), data_max, autores).pls_unicos(), repeticoes)
+    return {'medidas': {f'cubo_grande:montar@{linhas}': montar, f'cubo_grande:fatia_pls@{linhas}': fatia},
+            'memoria_cubo': {str(linhas): cubo.memoria()}}
+
+
+def maquina():
+    """Identificação da máquina: só execuções na mesma máquina são comparadas"""
+    descricao = {
+        'sistema': platform.system(),
+        'arquitetura': platform.machine(),
+        'processador': platform.processor(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'no': platform.node(),
+    }
+    return {'id': '|'.join(str(v) for v in descricao.values()), **descricao}
+
+
+def commit_atual():
+    """Commit do HEAD (com '+' se houver alterações não registradas), ou None"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        alterado = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ,
+                                  check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+' if alterado else '')
+
+
+def ler_historico(caminho):
+    """Registros do histórico (um JSON por linha), do mais antigo ao mais recente"""
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def gravar_historico(caminho, registro):
+    """Acrescenta o registro ao fim do histórico"""
+    with open(caminho, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+def regressoes(registro, historico, janela=JANELA, piso=PISO_SEGUNDOS):
+    """
+    Medidas do registro acima da referência (mediana das últimas `janela`
+    execuções na mesma máquina) por mais que o limite da medida e que o
+    piso. Devolve tuplas (medida, atual, referência, aumento relativo).
+    """
+    anteriores = [r for r in historico if r['maquina']['id'] == registro['maquina']['id']]
+    encontradas = []
+    for medida, atual in registro['medidas'].items():
+        valores = [r['medidas'][medida] for r in anteriores if medida in r['medidas']][-janela:]
+        if not valores:
+            continue
+        referencia = statistics.median(valores)
+        aumento = atual / referencia - 1 if referencia > 0 else float('inf')
+        if aumento > registro['limites'][medida] and atual - referencia > piso:
+            encontradas.append((medida, atual, referencia, aumento))
+    return encontradas
+
+
+def regressoes_memoria(registro, historico, janela=JANELA, limite=LIMITE_MEMORIA):
+    """
+    Tamanhos de base em que a memória do cubo passou da mediana das últimas
+    `janela` execuções na mesma máquina por mais que `limite`. Devolve tuplas
+    (tamanho, atual, referência, aumento relativo).
+    """
+    anteriores = [r for r in historico if r['maquina']['id'] == registro['maquina']['id']]
+    encontradas = []
+    for tamanho, atual in registro.get('memoria_cubo', {}).items():
+        valores = [r['memoria_cubo'][tamanho] for r in anteriores
+                   if tamanho in r.get('memoria_cubo', {})][-janela:]
+        if not valores:
+            continue
+        referencia = statistics.median(valores)
+        if atual > referencia * (1 + limite):
+            encontradas.append((tamanho, atual, referencia, atual / referencia - 1))
+    return encontradas
+
+
+def pedido_da_medida(medida, transcricoes, linhas_cubo):
+    """Pedido de medição (base, cubo ou corpus) que produz a medida"""
+    if medida.startswith('cubo_grande:'):
+        return f'cubo:{linhas_cubo}'
+    if '@' in medida:
+        return f"base:{medida.split('@', 1)[1]}"
+    return f'extracao:{transcricoes}'
+
+
+def medir_em_subprocesso(pedido, repeticoes):
+    """Resultado de `--medir pedido` num processo novo (memória e caches limpos)"""
+    print(f'Medindo {pedido}...', file=sys.stderr)
+    saida = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.suite', '--medir', pedido, '--repeticoes', str(repeticoes)],
+        check=True, capture_output=True, text=True, cwd=RAIZ, env={**os.environ, 'PYTHONPATH': RAIZ}
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suíte de desempenho com histórico e limites de regressão')
+    parser.add_argument('--tamanhos', nargs='+', type=lambda valor: int(float(valor)),
+                        default=[1_000, 10_000, 100_000])
+    parser.add_argument('--transcricoes', type=int, default=50)
+    parser.add_argument('--linhas-cubo', type=lambda valor: int(float(valor)), default=1_000_000,
+                        help='linhas da base em que o cubo é medido à parte (0: não mede)')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--historico', default=HISTORICO)
+    parser.add_argument('--janela', type=int, default=JANELA)
+    parser.add_argument('--limite', type=float, default=LIMITE_REGRESSAO,
+                        help='aumento relativo tolerado (os casos em LIMITES podem tolerar mais)')
+    parser.add_argument('--nao-gravar', action='store_true', help='só compara, sem acrescentar ao histórico')
+    parser.add_argument('--medir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        tipo, quantidade = args.medir.split(':')
+        medir = {'base': medir_base, 'cubo': medir_cubo, 'extracao': medir_extracao}[tipo]
+        print(json.dumps(medir(int(quantidade), args.repeticoes)))
+        return
+
+    medidas, rss_pico, memoria_cubo = {}, {}, {}
+    pedidos = [f'base:{linhas}' for linhas in args.tamanhos] + [f'extracao:{args.transcricoes}']
+    if args.linhas_cubo:
+        pedidos.append(f'cubo:{args.linhas_cubo}')
+    for pedido in pedidos:
+        resultado = medir_em_subprocesso(pedido, args.repeticoes)
+        medidas.update(resultado['medidas'])
+        rss_pico.update(resultado.get('rss_pico', {}))
+        memoria_cubo.update(resultado.get('memoria_cubo', {}))
+
+    registro = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_atual(),
+        'maquina': maquina(),
+        'parametros': {'tamanhos': args.tamanhos, 'transcricoes': args.transcricoes,
+                       'linhas_cubo': args.linhas_cubo, 'repeticoes': args.repeticoes},
+        'medidas': medidas,
+        'limites': {medida: limite(medida, args.limite) for medida in medidas},
+        'rss_pico': rss_pico,
+        'memoria_cubo': memoria_cubo,
+    }
+    historico = ler_historico(args.historico)
+    encontradas = regressoes(registro, historico, args.janela)
+    if encontradas:
+        # Confirmação: mede de novo o que acusou regressão e fica com o melhor tempo
+        suspeitas = {medida for medida, *_ in encontradas}
+        for pedido in {pedido_da_medida(medida, args.transcricoes, args.linhas_cubo) for medida in suspeitas}:
+            for medida, valor in medir_em_subprocesso(pedido, args.repeticoes)['medidas'].items():
+                if medida in suspeitas:
+                    medidas[medida] = min(medidas[medida], valor)
+        encontradas = regressoes(registro, historico, args.janela)
+    memoria_excedida = regressoes_memoria(registro, historico, args.janela)
+    com_referencia = any(r['maquina']['id'] == registro['maquina']['id'] for r in historico)
+    if not args.nao_gravar:
+        gravar_historico(args.historico, registro)
+
+    from benchmarks.medicao import formatar_bytes
+
+    nomes = list(dict.fromkeys(medida.split('@', 1)[0] for medida in medidas
+                               if '@' in medida and not medida.startswith('cubo_grande:')))
+    print(f"{'Caso':<34}" + ''.join(f'{linhas:>12,}' for linhas in args.tamanhos))
+    for nome in nomes:
+        print(f'{nome:<34}' + ''.join(f"{medidas[f'{nome}@{linhas}'] * 1000:>10.1f}ms"
+                                      for linhas in args.tamanhos))
+    print(f"{'RSS pico':<34}" + ''.join(f'{formatar_bytes(rss_pico[str(linhas)]):>12}'
+                                        for linhas in args.tamanhos))
+    print(f"{'Memória do cubo':<34}" + ''.join(f'{formatar_bytes(memoria_cubo[str(linhas)]):>12}'
+                                               for linhas in args.tamanhos))
+    print(f"\nExtração: {medidas['extracao:por_arquivo'] * 1000:.1f}ms por transcrição "
+          f"({args.transcricoes} transcrições)")
+    if args.linhas_cubo:
+        n = args.linhas_cubo
+        print(f"Cubo com {n:,} linhas: montagem {medidas[f'cubo_grande:montar@{n}'] * 1000:.0f}ms, "
+              f"recorte com PLs únicos {medidas[f'cubo_grande:fatia_pls@{n}'] * 1000:.1f}ms, "
+              f"{formatar_bytes(memoria_cubo[str(n)])}")
+
+    for tamanho, atual, referencia, aumento in memoria_excedida:
+        print(f'\nMemória do cubo com {int(tamanho):,} linhas: {formatar_bytes(referencia)} -> '
+              f'{formatar_bytes(atual)} (+{aumento:.0%}, limite +{LIMITE_MEMORIA:.0%})')
+    if memoria_excedida and not encontradas:
+        sys.exit(1)
+    if encontradas:
+        print(f'\n{len(encontradas)} regressão(ões) frente às últimas {args.janela} execuções nesta máquina:')
+        for medida, atual, referencia, aumento in encontradas:
+            print(f'  {medida}: {referencia * 1000:.1f}ms -> {atual * 1000:.1f}ms '
+                  f'(+{aumento:.0%}, limite +{registro["limites"][medida]:.0%})')
+        sys.exit(1)
+    print('\nSem regressões.' if com_referencia
+          else '\nPrimeira execução nesta máquina: sem referência para comparar.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Transcrições grandes: leitura completa x mmap
+
+Gera transcrições sintéticas de 50 a 500 MB (sessões sintéticas de
+benchmarks.extracao concatenadas) e processa cada uma num subprocesso
+próprio, pelo caminho normal (arquivo lido e decodificado inteiro) e pelo
+caminho mapeado (`extrator.processar_transcricao_mapeada`), informando
+tempo, MB/s e pico de memória residente. Confere que os dois caminhos
+chegam aos mesmos registros.
+
+Uso:
+    python -m benchmarks.transcricoes_grandes [--tamanhos 50 200 500] [--pasta PASTA]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+MODOS = ['completa', 'mmap']
+MB = 1024 * 1024
+
+
+def gerar_transcricao_grande(caminho, tamanho_mb, semente=0):
+    """Grava uma transcrição de ~`tamanho_mb` MB, só com data e chamada na primeira sessão"""
+    from benchmarks.extracao import transcricao_sintetica
+
+    rng = random.Random(semente)
+    escritos = 0
+    with open(caminho, 'w', encoding='utf-8') as f:
+        primeira = True
+        while escritos < tamanho_mb * MB:
+            texto = transcricao_sintetica(rng, rng.randint(2, 15), primeira)
+            if not primeira:
+                # Sem repetir a URL do vídeo no meio do texto
+                texto = texto.split('\n', 3)[3]
+            escritos += f.write(texto)
+            primeira = False
+
+
+def executar_modo(modo, caminho):
+    """Processa o arquivo pelo caminho pedido e devolve as métricas"""
+    from benchmarks.medicao import pico_rss
+    from extrator import processar_transcricao, processar_transcricao_mapeada
+    import extrator
+
+    if modo == 'completa':
+        # Garante o caminho normal, seja qual for o tamanho
+        extrator.LIMITE_MMAP = float('inf')
+        processar = processar_transcricao
+    else:
+        processar = processar_transcricao_mapeada
+
+    rss_inicial = pico_rss()
+    inicio = time.perf_counter()
+    resultado = processar(caminho)
+    decorrido = time.perf_counter() - inicio
+    assert 'erro' not in resultado, resultado.get('erro')
+
+    registros = json.dumps([resultado['registros'], resultado['data'], resultado['video_id']],
+                           sort_keys=True, ensure_ascii=False)
+    return {
+        'modo': modo,
+        'segundos': decorrido,
+        'bytes': os.path.getsize(caminho),
+        'pls': len(resultado['registros']),
+        'assinatura': hashlib.sha256(registros.encode()).hexdigest(),
+        'rss_inicial': rss_inicial,
+        'rss_pico': pico_rss(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Leitura completa x mmap em transcrições grandes')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[50, 200], help='em MB')
+    parser.add_argument('--pasta', default=None, help='onde gerar os arquivos (padrão: temporária)')
+    parser.add_argument('--modo', choices=MODOS, help=argparse.SUPPRESS)
+    parser.add_argument('--arquivo', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        print(json.dumps(executar_modo(args.modo, args.arquivo)))
+        return
+
+    from benchmarks.medicao import formatar_bytes
+
+    with tempfile.TemporaryDirectory(dir=args.pasta) as tmp:
+        resultados = []
+        for tamanho in args.tamanhos:
+            caminho = os.path.join(tmp, f'video-grande{tamanho:04d}-ytranscript.txt')
+            gerar_transcricao_grande(caminho, tamanho)
+            medidas = []
+            for modo in MODOS:
+                saida = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.transcricoes_grandes', '--modo', modo,
+                     '--arquivo', caminho],
+                    check=True, capture_output=True, text=True
+                )
+                medidas.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+            assert medidas[0]['assinatura'] == medidas[1]['assinatura'], 'caminhos divergem'
+            resultados.extend(medidas)
+            os.remove(caminho)
+
+    print(f"{'Arquivo':>10}{'Modo':>10}{'tempo':>9}{'MB/s':>8}{'PLs':>7}{'RSS pico':>13}{'RSS do arquivo':>16}")
+    for r in resultados:
+        print(f"{formatar_bytes(r['bytes']):>10}{r['modo']:>10}{r['segundos']:>8.2f}s"
+              f"{r['bytes'] / MB / r['segundos']:>8.1f}{r['pls']:>7}"
+              f"{formatar_bytes(r['rss_pico']):>13}{formatar_bytes(r['rss_pico'] - r['rss_inicial']):>16}")
+
+
+if __name__ == '__main__':
+    main()
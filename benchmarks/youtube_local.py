@@ -0,0 +1,135 @@
+"""
+Servidor HTTP local no lugar do YouTube, para testes e medições offline
+
+Serve páginas de vídeo prontas (o título embutido como no YouTube, em
+string JSON com escapes \\uXXXX), com latência configurável e a opção de
+responder 429 às primeiras requisições de cada vídeo. Conta as requisições
+recebidas.
+
+Uso como benchmark (resolvedor x busca serial do notebook):
+    python -m benchmarks.youtube_local [--videos 40] [--latencia 0.05]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class ServidorYoutubeLocal:
+    """
+    Páginas /watch?v=ID para os títulos em `titulos` ({ID: título}); IDs
+    desconhecidos recebem 404. Usar como gerenciador de contexto.
+    """
+
+    def __init__(self, titulos, latencia=0.0, falhas_por_video=0):
+        self.titulos = titulos
+        self.latencia = latencia
+        self.falhas_por_video = falhas_por_video
+        self.requisicoes = 0
+        self._falhas = {}
+        self._trava = threading.Lock()
+
+        servidor = self
+
+        class Pagina(BaseHTTPRequestHandler):
+            def do_GET(self):
+                video_id = parse_qs(urlparse(self.path).query).get('v', [''])[0]
+                with servidor._trava:
+                    servidor.requisicoes += 1
+                    falhas = servidor._falhas.get(video_id, 0)
+                    if falhas < servidor.falhas_por_video:
+                        servidor._falhas[video_id] = falhas + 1
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+
+                if falhas < servidor.falhas_por_video:
+                    self.send_response(429)
+                    self.send_header('Retry-After', '0')
+                    self.end_headers()
+                    return
+                if video_id not in servidor.titulos:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                detalhes = json.dumps({'videoDetails': {'videoId': video_id,
+                                                        'title': servidor.titulos[video_id]}},
+                                      separators=(',', ':'))
+                corpo = f'<html><script>var ytInitialPlayerResponse = {detalhes};</script></html>'.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(('127.0.0.1', 0), Pagina)
+        self.url_base = f'http://127.0.0.1:{self._http.server_address[1]}/watch?v='
+
+    def __enter__(self):
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._http.shutdown()
+        self._http.server_close()
+
+
+def titulos_sinteticos(quantidade):
+    """IDs de 11 caracteres e títulos em formatos variados de data"""
+    formatos = ['Sessão Ordinária {d:02d}/{m:02d}/2025', 'Sessão {d:02d}-{m:02d}-25',
+                'Sessão Extraordinária de {d} de março de 2025', 'Audiência pública']
+    return {f'video{i:06d}': formatos[i % len(formatos)].format(d=i % 28 + 1, m=i % 12 + 1)
+            for i in range(quantidade)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolvedor de títulos x busca serial, offline')
+    parser.add_argument('--videos', type=int, default=40)
+    parser.add_argument('--latencia', type=float, default=0.05, help='segundos por requisição')
+    parser.add_argument('--por-segundo', type=float, default=20, help='limite do resolvedor')
+    parser.add_argument('--trabalhadores', type=int, default=8)
+    args = parser.parse_args()
+
+    from extrator import buscar_titulo_youtube
+    from youtube import CacheTitulos, ResolvedorTitulos
+
+    titulos = titulos_sinteticos(args.videos)
+    ids = list(titulos) + ['inexistente']
+
+    with ServidorYoutubeLocal(titulos, args.latencia) as servidor:
+        # Notebook: uma requisição por vez e pausa de 0,5 s após cada título
+        inicio = time.perf_counter()
+        for video_id in ids:
+            if buscar_titulo_youtube(video_id, servidor.url_base):
+                time.sleep(0.5)
+        serial = time.perf_counter() - inicio, servidor.requisicoes
+
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = os.path.join(tmp, 'titulos.json')
+            medidas = []
+            for rodada in ['fria', 'com cache']:
+                resolvedor = ResolvedorTitulos(CacheTitulos(caminho), servidor.url_base,
+                                               trabalhadores=args.trabalhadores, por_segundo=args.por_segundo)
+                inicio = time.perf_counter()
+                encontrados = resolvedor.resolver(ids)
+                medidas.append((rodada, time.perf_counter() - inicio, resolvedor.requisicoes))
+            assert encontrados == {**titulos, 'inexistente': None}
+
+    print(f"{len(ids)} vídeos, latência {args.latencia * 1000:.0f} ms, "
+          f"resolvedor com {args.trabalhadores} threads e {args.por_segundo:g} req/s\n")
+    print(f"{'':<22}{'tempo':>10}{'requisições':>14}")
+    print(f"{'serial (notebook)':<22}{serial[0]:>9.2f}s{serial[1]:>14}")
+    for rodada, tempo, requisicoes in medidas:
+        print(f"{'resolvedor, ' + rodada:<22}{tempo:>9.2f}s{requisicoes:>14}")
+
+
+if __name__ == '__main__':
+    main()
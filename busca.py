@@ -0,0 +1,165 @@
+"""
+Índice de busca da aba "Busca de PL"
+
+Montado uma vez na carga sobre os valores distintos de PL, autor (com as
+variações de nome de VEREADORES_MASTER) e status, já sem acentos e em
+minúsculas. Cada valor tem suas listas de tokens e trigramas; uma busca
+intersecta as listas dos trigramas do termo, confirma o trecho nos poucos
+candidatos e junta as linhas desses valores, agrupadas por PL. O custo
+depende do vocabulário, não do número de linhas da base.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from cachetools import LRUCache
+
+from vereadores import VEREADORES_MASTER, dobrar_acentos
+
+# Peso de cada tipo de casamento na ordenação dos resultados
+PESO_PL_EXATO = 8
+PESO_PL = 4
+PESO_AUTOR = 2
+PESO_STATUS = 1
+BONUS_TOKEN = 1
+
+_SEPARADOR = re.compile(r'[^\w/]+')
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+@dataclass(frozen=True)
+class ResultadoPL:
+    """Um PL encontrado: linhas que casaram (ordem cronológica) e pontuação"""
+    pl: str
+    linhas: np.ndarray
+    pontuacao: int
+
+
+@dataclass(frozen=True)
+class PaginaBusca:
+    """Uma página de resultados e os totais da busca"""
+    resultados: list
+    total_pls: int
+    total_linhas: int
+    pagina: int
+    paginas: int
+
+
+class IndiceBusca:
+    """Índice invertido (tokens e trigramas) sobre PLs, autores e status"""
+
+    def __init__(self, df, tamanho_cache=256):
+        self._pl_codigos = df['PL'].astype('category').cat.codes.to_numpy()
+        self._pls = df['PL'].astype('category').cat.categories.astype(str)
+
+        # Documentos: (campo, texto dobrado, linhas da base)
+        self._documentos = []
+        for campo in ['PL', 'Autor', 'Status']:
+            linhas = {str(v): np.asarray(p, dtype=np.intp)
+                      for v, p in df.groupby(campo, observed=True, sort=True).indices.items()}
+            for valor, posicoes in linhas.items():
+                textos = {valor}
+                if campo == 'Autor':
+                    textos.update(VEREADORES_MASTER.get(valor, []))
+                for texto in textos:
+                    self._documentos.append((campo, dobrar_acentos(texto), posicoes))
+
+        self._trigramas = {}
+        self._tokens = {}
+        for doc, (_, texto, _) in enumerate(self._documentos):
+            for trigrama in _trigramas(texto):
+                self._trigramas.setdefault(trigrama, []).append(doc)
+            for token in _SEPARADOR.split(texto):
+                if token:
+                    self._tokens.setdefault(token, set()).add(doc)
+        self._trigramas = {t: np.asarray(d, dtype=np.intp) for t, d in self._trigramas.items()}
+
+        self._cache = LRUCache(maxsize=tamanho_cache)
+        self._trava = threading.Lock()
+
+    def _candidatos(self, termo):
+        """Documentos que contêm o termo (trigramas + confirmação)"""
+        if len(termo) < 3:
+            # Termos curtos: varre o vocabulário (pequeno), não as linhas
+            return [d for d, (_, texto, _) in enumerate(self._documentos) if termo in texto]
+
+        listas = []
+        for trigrama in _trigramas(termo):
+            lista = self._trigramas.get(trigrama)
+            if lista is None:
+                return []
+            listas.append(lista)
+        listas.sort(key=len)
+        candidatos = listas[0]
+        for lista in listas[1:]:
+            candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+            if not len(candidatos):
+                return []
+        return [d for d in candidatos if termo in self._documentos[d][1]]
+
+    def _resolver(self, termo):
+        """Todos os PLs encontrados, já ordenados por relevância"""
+        termo = dobrar_acentos(termo).strip()
+        if not termo:
+            return [], 0
+
+        documentos = self._candidatos(termo)
+        if not documentos:
+            return [], 0
+
+        tokens_exatos = self._tokens.get(termo, set())
+        pontos_pl = np.zeros(len(self._pls), dtype=np.int64)
+        partes = []
+        for doc in documentos:
+            campo, texto, linhas = self._documentos[doc]
+            partes.append(linhas)
+            bonus = BONUS_TOKEN if doc in tokens_exatos else 0
+            if campo == 'PL':
+                peso = PESO_PL_EXATO if texto == termo else PESO_PL
+            else:
+                peso = PESO_AUTOR if campo == 'Autor' else PESO_STATUS
+            # Pontuação do PL: melhor casamento entre as suas linhas
+            codigos = np.unique(self._pl_codigos[linhas])
+            pontos_pl[codigos] = np.maximum(pontos_pl[codigos], peso + bonus)
+
+        linhas = np.unique(np.concatenate(partes))
+        # Agrupa por PL numa passada: ordenação estável mantém a cronologia
+        codigos = self._pl_codigos[linhas]
+        ordem = np.argsort(codigos, kind='stable')
+        linhas, codigos = linhas[ordem], codigos[ordem]
+        inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]])
+        grupos = np.split(linhas, inicios[1:])
+
+        resultados = [
+            ResultadoPL(self._pls[codigos[i]], grupo, int(pontos_pl[codigos[i]]))
+            for i, grupo in zip(inicios, grupos)
+        ]
+        resultados.sort(key=lambda r: (-r.pontuacao, r.pl))
+        return resultados, len(linhas)
+
+    def buscar(self, termo, pagina=1, por_pagina=20):
+        """Página de resultados (PLs ordenados por relevância e número)"""
+        chave = dobrar_acentos(termo).strip()
+        with self._trava:
+            encontrado = self._cache.get(chave)
+        if encontrado is None:
+            encontrado = self._resolver(termo)
+            with self._trava:
+                self._cache[chave] = encontrado
+
+        resultados, total_linhas = encontrado
+        paginas = max(1, -(-len(resultados) // por_pagina))
+        pagina = min(max(1, pagina), paginas)
+        inicio = (pagina - 1) * por_pagina
+        return PaginaBusca(
+            resultados=resultados[inicio:inicio + por_pagina],
+            total_pls=len(resultados),
+            total_linhas=total_linhas,
+            pagina=pagina,
+            paginas=paginas
+        )
@@ -0,0 +1,89 @@
+"""
+Ciclo de vida dos PLs
+
+Tabela materializada na carga, uma linha por PL: autor, primeira e última
+sessão, status atual, dias em tramitação, data da primeira aprovação e a
+sequência de transições de status. Os eventos de cada PL ficam contíguos
+num vetor de posições da base (em ordem cronológica), então o histórico de
+um PL é uma fatia desse vetor.
+"""
+
+import numpy as np
+import pandas as pd
+
+from agregacoes import status_aprovado
+
+STATUS_ENCERRADOS = ['Rejeitado']
+
+
+class CicloVida:
+    """Resumo e histórico de cada PL, consultados por número do PL"""
+
+    def __init__(self, df):
+        """Recebe a base ordenada pela data da sessão"""
+        codigos = df['PL'].astype('category').cat.codes.to_numpy()
+        # Ordenação estável: eventos de cada PL contíguos e em ordem cronológica
+        self.ordem = np.argsort(codigos, kind='stable')
+        eventos = df.iloc[self.ordem].reset_index(drop=True)
+        codigos = codigos[self.ordem]
+
+        inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]])
+        fins = np.r_[inicios[1:], len(codigos)]
+        ultimos = fins - 1
+
+        datas = eventos['Data Sessão']
+        status = eventos['Status'].astype(str)
+        aprovado = np.asarray(status_aprovado(status))
+
+        # Transições: eventos cujo status difere do anterior do mesmo PL
+        novo_pl = np.zeros(len(eventos), dtype=bool)
+        novo_pl[inicios] = True
+        mudou = novo_pl | (status.to_numpy() != np.r_[None, status.to_numpy()[:-1]])
+        grupo = np.repeat(np.arange(len(inicios)), fins - inicios)
+        transicoes = status[mudou].groupby(grupo[mudou]).agg(tuple)
+
+        # Primeira aprovação de cada PL
+        primeira_aprovacao = datas[aprovado].groupby(grupo[aprovado]).min()
+
+        tabela = pd.DataFrame({
+            'PL': eventos['PL'].astype(str).to_numpy()[inicios],
+            'Autor': eventos['Autor'].astype(str).to_numpy()[inicios],
+            'Primeira Sessão': datas.to_numpy()[inicios],
+            'Última Sessão': datas.to_numpy()[ultimos],
+            'Status Atual': status.to_numpy()[ultimos],
+            'Eventos': fins - inicios,
+            'Início': inicios,
+            'Fim': fins,
+        })
+        tabela['Dias em Tramitação'] = (tabela['Última Sessão'] - tabela['Primeira Sessão']).dt.days
+        tabela['Transições'] = transicoes.reindex(range(len(inicios))).to_numpy()
+        tabela['Primeira Aprovação'] = primeira_aprovacao.reindex(range(len(inicios))).to_numpy()
+        tabela['Dias até Aprovação'] = (tabela['Primeira Aprovação'] - tabela['Primeira Sessão']).dt.days
+        self.tabela = tabela.set_index('PL')
+
+    def __contains__(self, pl):
+        return pl in self.tabela.index
+
+    def resumo(self, pl):
+        """Linha da tabela do PL"""
+        return self.tabela.loc[pl]
+
+    def eventos(self, pl):
+        """Posições (na base) dos eventos do PL, em ordem cronológica"""
+        linha = self.tabela.loc[pl]
+        return self.ordem[linha['Início']:linha['Fim']]
+
+    def tempo_mediano_aprovacao(self):
+        """Mediana de dias entre a primeira menção e a primeira aprovação"""
+        return self.tabela['Dias até Aprovação'].median()
+
+    def parados(self, dias=90, referencia=None):
+        """PLs sem aprovação nem rejeição e sem menção há pelo menos `dias`"""
+        tabela = self.tabela
+        if referencia is None:
+            referencia = tabela['Última Sessão'].max()
+        sem_desfecho = (tabela['Primeira Aprovação'].isna() &
+                        ~tabela['Status Atual'].isin(STATUS_ENCERRADOS))
+        dias_parado = (pd.Timestamp(referencia) - tabela['Última Sessão']).dt.days
+        resultado = tabela[sem_desfecho & (dias_parado >= dias)].assign(**{'Dias sem Menção': dias_parado})
+        return resultado.sort_values('Dias sem Menção', ascending=False)
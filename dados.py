@@ -0,0 +1,249 @@
+"""
+Carregamento da base do observatório com cache colunar (Parquet)
+
+O CSV gerado pelo notebook continua sendo a fonte da verdade. Na primeira
+leitura é gravado um arquivo Parquet ao lado dele, já tipado (datas,
+categorias e colunas auxiliares), que é reaproveitado enquanto o CSV não
+mudar (mtime ou, se o mtime mudou, hash do conteúdo).
+
+A coluna Presentes não fica na base de eventos: vai para a tabela de
+presenças (uma máscara de bits por sessão, ver presencas.py), gravada num
+segundo Parquet, e as linhas guardam só o código da sessão.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from origem import BASES, localizar_base
+from presencas import TabelaPresencas
+
+# Versão do formato do cache: incrementar quando mudar a preparação da base
+VERSAO_CACHE = 2
+
+DATA_MINIMA = '2024-01-01'
+
+# Colunas de baixa cardinalidade guardadas como categorias
+COLUNAS_CATEGORICAS = ['PL', 'Autor', 'Status', 'Presentes', 'Fonte', 'Mês_Nome']
+
+CHAVE_METADADOS = b'observatorio'
+
+
+def caminho_sidecar(caminho_csv):
+    """Caminho do cache Parquet correspondente ao CSV"""
+    return os.path.splitext(caminho_csv)[0] + '.parquet'
+
+
+def caminho_presencas(caminho_csv):
+    """Caminho da tabela de presenças correspondente ao CSV"""
+    return os.path.splitext(caminho_csv)[0] + '.presencas.parquet'
+
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """SHA-256 do conteúdo do arquivo, lido em blocos"""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _texto_limpo(serie):
+    """Textos sem espaços nas pontas; em séries categóricas, limpa só as categorias"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories.astype(str).str.strip()
+        if categorias.is_unique and not serie.isna().any():
+            return serie.cat.rename_categories(categorias)
+    return serie.astype(str).str.strip()
+
+
+def _categoria(serie):
+    """Série categórica só com os valores presentes, em ordem (como `astype('category')`)"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.cat.remove_unused_categories()
+        return serie.cat.reorder_categories(serie.cat.categories.sort_values())
+    return serie.astype('category')
+
+
+def ler_csv(caminho_csv):
+    """Lê e prepara a base e a tabela de presenças a partir do CSV (caminho lento)"""
+    return preparar(pd.read_csv(caminho_csv))
+
+
+def preparar(df):
+    """
+    Tipos, limpeza, corte em DATA_MINIMA, colunas auxiliares e tabela de
+    presenças, a partir das colunas da base (lidas do CSV ou da base
+    particionada)
+    """
+    # Garante que a coluna de data seja tratada como data
+    df['Data Sessão'] = pd.to_datetime(df['Data Sessão'], errors='coerce')
+
+    # Limpa dados
+    df['PL'] = _texto_limpo(df['PL'])
+    df['Autor'] = _texto_limpo(df['Autor'])
+    df['Status'] = _texto_limpo(df['Status'])
+
+    # Remove registros com datas inválidas ou muito antigas
+    df = df[df['Data Sessão'].notna()]
+    df = df[df['Data Sessão'] >= DATA_MINIMA].reset_index(drop=True)
+
+    # Adiciona colunas auxiliares
+    df['Ano'] = df['Data Sessão'].dt.year.astype('int16')
+    df['Mês'] = df['Data Sessão'].dt.month.astype('int8')
+    # strftime só nos 12 meses, não em cada linha
+    nomes_meses = {mes: pd.Timestamp(2000, mes, 1).strftime('%B') for mes in range(1, 13)}
+    df['Mês_Nome'] = df['Mês'].map(nomes_meses)
+    df['Trimestre'] = df['Data Sessão'].dt.quarter.astype('int8')
+
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns:
+            df[coluna] = _categoria(df[coluna])
+
+    presencas, df = TabelaPresencas.separar(df)
+    return df, presencas
+
+
+def _ler_metadados(caminho_parquet):
+    """Lê os metadados do observatório gravados no esquema do Parquet"""
+    import pyarrow.parquet as pq
+
+    esquema = pq.read_schema(caminho_parquet)
+    bruto = (esquema.metadata or {}).get(CHAVE_METADADOS)
+    return json.loads(bruto) if bruto else None
+
+
+def _gravar_sidecar(df, caminho_parquet, metadados):
+    """Grava o Parquet com os metadados de origem (escrita atômica)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    existentes = tabela.schema.metadata or {}
+    tabela = tabela.replace_schema_metadata({
+        **existentes,
+        CHAVE_METADADOS: json.dumps(metadados).encode()
+    })
+
+    temporario = caminho_parquet + '.tmp'
+    pq.write_table(tabela, temporario, compression='zstd')
+    os.replace(temporario, caminho_parquet)
+
+
+def _gravar_caches(caminho_csv, df, presencas, metadados):
+    """Presenças primeiro: uma base válida no cache implica presenças gravadas"""
+    _gravar_sidecar(presencas.quadro(), caminho_presencas(caminho_csv),
+                    {'vereadores': presencas.vereadores})
+    _gravar_sidecar(df, caminho_sidecar(caminho_csv), metadados)
+
+
+def _ler_caches(caminho_csv):
+    """(base, presenças) dos Parquet; None se a tabela de presenças faltar"""
+    caminho = caminho_presencas(caminho_csv)
+    try:
+        vereadores = _ler_metadados(caminho)['vereadores']
+    except Exception:
+        return None
+    presencas = TabelaPresencas.do_quadro(pd.read_parquet(caminho), vereadores)
+    return pd.read_parquet(caminho_sidecar(caminho_csv)), presencas
+
+
+def carregar(caminho_csv, usar_cache=True):
+    """
+    Carrega a base tipada e a tabela de presenças, usando o cache Parquet
+    quando estiver válido.
+
+    O cache é refeito apenas quando o mtime do CSV mudou e o hash do
+    conteúdo também (um `touch` sem mudança de conteúdo não reprocessa).
+    """
+    if not usar_cache:
+        return ler_csv(caminho_csv)
+
+    caminho_parquet = caminho_sidecar(caminho_csv)
+    mtime = os.stat(caminho_csv).st_mtime_ns
+
+    metadados = None
+    if os.path.exists(caminho_parquet):
+        try:
+            metadados = _ler_metadados(caminho_parquet)
+        except Exception:
+            metadados = None
+
+    if metadados and metadados.get('versao') == VERSAO_CACHE:
+        if metadados.get('mtime') == mtime:
+            carregado = _ler_caches(caminho_csv)
+            if carregado is not None:
+                return carregado
+
+        conteudo_hash = hash_arquivo(caminho_csv)
+        if metadados.get('sha256') == conteudo_hash:
+            carregado = _ler_caches(caminho_csv)
+            if carregado is not None:
+                metadados['mtime'] = mtime
+                try:
+                    _gravar_sidecar(carregado[0], caminho_parquet, metadados)
+                except OSError:
+                    pass
+                return carregado
+    else:
+        conteudo_hash = hash_arquivo(caminho_csv)
+
+    df, presencas = ler_csv(caminho_csv)
+    try:
+        _gravar_caches(caminho_csv, df, presencas, {
+            'versao': VERSAO_CACHE,
+            'mtime': mtime,
+            'sha256': conteudo_hash
+        })
+    except OSError:
+        # Diretório somente leitura: segue sem cache
+        pass
+    return df, presencas
+
+
+def carregar_base(caminho_csv, usar_cache=True):
+    """Só a base de eventos (ver `carregar`)"""
+    return carregar(caminho_csv, usar_cache)[0]
+
+
+def carregar_dataset(pasta, data_inicio=DATA_MINIMA, data_fim=None, colunas=None):
+    """
+    Base e tabela de presenças lidas da base particionada (armazem.py): só
+    as partições do período (por padrão, a partir de DATA_MINIMA) e as
+    colunas pedidas, mais as que a tabela de presenças exige.
+    """
+    from armazem import ler
+
+    if colunas is not None:
+        colunas = list(dict.fromkeys(['Data Sessão', 'PL', 'Autor', 'Status', *colunas, 'Presentes', 'Fonte']))
+    df = ler(pasta, data_inicio, data_fim, colunas).to_pandas(date_as_object=False)
+    # Partições chegam na ordem dos caminhos (mes=10 antes de mes=2)
+    df['Data Sessão'] = df['Data Sessão'].astype('datetime64[ns]')
+    df = df.sort_values('Data Sessão', kind='stable', ignore_index=True)
+    if 'Votos' in df.columns:
+        # Mesmo tipo da leitura do CSV ('N/A' e vazios viram ausentes),
+        # convertendo só os valores distintos do dicionário
+        codigos = df['Votos'].cat.codes.to_numpy()
+        valores = pd.to_numeric(pd.Series(df['Votos'].cat.categories, dtype=object), errors='coerce').to_numpy()
+        if (codigos < 0).any():
+            valores = np.append(valores.astype(float), np.nan)
+        df['Votos'] = valores[codigos]
+    return preparar(df)
+
+
+def carregar_disponivel(arquivos=BASES, periodo=None):
+    """
+    Base e presenças da primeira base disponível (ver `localizar_base`);
+    None se não houver. `periodo` (início, fim) restringe a leitura da base
+    particionada às partições desses meses; um CSV é sempre lido inteiro.
+    """
+    origem = localizar_base(arquivos)
+    if origem is None:
+        return None
+    tipo, caminho = origem
+    if tipo == 'particionada':
+        return carregar_dataset(caminho, *periodo) if periodo else carregar_dataset(caminho)
+    return carregar(caminho)
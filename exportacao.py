@@ -0,0 +1,164 @@
+"""
+Exportação sob demanda da tabela filtrada (CSV, Parquet e XLSX)
+
+Nada é gerado até alguém pedir. O arquivo é escrito em disco bloco a bloco
+(`LINHAS_POR_BLOCO` linhas por vez), sem montar o texto inteiro na
+memória, e fica guardado por assinatura (filtro, ordenação e formato) num
+cache em disco com LRU, compartilhado entre sessões: o próximo pedido da
+mesma combinação, de qualquer sessão, reaproveita o arquivo.
+
+A entrega não é em fluxo: o painel passa o arquivo aberto ao
+st.download_button, que lê o conteúdo inteiro para a memória. O ganho está
+na geração (por blocos, só quando pedida e uma vez por combinação), não no
+envio.
+"""
+
+import atexit
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+from cachetools import LRUCache
+
+LINHAS_POR_BLOCO = 50_000
+# Linhas de uma planilha do Excel, sem o cabeçalho
+LIMITE_LINHAS_XLSX = 1_048_575
+
+# Formato: (extensão, tipo MIME)
+FORMATOS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Excel (XLSX)': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def blocos(df, linhas=LINHAS_POR_BLOCO):
+    """Fatias consecutivas do quadro (ao menos uma, para o cabeçalho)"""
+    yield df.iloc[:linhas]
+    for inicio in range(linhas, len(df), linhas):
+        yield df.iloc[inicio:inicio + linhas]
+
+
+def escrever_csv(df, destino):
+    """Mesmo conteúdo de `df.to_csv(index=False)`, escrito bloco a bloco"""
+    with open(destino, 'w', encoding='utf-8', newline='') as arquivo:
+        for i, bloco in enumerate(blocos(df)):
+            bloco.to_csv(arquivo, index=False, header=(i == 0))
+
+
+def escrever_parquet(df, destino):
+    """Parquet (zstd) com um grupo de linhas por bloco"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for bloco in blocos(df):
+            if escritor is None:
+                tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+                escritor = pq.ParquetWriter(destino, tabela.schema, compression='zstd')
+            else:
+                tabela = pa.Table.from_pandas(bloco, schema=escritor.schema, preserve_index=False)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def escrever_xlsx(df, destino):
+    """Planilha escrita linha a linha (XlsxWriter em modo de memória constante)"""
+    import xlsxwriter
+
+    if len(df) > LIMITE_LINHAS_XLSX:
+        raise ValueError(f'{len(df)} linhas não cabem numa planilha (máximo {LIMITE_LINHAS_XLSX})')
+    opcoes = {'constant_memory': True, 'default_date_format': 'dd/mm/yyyy'}
+    with xlsxwriter.Workbook(destino, opcoes) as livro:
+        planilha = livro.add_worksheet('Dados')
+        planilha.write_row(0, 0, [str(coluna) for coluna in df.columns])
+        linha = 1
+        for bloco in blocos(df):
+            # Valores do Python, com células vazias no lugar de ausentes
+            valores = bloco.astype(object).where(bloco.notna(), None)
+            for registro in valores.itertuples(index=False, name=None):
+                planilha.write_row(linha, 0, registro)
+                linha += 1
+
+
+ESCRITORES = {'csv': escrever_csv, 'parquet': escrever_parquet, 'xlsx': escrever_xlsx}
+
+
+class _ArquivosLRU(LRUCache):
+    """LRU de caminhos que apaga o arquivo ao descartá-lo"""
+
+    def popitem(self):
+        chave, caminho = super().popitem()
+        # Quem já abriu o arquivo continua lendo depois de apagado (POSIX); no
+        # Windows, aberto, ele fica na pasta até o fim do processo
+        with contextlib.suppress(FileNotFoundError, PermissionError):
+            os.remove(caminho)
+        return chave, caminho
+
+
+class CacheExportacao:
+    """Arquivos exportados por (assinatura, formato), numa pasta própria"""
+
+    def __init__(self, pasta=None, tamanho_cache=16):
+        if pasta is None:
+            pasta = tempfile.mkdtemp(prefix='observatorio-exportacao-')
+            atexit.register(shutil.rmtree, pasta, True)
+        self.pasta = pasta
+        self._arquivos = _ArquivosLRU(maxsize=tamanho_cache)
+        self._trava = threading.Lock()
+
+    def caminho(self, assinatura, formato):
+        """
+        Arquivo já gerado para a assinatura e o formato, ou None. Só para
+        consulta: o arquivo pode sair do LRU logo depois (para ler, `abrir`)
+        """
+        with self._trava:
+            caminho = self._arquivos.get((assinatura, formato))
+        return caminho if caminho is not None and os.path.exists(caminho) else None
+
+    def _abrir_existente(self, chave):
+        """Arquivo do cache aberto para leitura, ou None (chamar com a trava)"""
+        caminho = self._arquivos.get(chave)
+        if caminho is None:
+            return None
+        try:
+            return open(caminho, 'rb')
+        except FileNotFoundError:
+            return None
+
+    def abrir(self, assinatura, formato, df):
+        """
+        Arquivo da assinatura e do formato, aberto para leitura binária e
+        gerado agora se ainda não estiver no cache. A busca e a abertura
+        ficam sob a mesma trava do descarte: o arquivo devolvido já está
+        aberto e pode ser lido até o fim mesmo que saia do LRU no meio tempo
+        """
+        chave = (assinatura, formato)
+        with self._trava:
+            arquivo = self._abrir_existente(chave)
+        if arquivo is not None:
+            return arquivo
+
+        extensao, _ = FORMATOS[formato]
+        caminho = os.path.join(self.pasta, f'{uuid.uuid4().hex}.{extensao}')
+        temporario = caminho + '.tmp'
+        try:
+            ESCRITORES[extensao](df, temporario)
+            os.replace(temporario, caminho)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temporario)
+        with self._trava:
+            # Outra sessão pode ter gerado o mesmo arquivo enquanto isso
+            arquivo = self._abrir_existente(chave)
+            if arquivo is not None:
+                os.remove(caminho)
+                return arquivo
+            self._arquivos[chave] = caminho
+            return open(caminho, 'rb')
@@ -0,0 +1,645 @@
+"""
+Extração da base do observatório a partir das transcrições das sessões
+
+Versão em módulo do pipeline do notebook `transcricoes_todos.ipynb`. As
+transcrições são processadas em paralelo (um processo por núcleo) e um
+manifesto guarda tamanho, mtime e hash de cada arquivo já extraído, de
+modo que uma nova execução só reprocessa arquivos novos ou alterados e
+mescla o resultado na base existente. Os títulos do YouTube (para as
+transcrições sem data no corpo) ficam em cache ao lado da base; das
+transcrições que seguem sem data, o manifesto guarda também os registros
+extraídos, e enquanto o arquivo não mudar só a data pelo título é buscada
+de novo.
+
+Uso:
+    python -m extrator PASTA_TRANSCRICOES [--base base.csv] [--processos N]
+    python -m extrator PASTA_TRANSCRICOES --motor spacy [--modelo pt_core_news_lg] [--lote 64]
+    python -m extrator PASTA_TRANSCRICOES --particionado
+
+Com `--particionado` a base é mantida em Parquet particionado por ano e mês
+(armazem.py) e cada execução reescreve só as partições das sessões novas
+ou reprocessadas, em vez do CSV inteiro. Existindo, a base particionada
+é a que o painel lê.
+
+Depois de atualizar a base, o extrator grava também o instantâneo de
+partida do painel (instantaneo.py) ao lado dela.
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import requests
+
+from leitura import ArquivoTranscricao
+from lexico import ANTES_PL, DEPOIS_PL, LIMITE_DATA, MESES, Transcricao
+from vereadores import AutomatoVereadores
+from youtube import (CABECALHOS, URL_YOUTUBE, CacheTitulos, ResolvedorTitulos, caminho_cache,
+                     titulo_da_pagina)
+
+BASE_PADRAO = 'base_observatorio_teresopolis_COMPLETA.csv'
+MOTORES = ['regex', 'spacy']
+# A partir deste tamanho a transcrição é lida por mmap (processar_transcricao_mapeada)
+LIMITE_MMAP = 32 * 1024 * 1024
+COLUNAS_BASE = ['Data Sessão', 'PL', 'Autor', 'Status', 'Votos', 'Presentes', 'Fonte']
+# Guardadas no manifesto para as transcrições ainda sem data
+CHAVES_SEM_DATA = ('registros', 'sem_autor', 'video_id')
+
+# Variações de nome de todos os vereadores, compiladas uma vez por processo
+AUTOMATO = AutomatoVereadores()
+_AUTORIA = re.compile(r'autor', re.IGNORECASE)
+_VEREADOR = re.compile(r'vereador', re.IGNORECASE)
+
+
+def extrair_video_id(texto, nome_arquivo):
+    """Extrai ID do vídeo do YouTube"""
+    # Tenta extrair da URL nas primeiras linhas
+    primeiras_linhas = '\n'.join(texto.split('\n', 5)[:5])
+
+    match = re.search(r'youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})', primeiras_linhas)
+    if match:
+        return match.group(1)
+
+    # Tenta extrair do nome do arquivo
+    match = re.search(r'video-([a-zA-Z0-9_-]{11})', nome_arquivo)
+    if match:
+        return match.group(1)
+
+    return None
+
+
+def buscar_titulo_youtube(video_id, url_base=URL_YOUTUBE):
+    """Busca o título do vídeo no YouTube via web scraping (uma requisição, sem cache)"""
+    if not video_id:
+        return None
+
+    try:
+        response = requests.get(url_base + video_id, headers=CABECALHOS, timeout=10)
+
+        if response.status_code == 200:
+            # Procura pelo título na página HTML
+            return titulo_da_pagina(response.text)
+    except Exception as e:
+        print(f"      Erro ao buscar título: {e}")
+
+    return None
+
+
+def extrair_data_do_titulo(titulo):
+    """Extrai data do título do vídeo"""
+    if not titulo:
+        return None
+
+    # Formato: DD/MM/YYYY ou DD-MM-YYYY ou DD.MM.YYYY
+    match = re.search(r'(\d{2})[-/.](\d{2})[-/.](\d{4})', titulo)
+    if match:
+        dia, mes, ano = match.groups()
+        ano_int = int(ano)
+        if 2024 <= ano_int <= 2026:
+            return f"{ano}-{mes}-{dia}"
+
+    # Formato: DD/MM/YY
+    match = re.search(r'(\d{2})[-/.](\d{2})[-/.](\d{2})\b', titulo)
+    if match:
+        dia, mes, ano = match.groups()
+        ano_completo = f"20{ano}"
+        ano_int = int(ano_completo)
+        if 2024 <= ano_int <= 2026:
+            return f"{ano_completo}-{mes}-{dia}"
+
+    # Formato: "DD de MMMM de YYYY"
+    match = re.search(
+        r'(\d{1,2})\s+de\s+(janeiro|fevereiro|março|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)\s+de\s+(202[4-6])',
+        titulo,
+        re.IGNORECASE
+    )
+    if match:
+        dia, mes_nome, ano = match.groups()
+        mes_num = MESES[mes_nome.lower()]
+        return f"{ano}-{mes_num:02d}-{int(dia):02d}"
+
+    return None
+
+
+def extrair_data_do_corpo(texto):
+    """Fallback: Extrai data do corpo da transcrição"""
+    texto_busca = texto[:5000]
+
+    matches = re.finditer(
+        r'(\d{1,2})\s+de\s+(janeiro|fevereiro|março|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)\s+de\s+(202[4-6])',
+        texto_busca,
+        re.IGNORECASE
+    )
+
+    for match in matches:
+        dia, mes_nome, ano = match.groups()
+        mes_num = MESES[mes_nome.lower()]
+        ano_int = int(ano)
+        dia_int = int(dia)
+
+        if 1 <= dia_int <= 31 and 2024 <= ano_int <= 2026:
+            return f"{ano_int}-{mes_num:02d}-{dia_int:02d}"
+
+    return None
+
+
+def _antecede_vereador(texto, posicao):
+    """Se o texto antes da posição termina em 'vereador[a]' + espaços, devolve onde começa"""
+    fim = posicao
+    while fim > 0 and texto[fim - 1].isspace():
+        fim -= 1
+    if fim == posicao:
+        return None
+    for palavra in ('vereadora', 'vereador'):
+        inicio = fim - len(palavra)
+        if inicio >= 0 and texto[inicio:fim].lower() == palavra:
+            return inicio
+    return None
+
+
+def extrair_autor_especifico(texto_contexto, pl_numero):
+    """
+    Extrai autor específico do PL.
+
+    As menções a vereadores vêm de uma única varredura do AUTOMATO; as
+    regras de precedência são aplicadas sobre as posições encontradas:
+    1. "de autoria/autor ... vereador(a) ... NOME" na mesma linha, nos 500
+       caracteres a partir do PL;
+    2. "vereador(a) NOME" começando antes do caractere 150 (nos 200 primeiros).
+    Em cada regra vence o primeiro vereador na ordem do cadastro.
+    """
+    padrao_pl_exato = rf'(?:Projeto\s+de\s+Lei|PL)\s+(?:n[úº]mero|n[úº]|nº)?\s*{re.escape(pl_numero)}'
+    match_pl = re.search(padrao_pl_exato, texto_contexto, re.IGNORECASE)
+
+    if not match_pl:
+        return None
+
+    posicao_pl = match_pl.start()
+    contexto_pos_pl = texto_contexto[posicao_pl:posicao_pl + 500]
+
+    # Regra 1: pista de autoria, depois "vereador", depois o nome, sem quebra de linha
+    mencoes = AUTOMATO.mencoes(contexto_pos_pl)
+    if mencoes:
+        autorias = [m.start() for m in _AUTORIA.finditer(contexto_pos_pl)]
+        vereadores = [m.start() for m in _VEREADOR.finditer(contexto_pos_pl)]
+        validos = []
+        for posicao, indice in mencoes:
+            inicio_linha = contexto_pos_pl.rfind('\n', 0, posicao) + 1
+            i = bisect.bisect_left(autorias, inicio_linha)
+            if i == len(autorias):
+                continue
+            j = bisect.bisect_left(vereadores, autorias[i] + len('autor'))
+            if j < len(vereadores) and vereadores[j] + len('vereador') <= posicao:
+                validos.append(indice)
+        if validos:
+            return AUTOMATO.oficiais[min(validos)]
+
+    # Regra 2: "vereador(a) NOME" logo no início do trecho
+    inicio_trecho = contexto_pos_pl[:200]
+    validos = [
+        indice for posicao, indice in AUTOMATO.mencoes(inicio_trecho)
+        if (inicio := _antecede_vereador(inicio_trecho, posicao)) is not None and inicio < 150
+    ]
+    if validos:
+        return AUTOMATO.oficiais[min(validos)]
+
+    return None
+
+
+def determinar_status(contexto, pl_numero):
+    """Determina status do PL"""
+    contexto_lower = contexto.lower()
+
+    if re.search(rf'{re.escape(pl_numero)}.*?(?:foi\s+)?aprovado', contexto_lower, re.DOTALL):
+        return 'Aprovado (Votação Simbólica)'
+    if re.search(r'em\s+votação.*?aprovado', contexto_lower):
+        return 'Aprovado (Votação Simbólica)'
+    if 'rejeitado' in contexto_lower:
+        return 'Rejeitado'
+    if re.search(r'encaminhad[oa]s?\s+(?:para|à|às)\s+(?:comiss[ãõ]|ccj)', contexto_lower):
+        return 'Encaminhado para Comissão'
+    if re.search(r'em\s+discuss[ãa]o', contexto_lower):
+        return 'Em Discussão'
+
+    return 'Não identificado'
+
+
+def extrair_presentes(texto):
+    """Extrai vereadores presentes"""
+    bloco = re.search(r'chamada\s+dos\s+vereadores.*?(?:Questão|Peço|execução|hino)',
+                      texto, re.DOTALL | re.IGNORECASE)
+    if not bloco:
+        return []
+
+    return AUTOMATO.presentes(bloco.group(0))
+
+
+def texto_presentes(bloco):
+    """Valor da coluna Presentes, a partir do texto do bloco da chamada"""
+    presentes = AUTOMATO.presentes(bloco) if bloco else []
+    return ', '.join(presentes) if presentes else 'Chamada não identificada'
+
+
+def presentes_da_chamada(conteudo, transcricao):
+    """Valor da coluna Presentes, pelo bloco da chamada achado pelo léxico"""
+    bloco = transcricao.bloco_chamada()
+    return texto_presentes(conteudo[bloco[0]:bloco[1]] if bloco else None)
+
+
+def extrair_pls(conteudo, transcricao=None):
+    """
+    Registros (sem data) dos PLs mencionados na transcrição.
+
+    Status e chamada saem dos eventos do léxico (uma varredura do texto);
+    só a busca do autor olha o trecho logo após cada menção.
+    """
+    if transcricao is None:
+        transcricao = Transcricao(conteudo)
+
+    presentes = presentes_da_chamada(conteudo, transcricao)
+    registros = []
+    sem_autor = 0
+
+    for mencao in transcricao.mencoes_pl():
+        pl_numero = mencao.valor
+        inicio, fim = transcricao.janela(mencao.inicio)
+
+        autor = extrair_autor_especifico(conteudo[inicio:fim], pl_numero)
+
+        if not autor:
+            sem_autor += 1
+            continue
+
+        registros.append({
+            'PL': pl_numero,
+            'Autor': autor,
+            'Status': transcricao.status(pl_numero, inicio, fim),
+            'Votos': 'N/A',
+            'Presentes': presentes,
+        })
+
+    return registros, sem_autor
+
+
+def hash_conteudo(dados):
+    return hashlib.sha256(dados).hexdigest()
+
+
+def ler_transcricao(caminho, hash_conhecido=None):
+    """
+    Lê a transcrição e calcula o hash. Devolve (resultado, dados); se o hash
+    for igual a `hash_conhecido`, os dados vêm como None e o resultado
+    marcado como inalterado.
+    """
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+
+    resultado = {'arquivo': os.path.basename(caminho), 'sha256': hash_conteudo(dados)}
+    if resultado['sha256'] == hash_conhecido:
+        resultado['inalterado'] = True
+        return resultado, None
+    return resultado, dados
+
+
+def datar(resultado, data, inicio_texto):
+    """
+    Data do corpo ou, sem ela, o ID do vídeo (da URL no início do texto ou do
+    nome do arquivo) para buscar o título depois
+    """
+    resultado.update({
+        'data': data,
+        'origem': 'corpo' if data else None,
+        'video_id': None if data else extrair_video_id(inicio_texto, resultado['arquivo']),
+    })
+
+
+def processar_transcricao(caminho, hash_conhecido=None):
+    """
+    Processa uma transcrição (executado nos processos do pool).
+
+    Se o hash do conteúdo for igual a `hash_conhecido`, devolve apenas o
+    hash, sem extrair nada.
+    """
+    if os.path.getsize(caminho) >= LIMITE_MMAP:
+        return processar_transcricao_mapeada(caminho, hash_conhecido)
+
+    resultado, dados = ler_transcricao(caminho, hash_conhecido)
+    if dados is None:
+        return resultado
+
+    try:
+        conteudo = dados.decode('utf-8')
+        transcricao = Transcricao(conteudo)
+        registros, sem_autor = extrair_pls(conteudo, transcricao)
+        datar(resultado, transcricao.data(), conteudo)
+    except Exception as e:
+        resultado['erro'] = str(e)
+        return resultado
+
+    resultado.update({'registros': registros, 'sem_autor': sem_autor})
+    return resultado
+
+
+def processar_transcricao_mapeada(caminho, hash_conhecido=None):
+    """
+    Como `processar_transcricao`, para transcrições grandes: o arquivo fica
+    mapeado em memória, menções e chamada são achadas nos bytes e só as
+    janelas de cada PL são decodificadas (ver leitura.py).
+    """
+    with ArquivoTranscricao(caminho) as arquivo:
+        resultado = {'arquivo': os.path.basename(caminho), 'sha256': arquivo.sha256()}
+        if resultado['sha256'] == hash_conhecido:
+            resultado['inalterado'] = True
+            return resultado
+
+        try:
+            datar(resultado, Transcricao(arquivo.cabecalho(LIMITE_DATA)).data(), arquivo.linhas_iniciais())
+            presentes = texto_presentes(arquivo.bloco_chamada())
+            registros = []
+            sem_autor = 0
+            for posicao, pl_numero in arquivo.mencoes_pl():
+                contexto = arquivo.janela(posicao, ANTES_PL, DEPOIS_PL)
+                autor = extrair_autor_especifico(contexto, pl_numero)
+                if not autor:
+                    sem_autor += 1
+                    continue
+                registros.append({
+                    'PL': pl_numero,
+                    'Autor': autor,
+                    'Status': Transcricao(contexto).status(pl_numero, 0, len(contexto)),
+                    'Votos': 'N/A',
+                    'Presentes': presentes,
+                })
+        except Exception as e:
+            resultado['erro'] = str(e)
+            return resultado
+
+    resultado.update({'registros': registros, 'sem_autor': sem_autor})
+    return resultado
+
+
+def caminho_manifesto(caminho_base):
+    """Manifesto das transcrições já extraídas, ao lado da base"""
+    return os.path.splitext(caminho_base)[0] + '.manifesto.json'
+
+
+def ler_manifesto(caminho):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gravar_manifesto(manifesto, caminho):
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporario, caminho)
+
+
+def resultado_do_manifesto(arquivo, entrada):
+    """Resultado de uma transcrição sem data já extraída, refeito a partir do manifesto"""
+    return {'arquivo': arquivo, 'sha256': entrada['sha256'], 'data': None, 'origem': None,
+            **{chave: entrada[chave] for chave in CHAVES_SEM_DATA}}
+
+
+def ler_base(caminho_base):
+    """Base existente com os valores como texto (preserva 'N/A')"""
+    if not os.path.exists(caminho_base):
+        return pd.DataFrame(columns=COLUNAS_BASE)
+    return pd.read_csv(caminho_base, dtype=str, keep_default_na=False)
+
+
+def mesclar_base(base, novos, fontes_reprocessadas):
+    """
+    Substitui as linhas das transcrições reprocessadas pelas novas e aplica
+    a mesma deduplicação do notebook (PL + Fonte).
+    """
+    base = base[~base['Fonte'].isin(fontes_reprocessadas)]
+    df = pd.concat([base, novos[COLUNAS_BASE]], ignore_index=True)
+    df['Data Sessão'] = pd.to_datetime(df['Data Sessão'])
+    df = df.drop_duplicates(subset=['PL', 'Fonte']).reset_index(drop=True)
+    df = df.sort_values('Data Sessão', kind='stable')
+    df['Data Sessão'] = df['Data Sessão'].dt.strftime('%Y-%m-%d')
+    return df
+
+
+def selecionar_pendentes(pasta, manifesto, reprocessar_tudo=False, motor='regex'):
+    """
+    Transcrições a processar: novas, com tamanho/mtime diferente do
+    manifesto, extraídas por outro motor ou sem data e sem os registros
+    guardados. Devolve (caminho, hash_conhecido).
+    """
+    pendentes = []
+    for arquivo in sorted(os.listdir(pasta)):
+        if not arquivo.endswith('.txt'):
+            continue
+        caminho = os.path.join(pasta, arquivo)
+        info = os.stat(caminho)
+        anterior = manifesto.get(arquivo)
+        valido = (not reprocessar_tudo and anterior and (anterior.get('data') or 'registros' in anterior)
+                  and anterior.get('motor', 'regex') == motor)
+        if valido and anterior['tamanho'] == info.st_size and anterior['mtime'] == info.st_mtime_ns:
+            continue
+        pendentes.append((caminho, anterior['sha256'] if valido else None))
+    return pendentes
+
+
+def selecionar_sem_data(pasta, manifesto, pendentes):
+    """
+    Transcrições inalteradas que seguem sem data: resultados refeitos a
+    partir do manifesto, só para buscar a data pelo título de novo
+    """
+    lidos = {os.path.basename(caminho) for caminho, _ in pendentes}
+    return [resultado_do_manifesto(arquivo, entrada) for arquivo, entrada in sorted(manifesto.items())
+            if not entrada.get('data') and 'registros' in entrada and arquivo not in lidos
+            and os.path.exists(os.path.join(pasta, arquivo))]
+
+
+def resolver_datas_titulo(resultados, resolvedor):
+    """Completa a data pelos títulos do YouTube quando o corpo não tem data"""
+    sem_data = [r for r in resultados if not r.get('data') and r.get('video_id')]
+    titulos = resolvedor.resolver(r['video_id'] for r in sem_data)
+    for resultado in sem_data:
+        titulo = titulos.get(resultado['video_id'])
+        if titulo:
+            print(f"      {resultado['arquivo'][:40]} Título: {titulo[:80]}")
+            resultado['data'] = extrair_data_do_titulo(titulo)
+            resultado['origem'] = 'título'
+
+
+def executar(pasta, caminho_base=BASE_PADRAO, processos=None, reprocessar_tudo=False, usar_youtube=True,
+             motor='regex', modelo=None, tamanho_lote=64, resolvedor=None, particionado=False):
+    """
+    Extrai as transcrições pendentes e atualiza a base e o manifesto.
+
+    Sem data no corpo, a data vem do título do vídeo: `resolvedor` (por
+    padrão um ResolvedorTitulos com cache ao lado da base) busca os títulos.
+    As transcrições que já estavam sem data e não mudaram não são relidas:
+    só a busca pelo título é refeita, com os registros do manifesto.
+
+    `motor` escolhe como o autor é encontrado: 'regex' (padrão, um processo
+    do pool por núcleo) ou 'spacy' (NER em lotes pelo `nlp.pipe`, com
+    `processos` processos do spaCy e o `modelo` indicado).
+
+    Com `particionado`, as linhas vão para a base particionada ao lado de
+    `caminho_base` (criada a partir do CSV na primeira vez), reescrevendo
+    só as partições afetadas; o CSV não é tocado.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor desconhecido: {motor}")
+    caminho_mf = caminho_manifesto(caminho_base)
+    manifesto = {} if reprocessar_tudo else ler_manifesto(caminho_mf)
+    pendentes = selecionar_pendentes(pasta, manifesto, reprocessar_tudo, motor)
+    sem_data = selecionar_sem_data(pasta, manifesto, pendentes) if usar_youtube else []
+
+    stats = {
+        'pendentes': len(pendentes),
+        'aguardando_data': len(sem_data),
+        'inalterados': 0,
+        'processados': 0,
+        'sem_data': 0,
+        'data_corpo': 0,
+        'data_titulo': 0,
+        'pls_total': 0,
+        'pls_sem_autor': 0,
+        'erros': 0,
+    }
+    print(f"📄 {len(pendentes)} transcrições novas ou alteradas em {pasta}")
+    if sem_data:
+        print(f"🎬 {len(sem_data)} transcrições sem data aguardando o título do vídeo")
+
+    if not pendentes and not sem_data:
+        return stats
+
+    caminhos = [caminho for caminho, _ in pendentes]
+    conhecidos = [conhecido for _, conhecido in pendentes]
+    if not pendentes:
+        resultados = []
+    elif motor == 'spacy':
+        import ner
+
+        nlp = ner.carregar_nlp(modelo or ner.MODELO_PADRAO)
+        resultados = ner.processar_transcricoes(pendentes, nlp, tamanho_lote, processos or 1)
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            resultados = list(pool.map(processar_transcricao, caminhos, conhecidos,
+                                       chunksize=max(1, len(caminhos) // (4 * (processos or os.cpu_count() or 1)))))
+
+    alterados = []
+    for caminho, resultado in zip(caminhos, resultados):
+        info = os.stat(caminho)
+        entrada = manifesto.setdefault(resultado['arquivo'], {})
+        entrada.update({'tamanho': info.st_size, 'mtime': info.st_mtime_ns, 'sha256': resultado['sha256'],
+                        'motor': motor})
+        if resultado.get('inalterado'):
+            stats['inalterados'] += 1
+            if not entrada.get('data'):
+                alterados.append(resultado_do_manifesto(resultado['arquivo'], entrada))
+        elif 'erro' in resultado:
+            # Sem 'data' no manifesto: o arquivo volta a ser tentado na próxima execução
+            for chave in ('data', 'pls', *CHAVES_SEM_DATA):
+                entrada.pop(chave, None)
+            print(f"   {resultado['arquivo'][:40]}... ❌ {resultado['erro']}")
+            stats['erros'] += 1
+        else:
+            alterados.append(resultado)
+    alterados.extend(sem_data)
+
+    if usar_youtube:
+        if resolvedor is None:
+            resolvedor = ResolvedorTitulos(CacheTitulos(caminho_cache(caminho_base)))
+        resolver_datas_titulo(alterados, resolvedor)
+
+    linhas = []
+    for resultado in alterados:
+        entrada = manifesto[resultado['arquivo']]
+        entrada['data'] = resultado['data']
+        entrada['pls'] = len(resultado['registros'])
+
+        if not resultado['data']:
+            entrada.update({chave: resultado[chave] for chave in CHAVES_SEM_DATA})
+            print(f"   {resultado['arquivo'][:40]}... ⚠️ Sem data")
+            stats['sem_data'] += 1
+            continue
+        for chave in CHAVES_SEM_DATA:
+            entrada.pop(chave, None)
+
+        stats['processados'] += 1
+        stats['pls_sem_autor'] += resultado['sem_autor']
+        stats['data_corpo' if resultado['origem'] == 'corpo' else 'data_titulo'] += 1
+        stats['pls_total'] += len(resultado['registros'])
+        for registro in resultado['registros']:
+            linhas.append({'Data Sessão': resultado['data'], **registro, 'Fonte': resultado['arquivo']})
+
+    reprocessadas = [r['arquivo'] for r in alterados if r['data']]
+    if reprocessadas:
+        novos = pd.DataFrame(linhas, columns=COLUNAS_BASE)
+        if particionado:
+            from armazem import anexar, caminho_dataset, gravar, particoes
+
+            pasta_base = caminho_dataset(caminho_base)
+            if not particoes(pasta_base) and os.path.exists(caminho_base):
+                gravar(ler_base(caminho_base), pasta_base)
+            stats['particoes_gravadas'] = len(anexar(pasta_base, novos, reprocessadas))
+        else:
+            base = mesclar_base(ler_base(caminho_base), novos, reprocessadas)
+            base.to_csv(caminho_base, index=False)
+            stats['registros_base'] = len(base)
+        # Instantâneo de partida do painel, já na versão nova da base
+        from instantaneo import gerar as gerar_instantaneo
+
+        stats['instantaneo'] = gerar_instantaneo([caminho_base])
+    gravar_manifesto(manifesto, caminho_mf)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extrai os PLs das transcrições das sessões')
+    parser.add_argument('pasta', help='pasta com as transcrições (.txt)')
+    parser.add_argument('--base', default=BASE_PADRAO, help='CSV da base a atualizar')
+    parser.add_argument('--processos', type=int, default=None, help='processos do pool (padrão: núcleos)')
+    parser.add_argument('--tudo', action='store_true', help='ignora o manifesto e reprocessa tudo')
+    parser.add_argument('--sem-youtube', action='store_true', help='não busca datas nos títulos do YouTube')
+    parser.add_argument('--motor', choices=MOTORES, default='regex', help='como encontrar o autor de cada PL')
+    parser.add_argument('--modelo', default=None, help='modelo do spaCy (padrão: pt_core_news_lg; "regras" usa só o cadastro)')
+    parser.add_argument('--lote', type=int, default=64, help='trechos por lote no nlp.pipe (motor spacy)')
+    parser.add_argument('--particionado', action='store_true',
+                        help='atualiza a base em Parquet particionado por ano/mês (só as partições afetadas)')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    stats = executar(args.pasta, args.base, args.processos, args.tudo, not args.sem_youtube,
+                     args.motor, args.modelo, args.lote, particionado=args.particionado)
+
+    print("\n" + "=" * 70)
+    print("📊 RESULTADOS")
+    print("=" * 70)
+    print(f"🔁 Transcrições inalteradas (só o hash): {stats['inalterados']}")
+    print(f"✅ Arquivos processados: {stats['processados']}")
+    print(f"   📄 Datas do corpo: {stats['data_corpo']}")
+    print(f"   🎬 Datas do título YouTube: {stats['data_titulo']}")
+    print(f"⚠️  Arquivos sem data: {stats['sem_data']}")
+    print(f"   🎬 Já extraídos, só o título buscado de novo: {stats['aguardando_data']}")
+    print(f"📋 PLs extraídos: {stats['pls_total']}")
+    print(f"⚠️  PLs sem autor: {stats['pls_sem_autor']}")
+    print(f"❌ Arquivos com erro: {stats['erros']}")
+    if 'registros_base' in stats:
+        print(f"💾 Base: {stats['registros_base']} registros em {args.base}")
+    if 'particoes_gravadas' in stats:
+        from armazem import caminho_dataset
+
+        print(f"💾 Base: {stats['particoes_gravadas']} partições reescritas em {caminho_dataset(args.base)}")
+    if stats.get('instantaneo'):
+        print(f"⚡ Instantâneo do painel: {stats['instantaneo']}")
+    print(f"⏱️  {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Cache de figuras do painel e agrupamento adaptativo de séries mensais
+
+Montar uma figura com plotly.express custa dezenas de ms, bem mais que
+serializá-la. As figuras ficam num LRU compartilhado entre sessões, com
+chave no nome do gráfico, num hash do agregado que o alimenta e nos
+parâmetros do gráfico: um agregado igual (mesmo vindo de outro filtro ou de
+outra sessão) devolve a mesma figura já pronta. Como a especificação
+enviada sai idêntica byte a byte, o próprio Streamlit manda ao navegador
+que já a tem só uma referência à mensagem (cache de ForwardMsg, para
+mensagens a partir de 10 kB).
+
+Séries mensais que cobrem muitos anos são agrupadas em trimestres,
+semestres ou anos, no nível mais fino que caiba em `MAX_PONTOS_SERIE`.
+
+`ModuloAdiado` adia a importação do plotly (centenas de ms) até a primeira
+figura realmente montada: uma figura vinda do cache não precisa dele.
+"""
+
+import hashlib
+import importlib
+import threading
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+MAX_PONTOS_SERIE = 60
+
+# (rótulo, meses por grupo), do mais fino para o mais grosso
+AGRUPAMENTOS = [('Mês', 1), ('Trimestre', 3), ('Semestre', 6), ('Ano', 12)]
+
+
+class ModuloAdiado:
+    """Módulo importado no primeiro acesso a um atributo (ex.: ModuloAdiado('plotly.express'))"""
+
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome)
+        return getattr(self._modulo, atributo)
+
+
+def assinatura(*dados):
+    """Hash do conteúdo (valores, índice, colunas e tipos) de quadros, séries e vetores"""
+    h = hashlib.blake2b(digest_size=16)
+    for item in dados:
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            h.update(pd.util.hash_pandas_object(item, index=True).to_numpy().tobytes())
+            if isinstance(item, pd.DataFrame):
+                colunas, tipos = list(item.columns), list(item.dtypes)
+            else:
+                colunas, tipos = [item.name], [item.dtype]
+            h.update(repr([(c, str(t)) for c, t in zip(colunas, tipos)]).encode())
+            h.update(repr(list(item.index.names)).encode())
+        elif isinstance(item, np.ndarray):
+            h.update(np.ascontiguousarray(item).tobytes())
+            h.update(repr((item.dtype.str, item.shape)).encode())
+        else:
+            h.update(repr(item).encode())
+    return h.hexdigest()
+
+
+class CacheFiguras:
+    """Figuras prontas por (gráfico, hash do agregado, parâmetros)"""
+
+    def __init__(self, tamanho_cache=256):
+        self._cache = LRUCache(maxsize=tamanho_cache)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def figura(self, nome, dados, construir, *parametros):
+        """
+        Figura do cache ou `construir()`. `dados` é o agregado (ou uma tupla
+        deles) que a figura mostra; `parametros`, o que mais muda a figura
+        (títulos, escalas, opções). A figura devolvida é compartilhada e não
+        deve ser alterada.
+        """
+        dados = dados if isinstance(dados, tuple) else (dados,)
+        chave = (nome, assinatura(*dados), parametros)
+        with self._trava:
+            if chave in self._cache:
+                self.acertos += 1
+                return self._cache[chave]
+        fig = construir()
+        with self._trava:
+            self.faltas += 1
+            self._cache[chave] = fig
+        return fig
+
+
+def agrupar_serie(serie, max_pontos=MAX_PONTOS_SERIE):
+    """
+    Série indexada pelo primeiro dia do mês, agrupada no nível mais fino em
+    que o período coberto cabe em `max_pontos` grupos. Devolve a série
+    (indexada pelo primeiro dia de cada grupo, só grupos com eventos) e o
+    rótulo do nível.
+    """
+    if serie.empty:
+        return serie, AGRUPAMENTOS[0][0]
+    meses = serie.index.year.to_numpy() * 12 + serie.index.month.to_numpy() - 1
+    extensao = meses.max() - meses.min()
+    for rotulo, passo in AGRUPAMENTOS:
+        if extensao // passo + 1 <= max_pontos:
+            break
+    if passo == 1:
+        return serie, rotulo
+
+    grupo = meses // passo * passo
+    inicio = pd.to_datetime(pd.DataFrame({'year': grupo // 12, 'month': grupo % 12 + 1, 'day': 1}))
+    agrupada = serie.groupby(inicio.to_numpy(), sort=True).sum()
+    agrupada.index.name = serie.index.name
+    return agrupada, rotulo
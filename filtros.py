@@ -0,0 +1,125 @@
+"""
+Motor de filtros da barra lateral
+
+A base é mantida ordenada pela data da sessão, então um período vira um
+intervalo contínuo de linhas encontrado por busca binária. Para cada autor
+e status guardamos as posições (ordenadas) das suas linhas; os filtros se
+combinam por interseção desses conjuntos. Os resultados ficam memorizados
+por assinatura completa do filtro (LRU), de modo que repetir uma combinação
+já vista é uma consulta ao dicionário; o painel usa o mesmo cache para os
+resultados de cada aba (`memorizar`).
+"""
+
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+VAZIO = np.empty(0, dtype=np.intp)
+
+
+def _limite(data):
+    """Converte date/datetime para datetime64[ns]"""
+    return np.datetime64(pd.Timestamp(data), 'ns')
+
+
+def _recortar(posicoes, inicio, fim):
+    """Posições de um conjunto ordenado que caem no intervalo [inicio, fim)"""
+    return posicoes[np.searchsorted(posicoes, inicio):np.searchsorted(posicoes, fim)]
+
+
+def _uniao(conjuntos):
+    """União de conjuntos de posições disjuntos (resultado ordenado)"""
+    if not conjuntos:
+        return VAZIO
+    if len(conjuntos) == 1:
+        return conjuntos[0]
+    return np.sort(np.concatenate(conjuntos))
+
+
+class MotorFiltros:
+    """Filtra a base por período, autores, status e número de PL"""
+
+    def __init__(self, df, tamanho_cache=128):
+        self.df = df.sort_values('Data Sessão', kind='stable', ignore_index=True)
+        self._datas = self.df['Data Sessão'].to_numpy()
+
+        self._linhas_autor = self._indices('Autor')
+        self._linhas_status = self._indices('Status')
+
+        pl = self.df['PL'].astype('category')
+        self._pl_categorias = pl.cat.categories.astype(str)
+        self._pl_codigos = pl.cat.codes.to_numpy()
+
+        self._cache = LRUCache(maxsize=tamanho_cache)
+        self._trava = threading.Lock()
+
+    def _indices(self, coluna):
+        """Posições ordenadas das linhas de cada valor da coluna"""
+        grupos = self.df.groupby(coluna, observed=True, sort=False).indices
+        return {str(valor): np.asarray(posicoes, dtype=np.intp) for valor, posicoes in grupos.items()}
+
+    def memorizar(self, chave, calcular):
+        """Consulta o cache LRU (compartilhado entre sessões) ou calcula"""
+        with self._trava:
+            if chave in self._cache:
+                return self._cache[chave]
+        valor = calcular()
+        with self._trava:
+            self._cache[chave] = valor
+        return valor
+
+    def intervalo(self, data_inicio, data_fim):
+        """Intervalo [ini, fim) de linhas do período, por busca binária"""
+        ini = np.searchsorted(self._datas, _limite(data_inicio), side='left')
+        fim = np.searchsorted(self._datas, _limite(data_fim + timedelta(days=1)), side='left')
+        return int(ini), int(fim)
+
+    def opcoes(self, data_inicio, data_fim):
+        """Autores e status presentes no período (ordenados)"""
+        def calcular():
+            ini, fim = self.intervalo(data_inicio, data_fim)
+            autores = sorted(a for a, p in self._linhas_autor.items() if len(_recortar(p, ini, fim)))
+            status = sorted(s for s, p in self._linhas_status.items() if len(_recortar(p, ini, fim)))
+            return autores, status
+
+        return self.memorizar(('opcoes', data_inicio, data_fim), calcular)
+
+    def posicoes(self, data_inicio, data_fim, autores=(), status=(), pl_texto=''):
+        """Posições (ordenadas por data) das linhas que passam no filtro"""
+        chave = ('posicoes', data_inicio, data_fim, frozenset(autores), frozenset(status), pl_texto)
+        return self.memorizar(chave, lambda: self._calcular(data_inicio, data_fim, autores, status, pl_texto))
+
+    def _calcular(self, data_inicio, data_fim, autores, status, pl_texto):
+        ini, fim = self.intervalo(data_inicio, data_fim)
+        resultado = None
+
+        for selecionados, linhas in ((autores, self._linhas_autor), (status, self._linhas_status)):
+            if not selecionados:
+                continue
+            conjunto = _uniao([_recortar(linhas[v], ini, fim) for v in selecionados if v in linhas])
+            resultado = conjunto if resultado is None else np.intersect1d(resultado, conjunto, assume_unique=True)
+
+        if pl_texto:
+            # Busca literal (o texto vem de um campo livre: '(' ou '+' não são
+            # regex), sem caixa, avaliada só nos PLs distintos
+            casam = np.flatnonzero(self._pl_categorias.str.contains(pl_texto, case=False, na=False,
+                                                                    regex=False))
+            if resultado is None:
+                resultado = ini + np.flatnonzero(np.isin(self._pl_codigos[ini:fim], casam))
+            else:
+                resultado = resultado[np.isin(self._pl_codigos[resultado], casam)]
+
+        if resultado is None:
+            resultado = np.arange(ini, fim, dtype=np.intp)
+        resultado.flags.writeable = False
+        return resultado
+
+    def filtrar(self, data_inicio, data_fim, autores=(), status=(), pl_texto=''):
+        """Recorte da base para o filtro (memorizado; não deve ser alterado)"""
+        chave = ('quadro', data_inicio, data_fim, frozenset(autores), frozenset(status), pl_texto)
+        return self.memorizar(chave, lambda: self.df.iloc[
+            self.posicoes(data_inicio, data_fim, autores, status, pl_texto)
+        ])
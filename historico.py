@@ -0,0 +1,102 @@
+"""
+Histórico de PLs em poucos elementos
+
+O histórico de um PL vira um único quadro (montado de forma vetorizada) e
+uma única figura de linha do tempo, em vez de um bloco de widgets por
+evento; a página de resultados da busca vira uma tabela com uma linha por
+PL. O número de elementos enviados ao navegador fica constante, seja qual
+for o número de eventos.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+CORES_STATUS = {
+    'Aprovado (Votação Simbólica)': '#2ecc71',
+    'Em Discussão': '#f39c12',
+    'Não identificado': '#95a5a6',
+    'Encaminhado para Comissão': '#3498db',
+    'Rejeitado': '#e74c3c'
+}
+
+EMOJI_STATUS = {
+    'Aprovado (Votação Simbólica)': '✅',
+    'Em Discussão': '💬',
+    'Não identificado': '❓',
+    'Encaminhado para Comissão': '📤',
+    'Rejeitado': '❌'
+}
+
+FORMATO_DATA = 'DD/MM/YYYY'
+
+
+def quadro_historico(eventos):
+    """
+    Eventos de um PL (ordem cronológica) como quadro: data, status com
+    emoji, fonte e intervalo. Status e fonte ficam categóricos, e cada texto
+    vai uma vez só (dicionário do Arrow) para o navegador.
+    """
+    status = eventos['Status'].astype(str).astype('category')
+    rotulos = [f"{EMOJI_STATUS.get(s, '📋')} {s}" for s in status.cat.categories]
+    datas = eventos['Data Sessão']
+    return pd.DataFrame({
+        'Data Sessão': datas.to_numpy(),
+        'Status': status.cat.rename_categories(rotulos).array,
+        'Fonte': eventos['Fonte'].astype(str).astype('category').array,
+        'Dias desde a Anterior': datas.diff().dt.days.to_numpy(),
+    })
+
+
+def figura_historico(eventos):
+    """
+    Linha do tempo do PL: um ponto por evento, na faixa do seu status.
+    Datas (ms) e faixas vão como vetores numéricos, que o plotly envia em
+    binário, e não como textos repetidos a cada ponto.
+    """
+    status = eventos['Status'].astype(str).to_numpy()
+    presentes = set(status)
+    ordem = [s for s in CORES_STATUS if s in presentes] + sorted(presentes - set(CORES_STATUS))
+    faixa = pd.Index(ordem).get_indexer(status).astype(np.int8)
+    x = eventos['Data Sessão'].to_numpy().astype('datetime64[ms]').astype(np.float64)
+
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    # Trajeto entre os status, por baixo dos pontos
+    fig.add_scatter(x=x, y=faixa, mode='lines', line={'color': '#bdc3c7', 'width': 1, 'shape': 'hv'},
+                    hoverinfo='skip', showlegend=False)
+    for i, nome in enumerate(ordem):
+        no_status = faixa == i
+        fig.add_scatter(x=x[no_status], y=faixa[no_status], mode='markers', name=nome,
+                        marker={'size': 10, 'color': CORES_STATUS.get(nome, '#7f8c8d')},
+                        hovertemplate=f'%{{x|%d/%m/%Y}}<extra>{nome}</extra>')
+    fig.update_xaxes(type='date')
+    fig.update_yaxes(tickvals=list(range(len(ordem))), ticktext=ordem, range=[-0.5, len(ordem) - 0.5])
+    fig.update_layout(height=120 + 40 * len(ordem), margin={'t': 20, 'b': 20})
+    return fig
+
+
+def renderizar_historico(eventos, chave=None):
+    """Figura e quadro do histórico: dois elementos, qualquer que seja o número de eventos"""
+    st.plotly_chart(figura_historico(eventos), use_container_width=True, key=chave)
+    st.dataframe(
+        quadro_historico(eventos),
+        use_container_width=True,
+        hide_index=True,
+        column_config={'Data Sessão': st.column_config.DateColumn(format=FORMATO_DATA)}
+    )
+
+
+def quadro_resultados(resultados, ciclo_vida):
+    """Uma linha por PL da página de busca, com o resumo do ciclo de vida"""
+    pls = [r.pl for r in resultados]
+    resumo = ciclo_vida.tabela.loc[pls, ['Autor', 'Status Atual', 'Primeira Sessão', 'Última Sessão']]
+    return pd.DataFrame({
+        'PL': pls,
+        'Autor': resumo['Autor'].to_numpy(),
+        'Status Atual': resumo['Status Atual'].to_numpy(),
+        'Primeira Menção': resumo['Primeira Sessão'].to_numpy(),
+        'Última Menção': resumo['Última Sessão'].to_numpy(),
+        'Menções Encontradas': np.array([len(r.linhas) for r in resultados], dtype=np.int64),
+    })
@@ -0,0 +1,154 @@
+"""
+Instantâneo de partida do painel
+
+Um JSON pequeno, gravado ao lado da base, com o que a primeira tela mostra:
+primeira e última sessão (limites do período), a lista de autores e status
+e os indicadores principais de cada seleção rápida de período. Um processo
+novo do painel desenha a barra lateral e os indicadores a partir dele, sem
+importar pandas nem carregar a base; a base e o plotly só vêm depois, para
+as abas.
+
+O instantâneo vale só para a versão da base em que foi gerado
+(origem.versao_base, só `stat`); com outra versão é ignorado e o painel
+volta ao caminho completo, gravando um novo ao fim da carga. O extrator
+também grava um novo depois de atualizar a base.
+
+Gerar (ou refazer) a partir da base disponível na pasta atual:
+    python -m instantaneo
+"""
+
+import json
+import os
+import uuid
+from datetime import date, timedelta
+
+from origem import BASES, localizar_base, versao_base
+
+VERSAO_FORMATO = 1
+
+# Seleções rápidas da barra lateral: dias antes da última sessão (None: toda a base)
+PERIODOS_RAPIDOS = {
+    'Últimos 30 dias': 30,
+    'Últimos 3 meses': 90,
+    'Últimos 6 meses': 180,
+    'Todo o período': None,
+}
+
+
+def caminho_instantaneo(caminho_base):
+    """Arquivo do instantâneo ao lado da base (CSV ou pasta da base particionada)"""
+    return os.path.splitext(caminho_base.rstrip(os.sep))[0] + '.instantaneo.json'
+
+
+def intervalo_rapido(nome, data_min, data_max):
+    """(início, fim) da seleção rápida de período"""
+    dias = PERIODOS_RAPIDOS[nome]
+    return (data_min if dias is None else data_max - timedelta(days=dias)), data_max
+
+
+def montar(motor, cubo, versao):
+    """
+    Instantâneo a partir das estruturas já montadas do painel: o motor de
+    filtros (base ordenada e opções por período) e o cubo da base inteira
+    """
+    datas = motor.df['Data Sessão']
+    data_min, data_max = datas.iloc[0].date(), datas.iloc[-1].date()
+    periodos = {}
+    for nome in PERIODOS_RAPIDOS:
+        inicio, fim = intervalo_rapido(nome, data_min, data_max)
+        autores, status = motor.opcoes(inicio, fim)
+        periodos[nome] = {
+            'inicio': inicio.isoformat(),
+            'fim': fim.isoformat(),
+            'autores': list(autores),
+            'status': list(status),
+            'indicadores': cubo.fatiar(inicio, fim).indicadores(),
+        }
+    return {
+        'formato': VERSAO_FORMATO,
+        'versao': versao,
+        'data_min': data_min.isoformat(),
+        'data_max': data_max.isoformat(),
+        'registros': len(motor.df),
+        'periodos': periodos,
+    }
+
+
+def gravar(instantaneo, caminho):
+    """Escrita atômica; devolve False se a pasta não aceitar escrita"""
+    temporario = f'{caminho}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(instantaneo, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except OSError:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return False
+    return True
+
+
+def ler(arquivos=BASES):
+    """Instantâneo da base disponível, se existir e for da versão atual; senão None"""
+    origem = localizar_base(arquivos)
+    if origem is None:
+        return None
+    try:
+        with open(caminho_instantaneo(origem[1]), encoding='utf-8') as f:
+            instantaneo = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if instantaneo.get('formato') != VERSAO_FORMATO or instantaneo.get('versao') != versao_base(origem=origem):
+        return None
+    return instantaneo
+
+
+def periodo(instantaneo, data_inicio, data_fim):
+    """Entrada pré-calculada do período (datas iguais às de uma seleção rápida) ou None"""
+    if instantaneo is None:
+        return None
+    for entrada in instantaneo['periodos'].values():
+        if entrada['inicio'] == data_inicio.isoformat() and entrada['fim'] == data_fim.isoformat():
+            return entrada
+    return None
+
+
+def limites(instantaneo):
+    """(primeira, última) sessão como datas"""
+    return date.fromisoformat(instantaneo['data_min']), date.fromisoformat(instantaneo['data_max'])
+
+
+def salvar(motor, cubo, versao, arquivos=BASES):
+    """
+    Grava o instantâneo das estruturas já montadas ao lado da base
+    disponível, se `versao` (a da base que foi carregada) ainda for a
+    atual. Devolve o caminho gravado ou None
+    """
+    origem = localizar_base(arquivos)
+    if origem is None or versao_base(origem=origem) != versao:
+        return None
+    caminho = caminho_instantaneo(origem[1])
+    return caminho if gravar(montar(motor, cubo, versao), caminho) else None
+
+
+def gerar(arquivos=BASES):
+    """Carrega a base disponível e grava o instantâneo ao lado dela; devolve o caminho (ou None)"""
+    from agregacoes import CuboAgregado
+    from dados import carregar_disponivel
+    from filtros import MotorFiltros
+
+    versao = versao_base(arquivos)
+    dados = carregar_disponivel(arquivos)
+    if dados is None:
+        return None
+    motor = MotorFiltros(dados[0])
+    return salvar(motor, CuboAgregado.montar(motor.df), versao, arquivos)
+
+
+def main():
+    caminho = gerar()
+    print(f"Instantâneo gravado em {caminho}" if caminho else "Nenhuma base encontrada (ou pasta sem escrita)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Tempo de cálculo por seção do painel
+
+Cada seção (indicadores e abas) é medida a cada execução; o painel mostra a
+última medida, quantas vezes a seção rodou e o tempo acumulado, o que deixa
+visível quais seções um rerun realmente pagou.
+
+Com o modo de perfil ligado (variável de ambiente `OBSERVATORIO_PERFIL=1` ou
+`?perfil=1` na URL), `PerfilSecoes` mede também subseções (a montagem e o
+envio de cada gráfico, por exemplo), a variação da memória residente em
+cada uma, grava cada medida como uma linha JSON num registro local e, quando
+pedido, captura por amostragem as pilhas de uma única interação, no formato
+"folded" dos flame graphs (speedscope, flamegraph.pl).
+"""
+
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+VARIAVEL_PERFIL = 'OBSERVATORIO_PERFIL'
+PARAMETRO_PERFIL = 'perfil'
+LOG_PERFIL = os.environ.get('OBSERVATORIO_PERFIL_LOG', 'observatorio_perfil.jsonl')
+PASTA_CAPTURAS = os.environ.get('OBSERVATORIO_PERFIL_PASTA', 'perfis')
+INTERVALO_AMOSTRAGEM = 0.005
+
+# Um só arquivo de registro para todas as sessões do servidor
+_trava_log = threading.Lock()
+
+
+def perfil_pedido(parametros, ambiente=os.environ):
+    """Modo de perfil ligado pela variável de ambiente ou pelo parâmetro da URL"""
+    return (ambiente.get(VARIAVEL_PERFIL) == '1' or
+            str(parametros.get(PARAMETRO_PERFIL, '')).lower() in ('1', 'true', 'sim'))
+
+
+def memoria_residente():
+    """Memória residente atual do processo, em bytes (pico, sem /proc)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == 'darwin' else pico * 1024
+
+
+class TemposSecoes:
+    """Medidas por seção, acumuladas ao longo das execuções de uma sessão"""
+
+    def __init__(self):
+        self.ultima = {}
+        self.execucoes = {}
+        self.total = {}
+        self.rodada = 0
+        self._rodada_secao = {}
+
+    def nova_rodada(self):
+        """Marca o início de uma execução completa do script"""
+        self.rodada += 1
+
+    @contextmanager
+    def medir(self, secao):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            decorrido = time.perf_counter() - inicio
+            self.ultima[secao] = decorrido
+            self.execucoes[secao] = self.execucoes.get(secao, 0) + 1
+            self.total[secao] = self.total.get(secao, 0.0) + decorrido
+            self._rodada_secao[secao] = self.rodada
+
+    @contextmanager
+    def detalhe(self, secao):
+        """Subseção, medida só no modo de perfil"""
+        yield
+
+    @contextmanager
+    def captura(self, descricao):
+        """Captura de pilhas em volta do trecho, só no modo de perfil"""
+        yield
+
+    def rodou_agora(self, secao):
+        """A seção foi executada na rodada atual"""
+        return self._rodada_secao.get(secao) == self.rodada
+
+    def tabela(self):
+        """Quadro com as medidas (ms), uma linha por seção"""
+        # pandas só aqui: o painel importa este módulo antes da primeira tela
+        import pandas as pd
+
+        return pd.DataFrame({
+            'Nesta execução': [self.rodou_agora(s) for s in self.ultima],
+            'Última (ms)': [self.ultima[s] * 1000 for s in self.ultima],
+            'Execuções': [self.execucoes[s] for s in self.ultima],
+            'Total (ms)': [self.total[s] * 1000 for s in self.ultima],
+        }, index=pd.Index(list(self.ultima), name='Seção'))
+
+
+class AmostradorPilhas:
+    """
+    Profiler por amostragem de uma thread: uma thread auxiliar lê a pilha
+    dela a cada `intervalo` segundos e conta as pilhas distintas. O custo
+    fica na thread auxiliar e só existe enquanto a captura dura.
+    """
+
+    def __init__(self, thread_id, intervalo=INTERVALO_AMOSTRAGEM):
+        self.thread_id = thread_id
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, name='amostrador-perfil', daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def parar(self):
+        """Encerra a amostragem e devolve as contagens por pilha"""
+        self._parar.set()
+        self._thread.join()
+        return self.pilhas
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.thread_id)
+            pilha = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                pilha.append(f'{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})')
+                quadro = quadro.f_back
+            if pilha:
+                self.pilhas[';'.join(reversed(pilha))] += 1
+
+    def folded(self):
+        """Pilhas no formato "folded": uma por linha, quadros separados por ';' e a contagem"""
+        return ''.join(f'{pilha} {n}\n' for pilha, n in self.pilhas.most_common())
+
+
+class PerfilSecoes(TemposSecoes):
+    """
+    Medidas do modo de perfil: seções e subseções (caminho "seção › subseção"),
+    variação da memória residente, registro em JSON lines e capturas de
+    pilhas pedidas para a próxima interação.
+    """
+
+    def __init__(self, log=LOG_PERFIL, pasta_capturas=PASTA_CAPTURAS):
+        super().__init__()
+        self.log = log
+        self.pasta_capturas = pasta_capturas
+        self.sessao = uuid.uuid4().hex[:8]
+        self.memoria = {}
+        self.falha_log = None
+        self.captura_pedida = False
+        self.ultima_captura = None
+        self._pilha = []
+        self._amostrador = None
+
+    @contextmanager
+    def medir(self, secao):
+        caminho = ' › '.join([*self._pilha, secao])
+        self._pilha.append(secao)
+        memoria = memoria_residente()
+        try:
+            with super().medir(caminho):
+                yield
+        finally:
+            self._pilha.pop()
+            self.memoria[caminho] = memoria_residente() - memoria
+            self._registrar({
+                'tipo': 'secao',
+                'secao': caminho,
+                'ms': round(self.ultima[caminho] * 1000, 3),
+                'memoria_delta': self.memoria[caminho],
+                'memoria': memoria + self.memoria[caminho],
+            })
+
+    detalhe = medir
+
+    def _registrar(self, registro):
+        """Acrescenta o registro ao log (falhas de escrita não interrompem o painel)"""
+        linha = json.dumps({
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'sessao': self.sessao,
+            'rodada': self.rodada,
+            **registro,
+        }, ensure_ascii=False)
+        try:
+            with _trava_log, open(self.log, 'a', encoding='utf-8') as f:
+                f.write(linha + '\n')
+        except OSError as e:
+            self.falha_log = str(e)
+
+    def pedir_captura(self):
+        """Captura as pilhas da próxima interação (execução completa ou de uma aba)"""
+        self.captura_pedida = True
+
+    def iniciar_captura(self):
+        """No início de uma execução: começa a amostrar esta thread, se houver pedido"""
+        if self._amostrador is not None:
+            # Execução anterior interrompida por um rerun antes do fim
+            self._amostrador.parar()
+            self._amostrador = None
+        if self.captura_pedida:
+            self.captura_pedida = False
+            self._amostrador = AmostradorPilhas(threading.get_ident()).iniciar()
+
+    def encerrar_captura(self, descricao):
+        """No fim da execução: grava as pilhas capturadas e devolve o caminho (ou None)"""
+        if self._amostrador is None:
+            return None
+        amostrador, self._amostrador = self._amostrador, None
+        amostras = sum(amostrador.parar().values())
+        caminho = os.path.join(self.pasta_capturas,
+                               f'perfil-{datetime.now():%Y%m%d-%H%M%S}-{self.sessao}-{self.rodada}.folded')
+        try:
+            os.makedirs(self.pasta_capturas, exist_ok=True)
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write(amostrador.folded())
+        except OSError as e:
+            self.falha_log = str(e)
+            return None
+        self.ultima_captura = caminho
+        self._registrar({'tipo': 'captura', 'descricao': descricao, 'arquivo': caminho, 'amostras': amostras})
+        return caminho
+
+    @contextmanager
+    def captura(self, descricao):
+        # Já dentro de uma captura (execução completa), não abre outra
+        if self._amostrador is not None or not self.captura_pedida:
+            yield
+            return
+        self.iniciar_captura()
+        try:
+            yield
+        finally:
+            self.encerrar_captura(descricao)
+
+    def tabela(self):
+        """Quadro das medidas com a variação de memória (MiB) de cada seção"""
+        tabela = super().tabela()
+        tabela['Δ Memória (MiB)'] = [self.memoria.get(s, 0) / 2 ** 20 for s in tabela.index]
+        return tabela
+
+
+def tempos_da_sessao(estado, perfil):
+    """Medidas guardadas em `estado` (o session_state), trocadas se o modo de perfil mudou"""
+    tempos = estado.get('tempos_secoes')
+    if tempos is None or isinstance(tempos, PerfilSecoes) != perfil:
+        tempos = estado['tempos_secoes'] = PerfilSecoes() if perfil else TemposSecoes()
+    return tempos
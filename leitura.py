@@ -0,0 +1,181 @@
+"""
+Acesso às transcrições por mmap, para arquivos grandes
+
+Uma sessão de várias horas pode ter centenas de MB; ler o arquivo inteiro,
+decodificar e passar o léxico pelo texto todo multiplica esse tamanho na
+memória de cada processo do pool. Aqui o arquivo fica mapeado e:
+
+- o hash é calculado direto sobre o mapa;
+- cabeçalho (ID do vídeo, data no início do corpo) vem só dos primeiros bytes;
+- menções a PL e o bloco da chamada são encontrados por expressões sobre
+  bytes, varrendo o mapa sem cópia;
+- só as janelas em torno de cada menção (e o bloco da chamada) são
+  decodificadas, a partir de memoryviews do mapa.
+
+As varreduras completas (hash e menções) andam em blocos de
+`BLOCO_VARREDURA` bytes e devolvem ao sistema as páginas de cada bloco já
+lido (madvise), para que a memória residente não cresça com o arquivo.
+
+As expressões sobre bytes reproduzem as de texto, com duas diferenças:
+`\\s` e `\\d` valem só para espaços e dígitos ASCII, e uma menção com mais
+de `SOBREPOSICAO` bytes (só possível com milhares de espaços entre "PL" e o
+número) pode passar despercebida na divisa entre dois blocos.
+"""
+
+import hashlib
+import mmap
+import re
+
+# Um caractere em UTF-8 ocupa no máximo 4 bytes
+BYTES_POR_CARACTERE = 4
+BLOCO_VARREDURA = 16 * 1024 * 1024
+# Folga entre blocos consecutivos: maior que qualquer menção a PL
+SOBREPOSICAO = 4096
+
+
+def _sem_caixa(palavra):
+    """Expressão sobre bytes que casa a palavra sem diferenciar maiúsculas"""
+    partes = []
+    for caractere in palavra:
+        if caractere.isspace():
+            partes.append(rb'\s+')
+        elif caractere.isascii() and caractere.isalpha():
+            partes.append(b'[' + caractere.lower().encode() + caractere.upper().encode() + b']')
+        elif caractere.lower() != caractere.upper():
+            variantes = dict.fromkeys([caractere.lower(), caractere.upper()])
+            partes.append(b'(?:' + b'|'.join(re.escape(v.encode()) for v in variantes) + b')')
+        else:
+            partes.append(re.escape(caractere.encode()))
+    return b''.join(partes)
+
+
+# Mesmo que a menção do léxico: "(Projeto de Lei|PL) (n[úº]mero|n[úº]|nº)? 123/2025"
+_PADRAO_PL = re.compile(
+    b'(?:' + _sem_caixa('projeto de lei') + b'|' + _sem_caixa('pl') + rb')\s+'
+    b'(?:' + _sem_caixa('n') + b'(?:' + _sem_caixa('ú') + b'|' + 'º'.encode() + b')'
+    b'(?:' + _sem_caixa('mero') + rb')?)?\s*(\d{1,3}/202[4-6])'
+)
+# Mesmo que extrair_presentes: "chamada dos vereadores" até o primeiro terminador
+_INICIO_CHAMADA = re.compile(_sem_caixa('chamada dos vereadores'))
+_PADRAO_CHAMADA = re.compile(
+    _INICIO_CHAMADA.pattern + b'.*?(?:' +
+    b'|'.join(_sem_caixa(p) for p in ['Questão', 'Peço', 'execução', 'hino']) + b')',
+    re.DOTALL
+)
+
+
+def _continuacao(byte):
+    """Bytes 10xxxxxx continuam um caractere UTF-8"""
+    return 0x80 <= byte < 0xC0
+
+
+class ArquivoTranscricao:
+    """Transcrição mapeada em memória (somente leitura)"""
+
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, 'rb')
+        self.tamanho = self._arquivo.seek(0, 2)
+        # mmap não aceita arquivos vazios
+        self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ) if self.tamanho else b''
+        self._visao = memoryview(self._mapa)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self._visao.release()
+        if self.tamanho:
+            self._mapa.close()
+        self._arquivo.close()
+
+    def _liberar(self, inicio, fim):
+        """Devolve ao sistema as páginas inteiras de [inicio, fim) (continuam no cache do disco)"""
+        if not self.tamanho or not hasattr(self._mapa, 'madvise'):
+            return
+        inicio = -(-inicio // mmap.PAGESIZE) * mmap.PAGESIZE
+        fim = fim if fim >= self.tamanho else fim // mmap.PAGESIZE * mmap.PAGESIZE
+        if fim > inicio:
+            self._mapa.madvise(mmap.MADV_DONTNEED, inicio, fim - inicio)
+
+    def _blocos(self, sobreposicao=0):
+        """
+        Blocos (inicio, fim, fim_leitura) do arquivo: o chamador trata o que
+        começa em [inicio, fim) e pode ler até fim_leitura. As páginas de cada
+        bloco são liberadas quando o próximo é pedido.
+        """
+        for inicio in range(0, self.tamanho, BLOCO_VARREDURA):
+            fim = min(self.tamanho, inicio + BLOCO_VARREDURA)
+            yield inicio, fim, min(self.tamanho, fim + sobreposicao)
+            self._liberar(inicio, fim)
+
+    def sha256(self):
+        resumo = hashlib.sha256()
+        for inicio, fim, _ in self._blocos():
+            resumo.update(self._visao[inicio:fim])
+        return resumo.hexdigest()
+
+    def _alinhar(self, posicao, para_frente):
+        """Posição ajustada para o início de um caractere"""
+        while 0 < posicao < self.tamanho and _continuacao(self._mapa[posicao]):
+            posicao += 1 if para_frente else -1
+        return posicao
+
+    def texto(self, inicio, fim):
+        """Decodifica os bytes [inicio, fim) (alinhados a caracteres)"""
+        return str(self._visao[self._alinhar(inicio, True):self._alinhar(fim, False)], 'utf-8')
+
+    def cabecalho(self, caracteres):
+        """Os primeiros `caracteres` caracteres do texto"""
+        return self.texto(0, min(self.tamanho, caracteres * BYTES_POR_CARACTERE))[:caracteres]
+
+    def linhas_iniciais(self, quantidade=5):
+        """As primeiras linhas do texto (onde fica a URL do vídeo)"""
+        fim = -1
+        for _ in range(quantidade):
+            fim = self._mapa.find(b'\n', fim + 1)
+            if fim < 0:
+                fim = self.tamanho
+                break
+        return self.texto(0, fim)
+
+    def mencoes_pl(self):
+        """(posição em bytes, número) da primeira menção de cada PL, em ordem"""
+        vistos = set()
+        mencoes = []
+        proxima = 0
+        for inicio, fim, fim_leitura in self._blocos(SOBREPOSICAO):
+            # Menções que começam na folga ficam para o próximo bloco
+            for match in _PADRAO_PL.finditer(self._mapa, max(inicio, proxima), fim_leitura):
+                if match.start() >= fim:
+                    break
+                proxima = match.end()
+                pl = match.group(1).decode()
+                if pl not in vistos:
+                    vistos.add(pl)
+                    mencoes.append((match.start(), pl))
+        return mencoes
+
+    def janela(self, posicao, antes, depois):
+        """
+        Texto de `antes` caracteres antes a `depois` caracteres depois da
+        posição (em bytes), como conteudo[max(0, p - antes):p + depois] sobre
+        o texto decodificado inteiro.
+        """
+        inicio = self._alinhar(max(0, posicao - antes * BYTES_POR_CARACTERE - BYTES_POR_CARACTERE), True)
+        fim = self._alinhar(min(self.tamanho, posicao + depois * BYTES_POR_CARACTERE + BYTES_POR_CARACTERE),
+                            False)
+        anterior = self.texto(inicio, posicao)
+        posterior = self.texto(posicao, fim)
+        return anterior[max(0, len(anterior) - antes):] + posterior[:depois]
+
+    def bloco_chamada(self):
+        """Texto do bloco da chamada dos vereadores, ou None"""
+        for inicio, fim, fim_leitura in self._blocos(SOBREPOSICAO):
+            achado = _INICIO_CHAMADA.search(self._mapa, inicio, fim_leitura)
+            if achado and achado.start() < fim:
+                match = _PADRAO_CHAMADA.match(self._mapa, achado.start())
+                return self.texto(*match.span()) if match else None
+        return None
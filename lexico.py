@@ -0,0 +1,248 @@
+"""
+Léxico das transcrições
+
+Uma única varredura de cada transcrição produz uma sequência de eventos
+tipados (menção a PL, número de PL, palavras de desfecho da votação,
+encaminhamento à comissão, abertura e fim da chamada, data por extenso).
+Os tokens se sobrepõem em poucos pontos (o número dentro da menção, os
+dígitos do ano, quebras de linha dentro de um token), e esses eventos são
+gerados a partir do próprio token, sem voltar ao texto.
+
+O status de cada PL, a data da sessão e o bloco da chamada saem de buscas
+binárias sobre as posições dos eventos, com as mesmas regras (e a mesma
+janela de -1000/+2000 caracteres) de `determinar_status`,
+`extrair_data_do_corpo` e `extrair_presentes`, sem reler o texto a cada PL.
+"""
+
+import bisect
+import re
+from typing import NamedTuple
+
+MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'março': 3, 'abril': 4,
+    'maio': 5, 'junho': 6, 'julho': 7, 'agosto': 8,
+    'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
+}
+
+# Janela em torno da primeira menção de cada PL
+ANTES_PL = 1000
+DEPOIS_PL = 2000
+# A data da sessão é procurada só no início da transcrição
+LIMITE_DATA = 5000
+
+APROVADO = 'Aprovado (Votação Simbólica)'
+REJEITADO = 'Rejeitado'
+COMISSAO = 'Encaminhado para Comissão'
+DISCUSSAO = 'Em Discussão'
+NAO_IDENTIFICADO = 'Não identificado'
+
+# Tokens consumidos numa varredura do texto em minúsculas. Cada alternativa
+# começa por um caractere literal (o `re` pula direto para os candidatos) e
+# o ano fica num lookahead para que os seus dígitos ainda sejam varridos.
+# Números e datas são ancorados na barra e no "de": os dígitos antes deles
+# são lidos de volta no texto.
+_ALTERNATIVAS = (
+    r'p(?:rojeto\s+de\s+lei|l)\s+(?:n[úº]mero|n[úº]|nº)?\s*(?P<pl>\d{1,3})/(?=202[4-6])'
+    r'|/(?P<numero>)(?=202[4-6])'
+    r'|d(?P<data>e\s+(?P<mes>' + '|'.join(MESES) + r')\s+de\s+)(?=202[4-6])'
+    r'|a(?P<aprovado>provado)'
+    r'|r(?P<rejeitado>ejeitado)'
+    r'|e(?:m\s+(?:(?P<votacao>votação)|(?P<discussao>discuss[ãa]o))'
+    r'|(?P<comissao>ncaminhad[oa]s?\s+(?:para|à|às)\s+(?:comiss[ãõ]|ccj))'
+    r'|(?P<execucao>xecução))'
+    r'|c(?P<chamada>hamada\s+dos\s+vereadores)'
+    r'|q(?P<questao>uestão)'
+    r'|p(?P<peco>eço)'
+    r'|h(?P<hino>ino)'
+    r'|\n(?P<quebra>)'
+)
+_PADRAO = re.compile(_ALTERNATIVAS)
+# Textos cujo tamanho muda com lower() ("İ") são varridos no original
+_PADRAO_ORIGINAL = re.compile(_ALTERNATIVAS, re.IGNORECASE)
+
+TIPOS = ['pl', 'numero', 'data', 'aprovado', 'rejeitado', 'comissao',
+         'votacao', 'discussao', 'chamada', 'fim_chamada', 'quebra']
+_TIPO_GRUPO = {grupo: grupo for grupo in TIPOS}
+_TIPO_GRUPO.update(execucao='fim_chamada', questao='fim_chamada', peco='fim_chamada', hino='fim_chamada')
+
+# Tokens que podem conter quebras de linha (nos \s+)
+_COM_ESPACOS = {'pl', 'data', 'comissao', 'votacao', 'discussao', 'chamada'}
+
+
+class Evento(NamedTuple):
+    """Um evento do léxico: tipo, trecho [inicio, fim) e valor (número do PL, data)"""
+    tipo: str
+    inicio: int
+    fim: int
+    valor: str = None
+
+
+def _digitos_antes(texto, posicao, maximo):
+    """Início da sequência de até `maximo` dígitos que termina na posição"""
+    inicio = posicao
+    while inicio > posicao - maximo and inicio > 0 and texto[inicio - 1].isdecimal():
+        inicio -= 1
+    return inicio
+
+
+def _numeros(texto, barra):
+    """
+    Números de PL com a barra nesta posição: cada sufixo de até 3 dígitos
+    (em "1123/2025" ocorrem "123/2025", "23/2025" e "3/2025")
+    """
+    ano = texto[barra + 1:barra + 5]
+    inicio = _digitos_antes(texto, barra, 3)
+    for k in range(inicio, barra):
+        yield Evento('numero', k, barra + 5, f'{texto[k:barra]}/{ano}')
+
+
+def _datas(texto, m):
+    """Datas cujo "de <mês> de" começa no token: o dia são os 1 ou 2 dígitos antes"""
+    fim_digitos = m.start()
+    while fim_digitos > 0 and texto[fim_digitos - 1].isspace():
+        fim_digitos -= 1
+    if fim_digitos == m.start():
+        return
+    ano = texto[m.end():m.end() + 4]
+    mes = MESES[m.group('mes').lower()]
+    for k in range(_digitos_antes(texto, fim_digitos, 2), fim_digitos):
+        dia = int(texto[k:fim_digitos])
+        valor = f"{ano}-{mes:02d}-{dia:02d}" if 1 <= dia <= 31 else None
+        yield Evento('data', k, m.end() + 4, valor)
+
+
+def eventos(texto):
+    """Eventos da transcrição, em ordem de posição"""
+    minusculo = texto.lower()
+    if len(minusculo) == len(texto):
+        varredura = _PADRAO.finditer(minusculo)
+    else:
+        minusculo = texto
+        varredura = _PADRAO_ORIGINAL.finditer(texto)
+
+    lista = []
+    for m in varredura:
+        tipo = _TIPO_GRUPO[m.lastgroup]
+        if tipo == 'pl':
+            barra = m.end() - 1
+            lista.append(Evento(tipo, m.start(), barra + 5, f"{m.group('pl')}/{texto[barra + 1:barra + 5]}"))
+            lista.extend(_numeros(texto, barra))
+        elif tipo == 'numero':
+            lista.extend(_numeros(texto, m.start()))
+        elif tipo == 'data':
+            lista.extend(_datas(minusculo, m))
+        else:
+            lista.append(Evento(tipo, m.start(), m.end()))
+
+        if tipo in _COM_ESPACOS:
+            posicao = texto.find('\n', m.start(), m.end())
+            while posicao >= 0:
+                lista.append(Evento('quebra', posicao, posicao + 1))
+                posicao = texto.find('\n', posicao + 1, m.end())
+
+    lista.sort(key=lambda e: e.inicio)
+    return lista
+
+
+def _sem_sobreposicao(lista):
+    """Mantém só os eventos que um finditer (que consome o texto) encontraria"""
+    aceitos = []
+    fim_anterior = 0
+    for evento in lista:
+        if evento.inicio >= fim_anterior:
+            aceitos.append(evento)
+            fim_anterior = evento.fim
+    return aceitos
+
+
+class Transcricao:
+    """Eventos de uma transcrição indexados por tipo para consultas por posição"""
+
+    def __init__(self, texto):
+        self.tamanho = len(texto)
+        self.por_tipo = {tipo: [] for tipo in TIPOS}
+        for evento in eventos(texto):
+            self.por_tipo[evento.tipo].append(evento)
+        self._inicios = {tipo: [e.inicio for e in lista] for tipo, lista in self.por_tipo.items()}
+
+        # Ocorrências de cada número de PL (inclusive fora de menções)
+        self._numeros = {}
+        for evento in self.por_tipo['numero']:
+            self._numeros.setdefault(evento.valor, []).append(evento.inicio)
+
+    def _primeiro(self, tipo, inicio, fim):
+        """Primeiro evento do tipo contido em [inicio, fim)"""
+        lista = self.por_tipo[tipo]
+        for k in range(bisect.bisect_left(self._inicios[tipo], inicio), len(lista)):
+            evento = lista[k]
+            if evento.inicio >= fim:
+                break
+            if evento.fim <= fim:
+                return evento
+        return None
+
+    def mencoes_pl(self):
+        """Primeira menção de cada PL, na ordem do texto"""
+        vistos = set()
+        mencoes = []
+        for evento in _sem_sobreposicao(self.por_tipo['pl']):
+            if evento.valor not in vistos:
+                vistos.add(evento.valor)
+                mencoes.append(evento)
+        return mencoes
+
+    def janela(self, posicao):
+        """Trecho [inicio, fim) analisado para o PL mencionado na posição"""
+        return max(0, posicao - ANTES_PL), min(self.tamanho, posicao + DEPOIS_PL)
+
+    def status(self, pl_numero, inicio, fim):
+        """
+        Status do PL na janela, pelas regras de `determinar_status` (em ordem):
+        número do PL seguido de "aprovado"; "em votação" e "aprovado" na mesma
+        linha; "rejeitado"; encaminhamento à comissão; "em discussão".
+        """
+        aprovados = self._inicios['aprovado']
+        ultimo_aprovado = bisect.bisect_right(aprovados, fim - len('aprovado')) - 1
+        ultimo_aprovado = aprovados[ultimo_aprovado] if ultimo_aprovado >= 0 else -1
+
+        ocorrencias = self._numeros.get(pl_numero, [])
+        k = bisect.bisect_left(ocorrencias, inicio)
+        if k < len(ocorrencias) and ocorrencias[k] + len(pl_numero) <= ultimo_aprovado:
+            return APROVADO
+
+        quebras = self._inicios['quebra']
+        for votacao in self.por_tipo['votacao'][bisect.bisect_left(self._inicios['votacao'], inicio):]:
+            if votacao.fim > ultimo_aprovado:
+                break
+            aprovado = aprovados[bisect.bisect_left(aprovados, votacao.fim)]
+            q = bisect.bisect_left(quebras, votacao.fim)
+            if q == len(quebras) or quebras[q] >= aprovado:
+                return APROVADO
+
+        if self._primeiro('rejeitado', inicio, fim):
+            return REJEITADO
+        if self._primeiro('comissao', inicio, fim):
+            return COMISSAO
+        if self._primeiro('discussao', inicio, fim):
+            return DISCUSSAO
+        return NAO_IDENTIFICADO
+
+    def data(self):
+        """Primeira data por extenso válida nos primeiros LIMITE_DATA caracteres"""
+        for evento in _sem_sobreposicao(self.por_tipo['data']):
+            if evento.fim > LIMITE_DATA:
+                break
+            if evento.valor:
+                return evento.valor
+        return None
+
+    def bloco_chamada(self):
+        """Trecho [inicio, fim) da chamada dos vereadores, ou None"""
+        chamada = self.por_tipo['chamada']
+        if not chamada:
+            return None
+        terminos = self.por_tipo['fim_chamada']
+        k = bisect.bisect_left(self._inicios['fim_chamada'], chamada[0].fim)
+        if k == len(terminos):
+            return None
+        return chamada[0].inicio, terminos[k].fim
@@ -0,0 +1,137 @@
+"""
+Extração com spaCy (reconhecimento de entidades)
+
+Alternativa ao extrator por expressões regulares: status, data e chamada
+continuam saindo do léxico, mas o autor de cada PL é a primeira entidade de
+pessoa, no trecho logo após a menção, que corresponde a um vereador do
+cadastro. Só esses trechos passam pelo spaCy, em fluxo contínuo por
+`nlp.pipe` (lotes de `tamanho_lote` trechos, `processos` processos) e com o
+pipeline reduzido aos componentes que produzem entidades.
+
+O spaCy é opcional: só é importado quando este backend é usado.
+"""
+
+from extrator import AUTOMATO, datar, ler_transcricao, presentes_da_chamada
+from lexico import Transcricao
+from vereadores import VEREADORES_MASTER
+
+MODELO_PADRAO = 'pt_core_news_lg'
+# Nome especial: pipeline em branco com os nomes do cadastro (ver nlp_de_regras)
+MODELO_REGRAS = 'regras'
+# Mesmo alcance da busca de autor do extrator por regex
+TAMANHO_JANELA = 500
+ROTULOS_PESSOA = {'PER', 'PERSON'}
+COMPONENTES_ENTIDADES = ('ner', 'entity_ruler')
+# Componentes dos modelos pt_core_news_* que o extrator não usa
+COMPONENTES_DISPENSAVEIS = ['morphologizer', 'parser', 'lemmatizer', 'attribute_ruler', 'senter']
+
+
+def aparar(nlp):
+    """Deixa ativos só os componentes de entidades (e os tok2vec que eles escutam)"""
+    usados = {nome for nome in nlp.pipe_names if nome in COMPONENTES_ENTIDADES}
+    for nome, componente in nlp.pipeline:
+        if usados & set(getattr(componente, 'listening_components', [])):
+            usados.add(nome)
+    nlp.select_pipes(enable=[nome for nome in nlp.pipe_names if nome in usados])
+    return nlp
+
+
+def carregar_nlp(modelo=MODELO_PADRAO):
+    """Carrega o modelo sem os componentes que o extrator não usa"""
+    import spacy
+
+    if modelo == MODELO_REGRAS:
+        return nlp_de_regras()
+    return aparar(spacy.load(modelo, exclude=COMPONENTES_DISPENSAVEIS))
+
+
+def nlp_de_regras(cadastro=VEREADORES_MASTER):
+    """
+    Pipeline português em branco cujas entidades de pessoa vêm de um
+    entity_ruler com os nomes do cadastro. Não depende de modelo baixado;
+    serve para testes e medições offline.
+    """
+    import spacy
+
+    nlp = spacy.blank('pt')
+    regras = nlp.add_pipe('entity_ruler', config={'phrase_matcher_attr': 'LOWER'})
+    regras.add_patterns([
+        {'label': 'PER', 'pattern': variacao}
+        for variacoes in cadastro.values() for variacao in variacoes
+    ])
+    return nlp
+
+
+def autor_das_entidades(doc):
+    """Primeira entidade de pessoa do trecho que corresponde a um vereador"""
+    for entidade in doc.ents:
+        if entidade.label_ in ROTULOS_PESSOA:
+            mencoes = AUTOMATO.mencoes(entidade.text)
+            if mencoes:
+                return AUTOMATO.oficiais[mencoes[0][1]]
+    return None
+
+
+def registros_pendentes(conteudo, transcricao):
+    """Trecho após cada menção e o registro do PL, com o autor ainda em aberto"""
+    presentes = presentes_da_chamada(conteudo, transcricao)
+    for mencao in transcricao.mencoes_pl():
+        inicio, fim = transcricao.janela(mencao.inicio)
+        yield conteudo[mencao.inicio:mencao.inicio + TAMANHO_JANELA], {
+            'PL': mencao.valor,
+            'Autor': None,
+            'Status': transcricao.status(mencao.valor, inicio, fim),
+            'Votos': 'N/A',
+            'Presentes': presentes,
+        }
+
+
+def _separar(registros):
+    """(registros com autor, quantidade sem autor)"""
+    com_autor = [r for r in registros if r['Autor']]
+    return com_autor, len(registros) - len(com_autor)
+
+
+def extrair_pls_ner(conteudo, nlp):
+    """Equivalente a `extrator.extrair_pls` para um texto, com autores por NER"""
+    pendentes = list(registros_pendentes(conteudo, Transcricao(conteudo)))
+    for doc, registro in nlp.pipe(pendentes, as_tuples=True):
+        registro['Autor'] = autor_das_entidades(doc)
+    return _separar([registro for _, registro in pendentes])
+
+
+def processar_transcricoes(pendentes, nlp, tamanho_lote=64, processos=1):
+    """
+    Processa as transcrições pendentes [(caminho, hash_conhecido)] e devolve
+    os resultados no formato de `extrator.processar_transcricao`, na mesma
+    ordem. Os trechos de todas as transcrições formam um único fluxo para o
+    `nlp.pipe`; de cada arquivo só ficam guardados os registros pendentes.
+    """
+    resultados = []
+
+    def trechos():
+        for caminho, conhecido in pendentes:
+            resultado, dados = ler_transcricao(caminho, conhecido)
+            resultados.append(resultado)
+            if dados is None:
+                continue
+            try:
+                conteudo = dados.decode('utf-8')
+                transcricao = Transcricao(conteudo)
+                datar(resultado, transcricao.data(), conteudo)
+                trechos_arquivo = list(registros_pendentes(conteudo, transcricao))
+            except Exception as e:
+                resultado['erro'] = str(e)
+                continue
+            resultado['registros'] = [registro for _, registro in trechos_arquivo]
+            # O contexto vai por índices: com n_process > 1 ele é serializado
+            for j, (trecho, _) in enumerate(trechos_arquivo):
+                yield trecho, (len(resultados) - 1, j)
+
+    for doc, (i, j) in nlp.pipe(trechos(), as_tuples=True, batch_size=tamanho_lote, n_process=processos):
+        resultados[i]['registros'][j]['Autor'] = autor_das_entidades(doc)
+
+    for resultado in resultados:
+        if 'registros' in resultado:
+            resultado['registros'], resultado['sem_autor'] = _separar(resultado['registros'])
+    return resultados
@@ -0,0 +1,82 @@
+"""
+Localização e versão da base do observatório
+
+Só biblioteca padrão: o painel consulta a origem e a versão da base antes de
+importar pandas e pyarrow (ver instantaneo.py), e a API confere a versão a
+cada pedido. A versão é derivada apenas de `stat` (tamanho e mtime do CSV
+ou de cada partição da base particionada), sem ler o conteúdo.
+"""
+
+import hashlib
+import json
+import os
+
+# Bases procuradas na pasta atual, em ordem de preferência
+BASES = ['base_observatorio_teresopolis_COMPLETA.csv', 'base_observatorio_teresopolis.csv']
+
+ARQUIVO_PARTICAO = 'parte.parquet'
+
+
+def caminho_dataset(caminho_base):
+    """Pasta da base particionada correspondente à base CSV"""
+    return os.path.splitext(caminho_base)[0] + '_particionada'
+
+
+def pasta_particao(pasta, ano, mes):
+    return os.path.join(pasta, f'ano={ano}', f'mes={mes}')
+
+
+def particoes(pasta):
+    """(ano, mês) das partições gravadas, em ordem"""
+    encontradas = []
+    if not os.path.isdir(pasta):
+        return encontradas
+    for nome_ano in os.listdir(pasta):
+        if not nome_ano.startswith('ano='):
+            continue
+        for nome_mes in os.listdir(os.path.join(pasta, nome_ano)):
+            if nome_mes.startswith('mes=') and os.path.exists(
+                    os.path.join(pasta, nome_ano, nome_mes, ARQUIVO_PARTICAO)):
+                encontradas.append((int(nome_ano[4:]), int(nome_mes[4:])))
+    return sorted(encontradas)
+
+
+def assinatura(pasta):
+    """(ano, mês, tamanho, mtime) de cada partição: muda quando alguma partição é reescrita"""
+    resultado = []
+    for ano, mes in particoes(pasta):
+        info = os.stat(os.path.join(pasta_particao(pasta, ano, mes), ARQUIVO_PARTICAO))
+        resultado.append((ano, mes, info.st_size, info.st_mtime_ns))
+    return resultado
+
+
+def localizar_base(arquivos=BASES):
+    """
+    Primeira base disponível, como ('particionada', pasta) ou ('csv',
+    caminho): a base particionada ao lado de um CSV tem preferência sobre
+    ele. None se não houver nenhuma.
+    """
+    for arquivo in arquivos:
+        if particoes(caminho_dataset(arquivo)):
+            return 'particionada', caminho_dataset(arquivo)
+        if os.path.exists(arquivo):
+            return 'csv', arquivo
+    return None
+
+
+def versao_base(arquivos=BASES, origem=None):
+    """
+    Versão da base disponível (ou da `origem` já localizada): hash curto da
+    origem e do tamanho e mtime dos seus arquivos. None se não houver base.
+    """
+    origem = origem or localizar_base(arquivos)
+    if origem is None:
+        return None
+    tipo, caminho = origem
+    if tipo == 'particionada':
+        arquivos_base = assinatura(caminho)
+    else:
+        info = os.stat(caminho)
+        arquivos_base = [info.st_size, info.st_mtime_ns]
+    # Caminho absoluto: a mesma base dá a mesma versão vista de qualquer pasta
+    return hashlib.sha256(json.dumps([tipo, os.path.abspath(caminho), arquivos_base]).encode()).hexdigest()[:16]
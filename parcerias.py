@@ -0,0 +1,85 @@
+"""
+Coocorrência de autores por sessão ("Análise de Parcerias")
+
+Monta a matriz de incidência sessão × autor (1 quando o autor apresentou ao
+menos um PL na sessão) e obtém a contagem de sessões em comum de todos os
+pares com um único produto de matrizes: C = Mᵀ·M. A diagonal de C é o
+número de sessões de cada autor, o que permite normalizar os pares
+(Jaccard e lift) sem percorrer sessões nem montar dicionários por par.
+"""
+
+import numpy as np
+import pandas as pd
+
+MEDIDAS = ['Frequência', 'Jaccard', 'Lift']
+
+
+class Coocorrencia:
+    """Contagens de sessões em comum entre pares de autores"""
+
+    def __init__(self, sessoes, autores):
+        """Recebe, para cada participação, a sessão e o autor (listas alinhadas)"""
+        pares = pd.DataFrame({'sessao': sessoes, 'autor': autores}).drop_duplicates()
+        codigo_sessao, _ = pd.factorize(pares['sessao'])
+        codigo_autor, self.autores = pd.factorize(pares['autor'].astype(str), sort=True)
+
+        # Incidência densa em float32 (sessões × autores): o produto usa BLAS
+        # e, na escala de uma câmara (dezenas de autores, centenas de
+        # sessões), cabe com folga na memória sem depender de scipy.sparse
+        incidencia = np.zeros((codigo_sessao.max() + 1 if len(pares) else 0, len(self.autores)),
+                              dtype=np.float32)
+        incidencia[codigo_sessao, codigo_autor] = 1
+        self.contagens = (incidencia.T @ incidencia).astype(np.int64)
+        self.sessoes_por_autor = np.diag(self.contagens).copy()
+        self.total_sessoes = incidencia.shape[0]
+
+    @classmethod
+    def do_cubo(cls, cubo):
+        """Coocorrência a partir das células (data × autor) do cubo"""
+        celulas = cubo.celulas
+        return cls(celulas['Data Sessão'].to_numpy(), celulas['Autor'].to_numpy())
+
+    def _valores(self, medida, i, j):
+        """Valor da medida para os pares (i, j)"""
+        c = self.contagens[i, j].astype(float)
+        ni = self.sessoes_por_autor[i].astype(float)
+        nj = self.sessoes_por_autor[j].astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if medida == 'Jaccard':
+                valores = c / (ni + nj - c)
+            elif medida == 'Lift':
+                valores = c * self.total_sessoes / (ni * nj)
+            else:
+                valores = c
+        return np.nan_to_num(valores)
+
+    def principais(self, k=10, medida='Frequência', minimo=1):
+        """
+        Os k pares com maior valor da medida, entre pares com pelo menos
+        `minimo` sessões em comum (seleção por argpartition, sem ordenar
+        nem montar registros para todos os pares).
+        """
+        if medida not in MEDIDAS:
+            raise ValueError(f"Medida desconhecida: {medida}")
+
+        # Candidatos: só os pares do triângulo superior (cada par uma vez,
+        # sem a diagonal) que atingem o mínimo de sessões em comum
+        i, j = np.nonzero(np.triu(self.contagens >= minimo, k=1))
+
+        k = min(k, len(i))
+        if k == 0:
+            return pd.DataFrame(columns=['Vereador 1', 'Vereador 2', *MEDIDAS])
+
+        valores = self._valores(medida, i, j)
+        candidatos = np.argpartition(valores, -k)[-k:]
+        candidatos = candidatos[np.argsort(-valores[candidatos], kind='stable')]
+        i, j = i[candidatos], j[candidatos]
+
+        resultado = pd.DataFrame({
+            'Vereador 1': self.autores[i],
+            'Vereador 2': self.autores[j],
+        })
+        for nome in MEDIDAS:
+            resultado[nome] = self._valores(nome, i, j)
+        resultado['Frequência'] = resultado['Frequência'].astype(np.int64)
+        return resultado
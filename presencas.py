@@ -0,0 +1,227 @@
+"""
+Presenças por sessão (coluna Presentes normalizada)
+
+Na base de eventos cada linha repete a lista de presentes da sessão inteira.
+Aqui a lista fica guardada uma vez por sessão (uma transcrição, a coluna
+Fonte), como máscara de bits: o bit i indica a presença do vereador de
+código i (a ordem do cadastro, com nomes de fora dele intercalados onde
+aparecem nas listas, para que a lista remontada seja igual à original).
+As linhas de eventos chegam à sessão pela própria Fonte (categórica), e os
+nomes são remontados sob demanda.
+
+Sessões em que a chamada não foi identificada ficam de fora das medidas de
+presença. Contagens por vereador desempacotam as máscaras (np.unpackbits) e
+contagens por sessão usam popcount (np.bitwise_count), sem laços em Python.
+"""
+
+import numpy as np
+import pandas as pd
+
+from vereadores import VEREADORES_MASTER
+
+SEM_CHAMADA = 'Chamada não identificada'
+BITS_POR_PALAVRA = 64
+
+
+def _colunas_mascara(palavras):
+    return [f'Máscara {i}' for i in range(palavras)]
+
+
+def _posicoes(valores, indice):
+    """
+    Posição em `indice` de cada valor (-1 se ausente). Com valores
+    categóricos, só as categorias usadas são procuradas.
+    """
+    valores = pd.Series(valores).astype('category')
+    codigos = valores.cat.codes.to_numpy()
+    # Código -1 (valor ausente) cai na posição extra do fim, que fica -1
+    usados = np.zeros(len(valores.cat.categories) + 1, dtype=bool)
+    usados[codigos] = True
+    usados[-1] = False
+    mapa = np.full(len(usados), -1, dtype=np.intp)
+    escolhidas = np.flatnonzero(usados)
+    mapa[escolhidas] = indice.get_indexer(valores.cat.categories.take(escolhidas).astype(str))
+    return mapa[codigos]
+
+
+def _ordem_vereadores(listas, cadastro):
+    """Cadastro com cada nome desconhecido inserido logo após o nome que o precede numa lista"""
+    ordem = list(cadastro)
+    conhecidos = set(ordem)
+    for lista in listas:
+        for i, nome in enumerate(lista):
+            if nome not in conhecidos:
+                ordem.insert(ordem.index(lista[i - 1]) + 1 if i else 0, nome)
+                conhecidos.add(nome)
+    return ordem
+
+
+class TabelaPresencas:
+    """Máscara de presença de cada sessão, em ordem de data"""
+
+    def __init__(self, sessoes, mascaras, vereadores):
+        """
+        `sessoes`: quadro com Data Sessão, Fonte e Chamada (bool), uma linha
+        por sessão; `mascaras`: uint64 (sessões × palavras), nas mesmas
+        linhas; `vereadores`: nomes, na ordem dos bits.
+        """
+        self.sessoes = sessoes
+        self.mascaras = mascaras
+        self.vereadores = list(vereadores)
+        self._datas = sessoes['Data Sessão'].to_numpy()
+        self._fontes = pd.Index(sessoes['Fonte'])
+        # Texto de Presentes de cada sessão, montado na primeira vez que é
+        # pedido; a posição extra do fim atende às fontes fora da tabela (-1)
+        self._textos = np.full(len(sessoes) + 1, None, dtype=object)
+        self._textos[-1] = SEM_CHAMADA
+
+    @classmethod
+    def separar(cls, df, cadastro=VEREADORES_MASTER):
+        """Tabela de presenças e a base sem a coluna Presentes"""
+        presentes = df['Presentes'].astype('category')
+        nomes = [
+            [] if str(texto) == SEM_CHAMADA else [n.strip() for n in str(texto).split(',') if n.strip()]
+            for texto in presentes.cat.categories
+        ]
+        vereadores = _ordem_vereadores(nomes, cadastro)
+        codigo = {nome: i for i, nome in enumerate(vereadores)}
+
+        # Máscara de cada valor distinto de Presentes (poucos), depois por linha
+        palavras = max(1, -(-len(vereadores) // BITS_POR_PALAVRA))
+        por_categoria = np.zeros((len(nomes) + 1, palavras), dtype=np.uint64)
+        for i, lista in enumerate(nomes):
+            for nome in lista:
+                bit = codigo[nome]
+                por_categoria[i, bit // BITS_POR_PALAVRA] |= np.uint64(1) << np.uint64(bit % BITS_POR_PALAVRA)
+        chamada = np.array([bool(lista) for lista in nomes] + [False])
+
+        chaves = pd.DataFrame({'Data Sessão': df['Data Sessão'], 'Fonte': df['Fonte'].astype(str)})
+        sessoes = chaves.drop_duplicates('Fonte').sort_values(['Data Sessão', 'Fonte'], kind='stable')
+
+        # Valores ausentes (código -1) caem na última linha: sem chamada
+        categoria = presentes.cat.codes.to_numpy()[sessoes.index]
+        sessoes = sessoes.reset_index(drop=True)
+        sessoes['Chamada'] = chamada[categoria]
+        return cls(sessoes, por_categoria[categoria], vereadores), df.drop(columns='Presentes')
+
+    def quadro(self):
+        """Sessões e máscaras num único quadro (para gravar em Parquet)"""
+        quadro = self.sessoes.copy()
+        for i, coluna in enumerate(_colunas_mascara(self.mascaras.shape[1])):
+            quadro[coluna] = self.mascaras[:, i]
+        return quadro
+
+    @classmethod
+    def do_quadro(cls, quadro, vereadores):
+        """Inverso de `quadro`"""
+        colunas = [c for c in quadro.columns if c.startswith('Máscara ')]
+        mascaras = quadro[colunas].to_numpy(dtype=np.uint64).reshape(len(quadro), len(colunas))
+        return cls(quadro.drop(columns=colunas), mascaras, vereadores)
+
+    def __len__(self):
+        return len(self.sessoes)
+
+    def posicoes(self, fontes):
+        """Linha da tabela da sessão de cada Fonte (-1 fora da tabela)"""
+        return _posicoes(fontes, self._fontes)
+
+    def presentes(self, fontes):
+        """Coluna Presentes (como no CSV) para as fontes dadas (textos memorizados por sessão)"""
+        posicoes = self.posicoes(fontes)
+        usadas = np.zeros(len(self._textos), dtype=bool)
+        usadas[posicoes] = True
+        faltam = np.flatnonzero(usadas & pd.isna(self._textos))
+        if len(faltam):
+            chamada = self.sessoes['Chamada'].to_numpy(dtype=bool)[faltam]
+            self._textos[faltam] = [
+                ', '.join(self.vereadores[i] for i in np.flatnonzero(linha)) if tem else SEM_CHAMADA
+                for linha, tem in zip(self._bits(self.mascaras[faltam]), chamada)
+            ]
+        return self._textos[posicoes]
+
+    def juntar(self, df):
+        """Base com a coluna Presentes remontada a partir da Fonte"""
+        return df.assign(Presentes=self.presentes(df['Fonte']))
+
+    def periodo(self, data_inicio=None, data_fim=None):
+        """Sessões do período (datas inclusivas), com os mesmos bits de vereador"""
+        ini = 0 if data_inicio is None else np.searchsorted(
+            self._datas, np.datetime64(pd.Timestamp(data_inicio), 'ns'), side='left')
+        fim = len(self) if data_fim is None else np.searchsorted(
+            self._datas, np.datetime64(pd.Timestamp(data_fim), 'ns') + np.timedelta64(1, 'D'), side='left')
+        return TabelaPresencas(self.sessoes.iloc[ini:fim].reset_index(drop=True), self.mascaras[ini:fim],
+                               self.vereadores)
+
+    def _bits(self, mascaras):
+        """Matriz booleana (linhas × vereadores) a partir das máscaras"""
+        bits = np.unpackbits(np.ascontiguousarray(mascaras).view(np.uint8), axis=1, bitorder='little')
+        return bits[:, :len(self.vereadores)].astype(bool)
+
+    def _com_chamada(self):
+        return self.mascaras[self.sessoes['Chamada'].to_numpy()]
+
+    def taxa_presenca(self):
+        """Presenças e taxa de presença de cada vereador nas sessões com chamada"""
+        mascaras = self._com_chamada()
+        presencas = self._bits(mascaras).sum(axis=0)
+        total = len(mascaras)
+        resultado = pd.DataFrame({
+            'Sessões': total,
+            'Presenças': presencas,
+            'Taxa de Presença (%)': presencas / total * 100 if total else np.zeros(len(presencas)),
+        }, index=pd.Index(self.vereadores, name='Vereador'))
+        return resultado.sort_values('Taxa de Presença (%)', ascending=False, kind='stable')
+
+    def quorum(self, minimo=None):
+        """
+        Presentes por sessão e se houve quórum (padrão: maioria absoluta do
+        cadastro). Sessões sem chamada ficam com contagem nula.
+        """
+        if minimo is None:
+            minimo = len(VEREADORES_MASTER) // 2 + 1
+        contagem = np.bitwise_count(self.mascaras).sum(axis=1).astype(float)
+        contagem[~self.sessoes['Chamada'].to_numpy()] = np.nan
+        resultado = self.sessoes[['Data Sessão', 'Fonte']].copy()
+        resultado['Presentes'] = contagem
+        resultado['Quórum'] = contagem >= minimo
+        return resultado
+
+    def autoria(self, df):
+        """Máscaras de autoria (sessão × vereador) das linhas de eventos dadas"""
+        bits = _posicoes(df['Autor'], pd.Index(self.vereadores))
+        posicao = self.posicoes(df['Fonte'])
+
+        # Autores sem bit e sessões fora da tabela são descartados
+        dentro = (posicao >= 0) & (bits >= 0)
+        autoria = np.zeros_like(self.mascaras)
+        np.bitwise_or.at(autoria, (posicao[dentro], bits[dentro] // BITS_POR_PALAVRA),
+                         np.left_shift(np.uint64(1), (bits[dentro] % BITS_POR_PALAVRA).astype(np.uint64)))
+        return autoria
+
+    def presenca_autoria(self, df):
+        """
+        Por vereador, nas sessões com chamada: presença, sessões com PL de
+        sua autoria, autoria estando presente e ausente e o coeficiente phi
+        (correlação entre os bits de presença e de autoria ao longo das
+        sessões). Tudo por contagem de bits de P, A e P & A.
+        """
+        chamada = self.sessoes['Chamada'].to_numpy()
+        presenca = self.mascaras[chamada]
+        autoria = self.autoria(df)[chamada]
+
+        n = len(presenca)
+        p = self._bits(presenca).sum(axis=0).astype(float)
+        a = self._bits(autoria).sum(axis=0).astype(float)
+        pa = self._bits(presenca & autoria).sum(axis=0).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            phi = (n * pa - p * a) / np.sqrt(p * (n - p) * a * (n - a))
+
+        resultado = pd.DataFrame({
+            'Taxa de Presença (%)': p / n * 100 if n else np.zeros(len(p)),
+            'Sessões com Autoria': a.astype(np.int64),
+            'Autoria Presente': pa.astype(np.int64),
+            'Autoria Ausente': (a - pa).astype(np.int64),
+            'Correlação (phi)': phi,
+        }, index=pd.Index(self.vereadores, name='Vereador'))
+        return resultado[resultado['Sessões com Autoria'] > 0].sort_values(
+            'Sessões com Autoria', ascending=False, kind='stable')
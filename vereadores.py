@@ -0,0 +1,64 @@
+"""
+Cadastro dos vereadores e variações de nome usadas nas transcrições
+"""
+
+import re
+import unicodedata
+
+VEREADORES_MASTER = {
+    "Amanda": ["Amanda", "professora Amanda"],
+    "André do Gás": ["André do Gás", "André"],
+    "Bruninho Almeida": ["Bruninho Almeida", "Bruninho"],
+    "Cacau Repórter": ["Cacau Repórter", "Cacau"],
+    "Caio Perfister": ["Caio Perfister", "Caio Perfiste", "Caio"],
+    "Calé": ["Calé"],
+    "Dudu do Resgate": ["Dudu do Resgate", "Dudo Resgate", "Dudu"],
+    "Diego Barbosa": ["Diego Barbosa", "Diego"],
+    "Fabinho Filé": ["Fabinho Filé", "Fabinho"],
+    "Fidel Faria": ["Fidel Faria", "Fidel"],
+    "Igor Faraco": ["Igor Faraco", "Igor"],
+    "João Miguel": ["João Miguel", "João"],
+    "Luciano Santos": ["Luciano Santos", "Luciano"],
+    "Márcia Valentim": ["Márcia Valentim", "Márcia"],
+    "Marcos Rangel": ["Marcos Rangel", "Rangel"],
+    "Maurício Lopes": ["Maurício Lopes", "Maurício"],
+    "Paulinho Nogueira": ["Paulinho Nogueira", "Paulinho"],
+    "Sandrinho": ["Sandrinho"],
+    "Totó": ["Totó", "Totó Online"],
+    "Vitinho Nogueira": ["Vitinho Nogueira", "Vitinho"],
+    "Érica Marra": ["Érica Marra", "Érica"]
+}
+
+
+def dobrar_acentos(texto):
+    """Minúsculas e sem acentos ("Márcia" -> "marcia")"""
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+class AutomatoVereadores:
+    """
+    Todas as variações de nome compiladas numa única expressão.
+
+    Cada vereador é um grupo nomeado (na ordem do cadastro) com as suas
+    variações da mais longa para a mais curta, dentro de um lookahead: uma
+    só varredura do texto devolve todas as posições onde começa uma menção
+    (com limite de palavra nos dois lados, como nos padrões originais).
+    """
+
+    def __init__(self, cadastro=VEREADORES_MASTER):
+        self.oficiais = list(cadastro)
+        grupos = []
+        for indice, variacoes in enumerate(cadastro.values()):
+            alternativas = '|'.join(re.escape(v) for v in sorted(variacoes, key=len, reverse=True))
+            grupos.append(f'(?P<v{indice}>{alternativas})')
+        self._padrao = re.compile(r'(?=\b(?:' + '|'.join(grupos) + r')\b)', re.IGNORECASE)
+
+    def mencoes(self, texto):
+        """Lista de (posição, índice do vereador no cadastro)"""
+        return [(m.start(), int(m.lastgroup[1:])) for m in self._padrao.finditer(texto)]
+
+    def presentes(self, texto):
+        """Vereadores mencionados no texto, na ordem do cadastro"""
+        indices = {indice for _, indice in self.mencoes(texto)}
+        return [self.oficiais[i] for i in sorted(indices)]
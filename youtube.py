@@ -0,0 +1,176 @@
+"""
+Títulos dos vídeos do YouTube (para datar transcrições sem data no corpo)
+
+Os títulos ficam num cache em disco por ID do vídeo, inclusive os vídeos
+sem título encontrado (com validade de `ttl_negativo` segundos, para serem
+tentados de novo depois). Os vídeos que faltam no cache são buscados em
+paralelo por várias threads, que dividem um único limitador de taxa; erros
+temporários (rede, 429, 5xx) são repetidos com espera exponencial e não
+entram no cache. Uma nova execução sobre os mesmos vídeos não faz nenhuma
+requisição.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+URL_YOUTUBE = 'https://www.youtube.com/watch?v='
+CABECALHOS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+# Vídeo sem título: tenta de novo depois de uma semana
+TTL_NEGATIVO = 7 * 24 * 3600
+
+_TITULO = re.compile(r'"title":"((?:[^"\\]|\\.)*)"')
+
+
+def titulo_da_pagina(html):
+    """Título do vídeo no HTML da página (string JSON embutida), ou None"""
+    match = _TITULO.search(html)
+    if not match:
+        return None
+    try:
+        return json.loads(f'"{match.group(1)}"')
+    except ValueError:
+        return match.group(1)
+
+
+def caminho_cache(caminho_base):
+    """Cache de títulos, ao lado da base"""
+    return os.path.splitext(caminho_base)[0] + '.titulos.json'
+
+
+class CacheTitulos:
+    """Títulos por ID do vídeo, persistidos num JSON"""
+
+    def __init__(self, caminho, ttl_negativo=TTL_NEGATIVO):
+        self.caminho = caminho
+        self.ttl_negativo = ttl_negativo
+        self._dados = {}
+        if caminho and os.path.exists(caminho):
+            with open(caminho, encoding='utf-8') as f:
+                self._dados = json.load(f)
+        self._trava = threading.Lock()
+
+    def obter(self, video_id, agora=None):
+        """(encontrado, título); resultados negativos vencidos contam como ausentes"""
+        with self._trava:
+            entrada = self._dados.get(video_id)
+        if entrada is None:
+            return False, None
+        if entrada['titulo'] is None:
+            agora = time.time() if agora is None else agora
+            if agora - entrada['consultado'] > self.ttl_negativo:
+                return False, None
+        return True, entrada['titulo']
+
+    def gravar(self, video_id, titulo):
+        with self._trava:
+            self._dados[video_id] = {'titulo': titulo, 'consultado': time.time()}
+
+    def salvar(self):
+        if not self.caminho:
+            return
+        with self._trava:
+            conteudo = json.dumps(self._dados, ensure_ascii=False, indent=1, sort_keys=True)
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        os.replace(temporario, self.caminho)
+
+
+class LimitadorTaxa:
+    """No máximo `por_segundo` requisições por segundo, somando todas as threads"""
+
+    def __init__(self, por_segundo):
+        self.intervalo = 1 / por_segundo if por_segundo else 0
+        self._proxima = 0.0
+        self._trava = threading.Lock()
+
+    def aguardar(self):
+        with self._trava:
+            agora = time.monotonic()
+            vez = max(self._proxima, agora)
+            self._proxima = vez + self.intervalo
+        if vez > agora:
+            time.sleep(vez - agora)
+
+
+class ResolvedorTitulos:
+    """Busca títulos em paralelo, com cache, limite de taxa e novas tentativas"""
+
+    def __init__(self, cache, url_base=URL_YOUTUBE, trabalhadores=8, por_segundo=4,
+                 tentativas=4, espera_inicial=1.0, timeout=10):
+        self.cache = cache
+        self.url_base = url_base
+        self.trabalhadores = trabalhadores
+        self.limitador = LimitadorTaxa(por_segundo)
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        self.timeout = timeout
+        self.requisicoes = 0
+        self._trava = threading.Lock()
+        self._local = threading.local()
+
+    def _sessao(self):
+        # requests.Session não é segura entre threads: uma por thread
+        if not hasattr(self._local, 'sessao'):
+            self._local.sessao = requests.Session()
+            self._local.sessao.headers.update(CABECALHOS)
+        return self._local.sessao
+
+    def buscar(self, video_id):
+        """
+        Título do vídeo; None se a página não tem título (resultado
+        definitivo). Levanta a última exceção se todas as tentativas falharem.
+        """
+        espera = self.espera_inicial
+        for tentativa in range(self.tentativas):
+            self.limitador.aguardar()
+            with self._trava:
+                self.requisicoes += 1
+            try:
+                resposta = self._sessao().get(self.url_base + video_id, timeout=self.timeout)
+                if resposta.status_code == 404:
+                    return None
+                resposta.raise_for_status()
+                return titulo_da_pagina(resposta.text)
+            except requests.RequestException as e:
+                temporario = (e.response is None or e.response.status_code == 429
+                              or e.response.status_code >= 500)
+                if not temporario or tentativa == self.tentativas - 1:
+                    raise
+                pedido = e.response.headers.get('Retry-After') if e.response is not None else None
+                time.sleep(float(pedido) if pedido and pedido.isdigit() else espera)
+                espera *= 2
+
+    def _buscar_e_guardar(self, video_id):
+        try:
+            titulo = self.buscar(video_id)
+        except requests.RequestException as e:
+            print(f"      Erro ao buscar título de {video_id}: {e}")
+            return video_id, None
+        self.cache.gravar(video_id, titulo)
+        return video_id, titulo
+
+    def resolver(self, video_ids):
+        """{ID: título ou None} para os IDs, buscando só os que faltam no cache"""
+        titulos = {}
+        faltantes = []
+        for video_id in dict.fromkeys(video_ids):
+            encontrado, titulo = self.cache.obter(video_id)
+            if encontrado:
+                titulos[video_id] = titulo
+            else:
+                faltantes.append(video_id)
+
+        if faltantes:
+            with ThreadPoolExecutor(max_workers=self.trabalhadores) as pool:
+                titulos.update(pool.map(self._buscar_e_guardar, faltantes))
+            self.cache.salvar()
+        return titulos